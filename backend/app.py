@@ -1,7 +1,39 @@
-from flask import Flask, request, jsonify, render_template
-import boto3
+import time
+# Measured from here, so the startup figures include importing Flask, boto3 and NumPy.
+IMPORT_STARTED = time.perf_counter()
+
+from flask import Flask, Response, g, request, jsonify, render_template
+import gc
 import os
+import threading
+import random
+import json
+import base64
+from collections import namedtuple
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from flask_cors import CORS
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from aws_clients import ClientRegistry
+from change_feed import ChangeFeed, OVERFLOWED
+from cost_pivot import CostFrame
+from cost_store import CostStore
+from free_tier import FreeTierTracker
+from http_cache import ResponseMemo, MIN_COMPRESS_BYTES, compress_body, compute_etag, negotiate_encoding
+from inventory_cache import TTLCache
+from inventory_sync import InventorySync
+from lb_details import load_balancer_details, load_balancer_tags
+from metrics import (
+    JSON_SERIALIZE_LATENCY, instrument_client, inventory_sync_metrics, metrics_response, observe_request,
+    rate_limit_metrics, single_flight_metrics, startup_metrics, stats_collector,
+)
+from rate_limiter import THROTTLING_ERROR_CODES, RateLimiter, RateLimitExceeded, parse_rate_limits
+from resource_index import ResourceIndex
+from sg_exposure import ExposureIndex, parse_cidr
+from single_flight import SingleFlight
+from tag_index import TagIndex
+from waste_report import waste_report
 from datetime import datetime, timedelta
 
 # Get the absolute path of the directory containing app.py
@@ -15,95 +47,1011 @@ app = Flask(__name__,
             template_folder='frontend')  # The directory containing templates
 CORS(app) # Enable CORS for all routes
 
-# --- ADDED LINES FOR DEBUGGING ---
-# Print the value of the environment variables for debugging purposes.
-print("--- Docker Container Environment Check ---")
-print(f"Checking for AWS_REGION: {os.environ.get('AWS_REGION', 'ERROR: NOT SET')}")
-print(f"Checking for AWS_ACCESS_KEY_ID: {os.environ.get('AWS_ACCESS_KEY_ID', 'ERROR: NOT SET')}")
-print(f"Checking for AWS_SECRET_ACCESS_KEY: {'[SET]' if os.environ.get('AWS_SECRET_ACCESS_KEY') else 'ERROR: NOT SET'}")
-print("--- End Check ---")
-
 # Get the region from the environment variable with a fallback
 aws_region = os.environ.get('AWS_REGION', 'us-east-1')
 
-# Initialize Boto3 clients and explicitly pass the region to each client.
-# This fixes the NoRegionError by ensuring the region is always defined.
-ec2_client = boto3.client('ec2', region_name=aws_region)
-autoscaling_client = boto3.client('autoscaling', region_name=aws_region)
-elbv2_client = boto3.client('elbv2', region_name=aws_region)
-elb_client = boto3.client('elb', region_name=aws_region)
-ce_client = boto3.client('ce', region_name=aws_region)
+# Every client shares one connection-pool size and retry policy. Adaptive retries back off
+# on throttling responses, and the rate limiter keeps each API below its AWS token bucket:
+# calls queue for up to AWS_RATE_LIMIT_MAX_WAIT seconds and are shed (503) past that.
+# Per-API limits can be overridden with AWS_RATE_LIMITS="ec2:describe_*=10/50" (rate/burst).
+aws_client_config = Config(
+    max_pool_connections=int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', '50')),
+    retries={
+        'mode': os.environ.get('AWS_RETRY_MODE', 'adaptive'),
+        'max_attempts': int(os.environ.get('AWS_MAX_ATTEMPTS', '8')),
+    },
+    connect_timeout=float(os.environ.get('AWS_CONNECT_TIMEOUT', '5')),
+    read_timeout=float(os.environ.get('AWS_READ_TIMEOUT', '30')),
+)
+rate_limiter = RateLimiter(
+    parse_rate_limits(os.environ.get('AWS_RATE_LIMITS', '')),
+    max_wait=float(os.environ.get('AWS_RATE_LIMIT_MAX_WAIT', '2')),
+)
+
+# Clients are created on first use, per (service, region), with the region always passed
+# explicitly (no NoRegionError), and all from one botocore session; see aws_clients.py.
+# AWS_CLIENT_PREWARM creates them at the end of import instead (see Startup below).
+clients = ClientRegistry(aws_region, config=aws_client_config, rate_limiter=rate_limiter, instrument=instrument_client)
+
+@app.route('/api/aws-clients/status', methods=['GET'])
+def aws_clients_status():
+    return jsonify({
+        'maxPoolConnections': aws_client_config.max_pool_connections,
+        'retries': aws_client_config.retries,
+        'rateLimits': rate_limiter.stats(),
+        'singleFlight': upstream_calls.stats(),
+        'clients': clients.stats(),
+        'startup': startup_stats(),
+    })
+
+# --- Metrics ---
+# GET /metrics serves Prometheus metrics: request latency per route (this hook is registered
+# before the others, so its after_request runs last and includes compression), AWS call
+# latency per operation from botocore hooks, and scrape-time component counters.
+stats_collector.add_source(lambda: rate_limit_metrics(rate_limiter.stats()))
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    mark_first_request()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        observe_request(request.method, route, response.status_code, time.perf_counter() - started)
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    body, content_type = metrics_response()
+    return Response(body, content_type=content_type)
 
 # Home page (renders index.html from the configured template_folder)
 @app.route('/')
 def home():
     return render_template('index.html')
 
-# --- EC2 Overview ---
-@app.route('/api/ec2-overview', methods=['GET'])
-def ec2_overview():
+def timed_call(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - started) * 1000
+
+def submit_started(executor, fn):
+    # Returns the future and an Event that is set, with its start time in .at, once fn runs.
+    started = threading.Event()
+
+    def run():
+        started.at = time.perf_counter()
+        started.set()
+        return timed_call(fn)
+    return executor.submit(run), started
+
+def started_result(future, started, queue_deadline, timeout):
+    # Waits for a submit_started call until queue_deadline to start running, then up to
+    # `timeout` from when it started. Raises FuturesTimeoutError (cancelling it if still
+    # queued) when either runs out.
+    if not started.wait(timeout=max(0.0, queue_deadline - time.perf_counter())):
+        future.cancel()
+        raise FuturesTimeoutError()
+    return future.result(timeout=max(0.0, started.at + timeout - time.perf_counter()))
+
+# --- Resource Rows ---
+# How a raw describe item becomes the row a list route returns. Shared by the list routes
+# and every paging mode so each resource is shaped in exactly one place.
+def name_tag(tags):
+    for tag in tags or []:
+        if tag['Key'] == 'Name':
+            return tag['Value']
+    return 'N/A'
+
+def tag_dict(tags):
+    return {tag['Key']: tag['Value'] for tag in tags or []}
+
+def instance_rows(reservation):
+    rows = []
+    for instance in reservation['Instances']:
+        rows.append({
+            'Name': name_tag(instance.get('Tags')),
+            'InstanceId': instance['InstanceId'],
+            'State': instance['State']['Name'],
+            'InstanceType': instance['InstanceType'],
+            'PublicIpAddress': instance.get('PublicIpAddress', 'N/A'),
+            'PrivateIpAddress': instance.get('PrivateIpAddress', 'N/A'),
+            'LaunchTime': instance['LaunchTime'].isoformat(), # Convert datetime object to ISO format string
+            'AvailabilityZone': instance.get('Placement', {}).get('AvailabilityZone'),
+            'VpcId': instance.get('VpcId'),
+            'Tags': tag_dict(instance.get('Tags')),
+        })
+    return rows
+
+def key_pair_rows(kp):
+    return [{'KeyName': kp['KeyName'], 'KeyFingerprint': kp.get('KeyFingerprint', 'N/A')}]
+
+def security_group_rows(sg):
+    return [{
+        'GroupName': sg.get('GroupName'),
+        'GroupId': sg.get('GroupId'),
+        'Description': sg.get('Description'),
+        'VpcId': sg.get('VpcId'),
+        'IpPermissions': sg.get('IpPermissions', []),
+        'IpPermissionsEgress': sg.get('IpPermissionsEgress', []),
+        'Tags': tag_dict(sg.get('Tags')),
+    }]
+
+def auto_scaling_group_rows(asg):
+    return [{
+        'AutoScalingGroupName': asg.get('AutoScalingGroupName'),
+        'MinSize': asg.get('MinSize'),
+        'MaxSize': asg.get('MaxSize'),
+        'DesiredCapacity': asg.get('DesiredCapacity'),
+        'LaunchConfigurationName': asg.get('LaunchConfigurationName', asg.get('LaunchTemplate', {}).get('LaunchTemplateName')),
+        'HealthCheckType': asg.get('HealthCheckType'),
+        'HealthCheckGracePeriod': asg.get('HealthCheckGracePeriod'),
+        'CreatedTime': asg.get('CreatedTime').isoformat() if asg.get('CreatedTime') else 'N/A',
+        'Status': asg.get('Status', 'N/A'),
+        'Instances': [{'InstanceId': inst.get('InstanceId'), 'LifecycleState': inst.get('LifecycleState')} for inst in asg.get('Instances', [])]
+    }]
+
+def elbv2_rows(lb):
+    # Application/Network Load Balancers (ELBv2)
+    return [{
+        'Name': lb.get('LoadBalancerName'),
+        'Type': lb.get('Type').capitalize(),
+        'DNSName': lb.get('DNSName'),
+        'State': lb.get('State', {}).get('Code'),
+        'VpcId': lb.get('VpcId'),
+        'CreatedTime': lb.get('CreatedTime').isoformat() if lb.get('CreatedTime') else 'N/A',
+        'Arn': lb.get('LoadBalancerArn')
+    }]
+
+def classic_elb_rows(lb):
+    # Classic Load Balancers (ELB)
+    return [{
+        'Name': lb.get('LoadBalancerName'),
+        'Type': 'Classic',
+        'DNSName': lb.get('DNSName'),
+        'State': 'N/A',
+        'VpcId': lb.get('VPCId'),
+        'CreatedTime': lb.get('CreatedTime').isoformat() if lb.get('CreatedTime') else 'N/A',
+        'Arn': 'N/A'
+    }]
+
+def snapshot_rows(snapshot):
+    return [{
+        'SnapshotId': snapshot.get('SnapshotId'),
+        'VolumeId': snapshot.get('VolumeId'),
+        'State': snapshot.get('State'),
+        'StartTime': snapshot.get('StartTime').isoformat() if snapshot.get('StartTime') else 'N/A',
+        'VolumeSize': snapshot.get('VolumeSize'),
+        'Description': snapshot.get('Description'),
+        'Name': name_tag(snapshot.get('Tags')),
+        'Tags': tag_dict(snapshot.get('Tags')),
+    }]
+
+def volume_rows(volume):
+    return [{
+        'VolumeId': volume.get('VolumeId'),
+        'Size': volume.get('Size'),
+        'AvailabilityZone': volume.get('AvailabilityZone'),
+        'State': volume.get('State'),
+        'VolumeType': volume.get('VolumeType'),
+        'CreateTime': volume.get('CreateTime').isoformat() if volume.get('CreateTime') else 'N/A',
+        'SnapshotId': volume.get('SnapshotId', 'N/A'),
+        'Name': name_tag(volume.get('Tags')),
+        'Attachments': [{'InstanceId': att.get('InstanceId'), 'Device': att.get('Device')} for att in volume.get('Attachments', [])],
+        'Tags': tag_dict(volume.get('Tags')),
+    }]
+
+def elastic_ip_rows(eip):
+    return [{
+        'PublicIp': eip.get('PublicIp'),
+        'AllocationId': eip.get('AllocationId'),
+        'AssociationId': eip.get('AssociationId', 'N/A'),
+        'InstanceId': eip.get('InstanceId', 'N/A'),
+        'PrivateIpAddress': eip.get('PrivateIpAddress', 'N/A'),
+        'Domain': eip.get('Domain'),
+    }]
+
+def capacity_reservation_rows(cr):
+    return [{
+        'CapacityReservationId': cr.get('CapacityReservationId'),
+        'InstanceType': cr.get('InstanceType'),
+        'InstancePlatform': cr.get('InstancePlatform'),
+        'AvailabilityZone': cr.get('AvailabilityZone'),
+        'TotalInstanceCount': cr.get('TotalInstanceCount'),
+        'AvailableInstanceCount': cr.get('AvailableInstanceCount'),
+        'State': cr.get('State'),
+        'CreateDate': cr.get('CreateDate').isoformat() if cr.get('CreateDate') else 'N/A',
+        'EndDate': cr.get('EndDate').isoformat() if cr.get('EndDate') else 'N/A',
+    }]
+
+def dedicated_host_rows(host):
+    return [{
+        'HostId': host.get('HostId'),
+        'InstanceType': host.get('InstanceType'),
+        'AvailabilityZone': host.get('AvailabilityZone'),
+        'AllocationState': host.get('AllocationState'),
+        'AvailableCapacity': host.get('AvailableCapacity'),
+        'AllocationTime': host.get('AllocationTime').isoformat() if host.get('AllocationTime') else 'N/A',
+    }]
+
+def placement_group_rows(pg):
+    return [{
+        'GroupName': pg.get('GroupName'),
+        'GroupId': pg.get('GroupId'),
+        'Strategy': pg.get('Strategy'),
+        'State': pg.get('State'),
+        'InstanceCount': pg.get('InstanceCount'),
+    }]
+
+# --- Resource Sources ---
+# The describe calls that feed each resource, in the order their rows are returned.
+ResourceSource = namedtuple('ResourceSource', ['client', 'operation', 'params', 'result_key', 'to_rows'])
+
+RESOURCE_SOURCES = {
+    'Instances': [ResourceSource('ec2', 'describe_instances', {}, 'Reservations', instance_rows)],
+    'AutoScalingGroups': [ResourceSource('autoscaling', 'describe_auto_scaling_groups', {}, 'AutoScalingGroups', auto_scaling_group_rows)],
+    'CapacityReservations': [ResourceSource('ec2', 'describe_capacity_reservations', {}, 'CapacityReservations', capacity_reservation_rows)],
+    'DedicatedHosts': [ResourceSource('ec2', 'describe_hosts', {}, 'Hosts', dedicated_host_rows)],
+    'ElasticIPs': [ResourceSource('ec2', 'describe_addresses', {}, 'Addresses', elastic_ip_rows)],
+    'KeyPairs': [ResourceSource('ec2', 'describe_key_pairs', {}, 'KeyPairs', key_pair_rows)],
+    'LoadBalancers': [
+        ResourceSource('elbv2', 'describe_load_balancers', {}, 'LoadBalancers', elbv2_rows),
+        ResourceSource('elb', 'describe_load_balancers', {}, 'LoadBalancerDescriptions', classic_elb_rows),
+    ],
+    'PlacementGroups': [ResourceSource('ec2', 'describe_placement_groups', {}, 'PlacementGroups', placement_group_rows)],
+    'SecurityGroups': [ResourceSource('ec2', 'describe_security_groups', {}, 'SecurityGroups', security_group_rows)],
+    'Snapshots': [ResourceSource('ec2', 'describe_snapshots', {'OwnerIds': ['self']}, 'Snapshots', snapshot_rows)], # Owned by self
+    'Volumes': [ResourceSource('ec2', 'describe_volumes', {}, 'Volumes', volume_rows)],
+}
+
+# Largest page each API accepts; every describe call accepts at least 5.
+MAX_UPSTREAM_PAGE_SIZE = {
+    'describe_auto_scaling_groups': 100,
+    'describe_hosts': 500,
+    'describe_volumes': 500,
+    'describe_load_balancers': 400,
+}
+# --- Inventory Cache ---
+# Describe results are cached per resource type so dashboards refreshed by a whole team
+# don't each hit the EC2 API. Entries past their TTL are served stale while a background
+# refresh reloads them; write routes invalidate the types they change.
+# Override TTLs (seconds) with INVENTORY_CACHE_TTLS="Instances=10,Snapshots=600"; 0 disables.
+DEFAULT_CACHE_TTLS = {
+    'Instances': 15,
+    'AutoScalingGroups': 30,
+    'CapacityReservations': 300,
+    'DedicatedHosts': 300,
+    'ElasticIPs': 30,
+    'KeyPairs': 300,
+    'LoadBalancers': 60,
+    'PlacementGroups': 300,
+    'SecurityGroups': 60,
+    'Snapshots': 120,
+    'Volumes': 30,
+}
+
+def parse_cache_ttls(value):
+    ttls = dict(DEFAULT_CACHE_TTLS)
+    for pair in filter(None, (part.strip() for part in value.split(','))):
+        resource, _, seconds = pair.partition('=')
+        ttls[resource.strip()] = float(seconds)
+    return ttls
+
+CACHE_TTLS = parse_cache_ttls(os.environ.get('INVENTORY_CACHE_TTLS', ''))
+inventory_cache = TTLCache(
+    max_entries=int(os.environ.get('INVENTORY_CACHE_MAX_ENTRIES', '512')),
+    stale_seconds=float(os.environ.get('INVENTORY_CACHE_STALE_SECONDS', '300')),
+)
+stats_collector.add_cache('inventory', inventory_cache.stats)
+
+def describe_cache_key(resource, source, region=None, *window):
+    return (resource, region or aws_region, source.client, source.operation, json.dumps(source.params, sort_keys=True)) + window
+
+# Identical describe calls in flight at the same time (same client, region, operation,
+# parameters and window) share one upstream request, cached or not, so the number of AWS
+# calls follows the number of distinct queries rather than the number of users.
+upstream_calls = SingleFlight()
+stats_collector.add_source(lambda: single_flight_metrics(upstream_calls.stats()))
+
+def coalesced_describe(resource, source, loader, region=None, *window):
+    return upstream_calls.do(describe_cache_key(resource, source, region, *window), loader)
+
+def cached_describe(resource, source, loader, region=None, *window):
+    key = describe_cache_key(resource, source, region, *window)
+    return inventory_cache.get_or_load(key, lambda: upstream_calls.do(key, loader), CACHE_TTLS.get(resource, 0), tags=(resource,))
+
+DEFAULT_PAGE_LIMIT = int(os.environ.get('DEFAULT_PAGE_LIMIT', '100'))
+MAX_PAGE_LIMIT = int(os.environ.get('MAX_PAGE_LIMIT', '1000'))
+
+def fetch_source_items(resource, source, cached=True, region=None):
+    # Walks every upstream page. A single describe call silently stops at the first page.
+    def load():
+        client = clients.get(source.client, region)
+        if client.can_paginate(source.operation):
+            response = client.get_paginator(source.operation).paginate(**source.params).build_full_result()
+        else:
+            response = getattr(client, source.operation)(**source.params)
+        return response.get(source.result_key, [])
+    return cached_describe(resource, source, load, region) if cached else coalesced_describe(resource, source, load, region)
+
+def fetch_rows(resource, cached=True, region=None):
+    rows = []
+    for source in RESOURCE_SOURCES[resource]:
+        for item in fetch_source_items(resource, source, cached, region):
+            rows.extend(source.to_rows(item))
+    return rows
+
+def fetch_source_window(resource, source, limit, position):
+    # Returns up to `limit` raw items starting at `position` plus the position after them,
+    # or None once the source is exhausted. Paginated APIs stop fetching pages as soon as
+    # MaxItems is reached and hand back boto3's resume token; the few APIs without
+    # pagination are small enough to slice in memory.
+    client = clients.get(source.client)
+    if client.can_paginate(source.operation):
+        page_size = min(max(limit, 5), MAX_UPSTREAM_PAGE_SIZE.get(source.operation, 1000))
+        config = {'MaxItems': limit, 'PageSize': page_size}
+        if position and position.get('token'):
+            config['StartingToken'] = position['token']
+
+        def load():
+            paginator = client.get_paginator(source.operation)
+            response = paginator.paginate(**source.params, PaginationConfig=config).build_full_result()
+            return response.get(source.result_key, []), response.get('NextToken')
+        items, next_token = cached_describe(resource, source, load, None, limit, config.get('StartingToken'))
+        return items, ({'token': next_token} if next_token else None)
+
+    offset = position.get('offset', 0) if position else 0
+    items = fetch_source_items(resource, source)
+    window = items[offset:offset + limit]
+    next_offset = offset + len(window)
+    return window, ({'offset': next_offset} if next_offset < len(items) else None)
+
+def encode_cursor(state):
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(',', ':')).encode()).decode()
+
+def decode_cursor(cursor):
     try:
-        counts = {}
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor.")
+    if not isinstance(state, dict) or not is_index(state.get('source', 0)) or not is_position(state.get('position')):
+        raise ValueError("Invalid cursor.")
+    return state
+
+def is_index(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+def is_position(position):
+    # None, or a dict with {'token': str} for paginated sources or {'offset': int >= 0} for
+    # sliced ones (neither at a source's start), plus 'skip': int >= 0, the rows of the first
+    # item there that earlier pages already returned.
+    if position is None:
+        return True
+    if not isinstance(position, dict) or not position or not set(position) <= {'token', 'offset', 'skip'}:
+        return False
+    if 'token' in position and 'offset' in position:
+        return False
+    if 'token' in position and not isinstance(position['token'], str):
+        return False
+    return all(is_index(position[key]) for key in ('offset', 'skip') if key in position)
 
-        # Instances
-        instances_response = ec2_client.describe_instances()
-        instance_count = 0
-        for reservation in instances_response['Reservations']:
-            instance_count += len(reservation['Instances'])
-        counts['Instances'] = instance_count
+def take_rows(source, items, skip, room):
+    # Shapes items into at most `room` rows, starting `skip` rows into the first one. Returns
+    # the rows and, if it stopped before the end of items, (whole items used, rows used of the
+    # next item); otherwise None.
+    rows = []
+    for count, item in enumerate(items):
+        if len(rows) == room:
+            return rows, (count, 0)
+        item_rows = source.to_rows(item)
+        start = skip if count == 0 else 0
+        taken = item_rows[start:start + room - len(rows)]
+        rows.extend(taken)
+        if start + len(taken) < len(item_rows):
+            return rows, (count, start + len(taken))
+    return rows, None
 
-        # Auto Scaling Groups
-        asg_response = autoscaling_client.describe_auto_scaling_groups()
-        counts['AutoScalingGroups'] = len(asg_response['AutoScalingGroups'])
+def resume_position(position, item_count, skip, advance):
+    # The position `item_count` items past `position`, `skip` rows into the item there.
+    # advance(position, n) returns the position n items further on.
+    if item_count:
+        position = advance(position, item_count)
+    resumed = {key: value for key, value in (position or {}).items() if key != 'skip'}
+    if skip:
+        resumed['skip'] = skip
+    return resumed
 
-        # Capacity Reservations
-        cr_response = ec2_client.describe_capacity_reservations()
-        counts['CapacityReservations'] = len(cr_response['CapacityReservations'])
+def fetch_rows_window(resource, limit, cursor=None):
+    # The cursor records which source we are in and where inside it, so a window only pulls
+    # the upstream pages it needs. Limits count rows: a page that ends partway through a
+    # reservation resumes at that reservation and skips the instances already returned.
+    sources = RESOURCE_SOURCES[resource]
+    state = decode_cursor(cursor) if cursor else {}
+    index = state.get('source', 0)
+    position = state.get('position')
 
-        # Dedicated Hosts
-        dh_response = ec2_client.describe_hosts()
-        counts['DedicatedHosts'] = len(dh_response['Hosts'])
+    rows = []
+    while index < len(sources) and len(rows) < limit:
+        source = sources[index]
+        skip = position.get('skip', 0) if position else 0
+        items, next_position = fetch_source_window(resource, source, limit - len(rows), position)
+        taken, stop = take_rows(source, items, skip, limit - len(rows))
+        rows.extend(taken)
+        if stop is not None:
+            # Only reached when a multi-row item overflowed the page: one more window call
+            # finds the position of the item to resume at.
+            advance = lambda start, count: fetch_source_window(resource, source, count, start)[1]
+            position = resume_position(position, *stop, advance)
+            break
+        position = next_position
+        if position is None:
+            index += 1
 
-        # Elastic IPs
-        eips_response = ec2_client.describe_addresses()
-        counts['ElasticIPs'] = len(eips_response['Addresses'])
+    next_cursor = encode_cursor({'source': index, 'position': position}) if index < len(sources) else None
+    return rows, next_cursor
 
-        # Key Pairs
-        kp_response = ec2_client.describe_key_pairs()
-        counts['KeyPairs'] = len(kp_response['KeyPairs'])
+def offset_rows_window(rows, limit, cursor=None):
+    # Rows already in memory (a snapshot or a query result) page by plain offset.
+    state = decode_cursor(cursor) if cursor else {}
+    offset = state.get('offset', 0)
+    if not isinstance(offset, int) or offset < 0:
+        raise ValueError("Invalid cursor.")
+    window = rows[offset:offset + limit]
+    next_offset = offset + len(window)
+    return window, (encode_cursor({'offset': next_offset}) if next_offset < len(rows) else None)
 
-        # Load Balancers (Combined for Classic, Application, Network)
-        lb_count = 0
+def parse_limit(args=None):
+    args = request.args if args is None else args
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_LIMIT))
+    except ValueError:
+        raise ValueError("limit must be an integer.")
+    if limit < 1 or limit > MAX_PAGE_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_LIMIT}.")
+    return limit
+
+# --- Server-Side Filtering ---
+# The big list routes accept filters (?state=running,stopped&type=&az=&vpc=), tags
+# (?tag=Team:payments, repeatable, or ?tag=Team for any value), a Name prefix (?name=web)
+# and a sort (?sort=-LaunchTime). They are answered from secondary indexes built once per
+# data version, so a filtered query costs the size of its result, not a scan.
+INDEXED_RESOURCES = {
+    'Instances': {
+        'filters': {'state': 'State', 'type': 'InstanceType', 'az': 'AvailabilityZone', 'vpc': 'VpcId'},
+        'name': 'Name',
+        'sort': ['Name', 'InstanceId', 'State', 'InstanceType', 'LaunchTime'],
+    },
+    'Volumes': {
+        'filters': {'state': 'State', 'type': 'VolumeType', 'az': 'AvailabilityZone'},
+        'name': 'Name',
+        'sort': ['Name', 'VolumeId', 'Size', 'State', 'VolumeType', 'CreateTime'],
+    },
+    'Snapshots': {
+        'filters': {'state': 'State', 'volume': 'VolumeId'},
+        'name': 'Name',
+        'sort': ['Name', 'SnapshotId', 'State', 'StartTime', 'VolumeSize'],
+    },
+    'SecurityGroups': {
+        'filters': {'vpc': 'VpcId'},
+        'name': 'GroupName',
+        'sort': ['GroupName', 'GroupId', 'VpcId'],
+    },
+}
+
+def build_resource_index(resource, rows):
+    spec = INDEXED_RESOURCES.get(resource)
+    if spec is None:
+        return None
+    return ResourceIndex(rows, spec['filters'], spec['name'], spec['sort'])
+
+def parse_tag_filter(value):
+    # Key=Value or Key:Value; tag keys such as aws:cloudformation:stack-name need the '=' form.
+    if '=' in value:
+        key, _, tag_value = value.partition('=')
+        return key, tag_value
+    key, sep, tag_value = value.partition(':')
+    return key, (tag_value if sep else None)
+
+def parse_list_query(resource, args=None):
+    # Returns None when the request has no filter or sort parameters. args defaults to the
+    # Flask request's; the async server passes its own query parameters.
+    args = request.args if args is None else args
+    spec = INDEXED_RESOURCES.get(resource)
+    if spec is None:
+        return None
+    filters = {}
+    for param in spec['filters']:
+        values = [value.strip() for raw in args.getlist(param) for value in raw.split(',') if value.strip()]
+        if values:
+            filters[param] = values
+    tags = [parse_tag_filter(value) for value in args.getlist('tag') if value]
+    name_prefix = args.get('name') or None
+    sort = args.get('sort') or None
+    descending = bool(sort and sort.startswith('-'))
+    if descending:
+        sort = sort[1:]
+    if sort and sort not in spec['sort']:
+        raise ValueError(f"sort must be one of: {', '.join(spec['sort'])}.")
+    if not (filters or tags or name_prefix or sort):
+        return None
+    return {'filters': filters, 'tags': tags, 'name_prefix': name_prefix, 'sort': sort, 'descending': descending}
+
+def uses_snapshot(region=None):
+    return inventory_sync.enabled and region in (None, aws_region)
+
+def index_cache_key(resource, region=None):
+    return ('Index', resource, region or aws_region)
+
+def resource_index(resource, region=None):
+    # Synced snapshots carry their indexes. Without the sync, the index is cached next to the
+    # describe results it was built from and invalidated with them.
+    if uses_snapshot(region):
+        return inventory_sync.snapshot().index(resource)
+    region = region or aws_region
+    key = index_cache_key(resource, region)
+    return inventory_cache.get_or_load(
+        key,
+        lambda: upstream_calls.do(key, lambda: build_resource_index(resource, fetch_rows(resource, region=region))),
+        CACHE_TTLS.get(resource, 0),
+        tags=(resource,),
+    )
+
+def resource_rows(resource, query=None, region=None):
+    if query is not None:
+        return resource_index(resource, region).query(**query)
+    if uses_snapshot(region):
+        return inventory_sync.snapshot().rows(resource)
+    return fetch_rows(resource, region=region)
+
+# --- Conditional GET and Compression ---
+# Every /api/* JSON response carries an ETag, answers If-None-Match with 304, and is gzip or
+# brotli compressed when the client accepts it. List responses are memoized per URL and
+# data version, so serializing, hashing and compressing happen once per version.
+response_memo = ResponseMemo(max_entries=int(os.environ.get('RESPONSE_MEMO_MAX_ENTRIES', '256')))
+stats_collector.add_cache('response_memo', response_memo.stats)
+
+def serialized_json(payload):
+    with JSON_SERIALIZE_LATENCY.time():
+        return jsonify(payload)
+
+def data_version(resource, query=None):
+    # A token that changes whenever the data behind a default-region list response changes,
+    # or None when there is nothing cached to tie the response to yet.
+    if uses_snapshot():
+        return ('snapshot', inventory_sync.snapshot().type_versions.get(resource))
+    if query is not None:
+        version = inventory_cache.version_of(index_cache_key(resource))
+        return None if version is None else ('index', version)
+    versions = tuple(inventory_cache.version_of(describe_cache_key(resource, source)) for source in RESOURCE_SOURCES[resource])
+    return None if None in versions else ('describe',) + versions
+
+def versioned_json(version, build):
+    # The version must be read before build() runs: a response built from newer data than its
+    # version is simply rebuilt on the next request, never served past a change.
+    if version is None:
+        return serialized_json(build())
+    key = request.full_path
+    entry = response_memo.get(key, version)
+    if entry is None:
+        entry = response_memo.put(key, version, serialized_json(build()).get_data())
+    response = app.response_class(entry.body, mimetype='application/json')
+    response.set_etag(entry.etag, weak=True)
+    response.memo_entry = entry
+    return response
+
+@app.after_request
+def finalize_api_response(response):
+    if (not request.path.startswith('/api/') or request.method != 'GET' or response.status_code != 200
+            or response.direct_passthrough or response.mimetype != 'application/json'):
+        return response
+
+    etag, _ = response.get_etag()
+    if etag is None:
+        etag = compute_etag(response.get_data())
+        response.set_etag(etag, weak=True)
+    response.vary.add('Accept-Encoding')
+
+    if request.if_none_match.contains_weak(etag):
+        response.status_code = 304
+        response.set_data(b'')
+        return response
+
+    encoding = negotiate_encoding(request.accept_encodings)
+    if encoding and response.content_length and response.content_length >= MIN_COMPRESS_BYTES:
+        entry = getattr(response, 'memo_entry', None)
+        body = response_memo.encoded(entry, encoding) if entry else compress_body(response.get_data(), encoding)
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+# --- Multi-Region ---
+# ?regions=us-east-1,eu-west-1 (or ?regions=all for every enabled region) fans a route out
+# across regions concurrently, so the response costs about as much as the slowest region.
+# Only regions enabled for the account are accepted. Each region's REGION_CALL_TIMEOUT counts
+# from when it starts running; with more regions than workers, the rest may wait up to
+# REGION_QUEUE_TIMEOUT for one.
+REGION_MAX_WORKERS = int(os.environ.get('REGION_MAX_WORKERS', '8'))
+REGION_CALL_TIMEOUT = float(os.environ.get('REGION_CALL_TIMEOUT', '30'))
+REGION_QUEUE_TIMEOUT = float(os.environ.get('REGION_QUEUE_TIMEOUT', '60'))
+region_executor = ThreadPoolExecutor(max_workers=REGION_MAX_WORKERS, thread_name_prefix='region-fanout')
+
+def enabled_regions():
+    def load():
+        # Without AllRegions, describe_regions only returns regions enabled for the account.
+        return sorted(region['RegionName'] for region in clients.get('ec2').describe_regions()['Regions'])
+    return inventory_cache.get_or_load(('Regions',), lambda: upstream_calls.do(('Regions',), load), ttl=3600, tags=('Regions',))
+
+def requested_regions():
+    value = request.args.get('regions', '').strip()
+    if not value:
+        return None
+    if value == 'all':
+        return enabled_regions()
+    return known_regions(value.split(','), enabled_regions())
+
+def known_regions(names, enabled):
+    # Every region opens clients, rate-limiter buckets and pool work of its own, so names
+    # outside the account's enabled regions are refused rather than tried.
+    regions = list(dict.fromkeys(name.strip() for name in names if name.strip()))
+    unknown = [region for region in regions if region not in enabled]
+    if unknown:
+        raise ValueError(f"Unknown or disabled regions: {', '.join(unknown)}.")
+    return regions
+
+def fan_out_regions(regions, fn):
+    # Runs fn(region) for every region and reports per-region status and timing. A region
+    # that errors or misses its deadline is reported but doesn't fail the others.
+    futures = {region: submit_started(region_executor, partial(fn, region)) for region in regions}
+    queue_deadline = time.perf_counter() + REGION_QUEUE_TIMEOUT
+
+    results = {}
+    status = {}
+    for region, (future, started) in futures.items():
         try:
-            elbv2_response = elbv2_client.describe_load_balancers()
-            lb_count += len(elbv2_response['LoadBalancers'])
+            results[region], elapsed_ms = started_result(future, started, queue_deadline, REGION_CALL_TIMEOUT)
+            status[region] = {'status': 'ok', 'elapsedMs': round(elapsed_ms, 1)}
+        except FuturesTimeoutError:
+            status[region] = {'status': 'timeout', 'elapsedMs': round(REGION_CALL_TIMEOUT * 1000, 1)}
         except Exception as e:
-            print(f"Error describing ELBv2: {e}") # Log error, don't fail overview
+            print(f"Error querying region {region}: {e}")
+            status[region] = {'status': 'error', 'error': str(e)}
+    return results, status
+
+def multi_region_response(resource, regions, query=None):
+    started = time.perf_counter()
+    results, status = fan_out_regions(regions, lambda region: resource_rows(resource, query, region))
+    rows = []
+    for region in regions:
+        if region in results:
+            status[region]['count'] = len(results[region])
+            rows.extend(dict(row, Region=region) for row in results[region])
+    return jsonify({'items': rows, 'regions': status, 'elapsedMs': round((time.perf_counter() - started) * 1000, 1)})
+
+def rate_limited_response(error):
+    response = jsonify({"error": str(error)})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(max(1, round(error.retry_after)))
+    return response
 
+# --- Streaming Export ---
+# ?format=ndjson (or Accept: application/x-ndjson) streams a list route as one JSON object per
+# line. Without filters or the sync, rows are written page by page as the upstream pages
+# arrive, so memory holds one page however large the account is, and the first rows go out
+# after the first page rather than the last. Filtered queries and synced snapshots are
+# already in memory and are only serialized incrementally.
+NDJSON_MIMETYPE = 'application/x-ndjson'
+NDJSON_BATCH_ROWS = 500
+
+def wants_ndjson(args, accept):
+    # accept: a werkzeug MIMEAccept. A bare */* keeps the regular JSON array.
+    return args.get('format') == 'ndjson' or accept.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+def ndjson_chunk(rows):
+    return ''.join(app.json.dumps(row, separators=(',', ':')) + '\n' for row in rows)
+
+def row_batches(rows):
+    for start in range(0, len(rows), NDJSON_BATCH_ROWS):
+        yield rows[start:start + NDJSON_BATCH_ROWS]
+
+def upstream_row_batches(resource):
+    # One batch of rows per upstream page, bypassing the describe cache: caching the whole
+    # result is exactly the copy this mode avoids.
+    for source in RESOURCE_SOURCES[resource]:
+        client = clients.get(source.client)
+        if not client.can_paginate(source.operation):
+            yield [row for item in fetch_source_items(resource, source) for row in source.to_rows(item)]
+            continue
+        config = {'PageSize': MAX_UPSTREAM_PAGE_SIZE.get(source.operation, 1000)}
+        for page in client.get_paginator(source.operation).paginate(**source.params, PaginationConfig=config):
+            yield [row for item in page.get(source.result_key, []) for row in source.to_rows(item)]
+
+def ndjson_response(batches):
+    # The first batch is fetched before the response starts, so an error on the first page is
+    # still an ordinary error response. A later failure can only end the stream, with an
+    # {"error": ...} line so the client can tell it from a complete export.
+    batches = iter(batches)
+    first = next(batches, [])
+
+    def generate():
+        yield ndjson_chunk(first)
         try:
-            elb_response = elb_client.describe_load_balancers()
-            lb_count += len(elb_response['LoadBalancerDescriptions'])
+            for batch in batches:
+                yield ndjson_chunk(batch)
         except Exception as e:
-            print(f"Error describing Classic ELB: {e}") # Log error, don't fail overview
-        counts['LoadBalancers'] = lb_count
+            print(f"Error streaming export: {e}")
+            yield ndjson_chunk([{'error': str(e)}])
+    return Response(generate(), mimetype=NDJSON_MIMETYPE, headers={'X-Accel-Buffering': 'no'})
+
+def list_resource_response(resource):
+    # Without paging parameters a route keeps returning the complete list as a plain array.
+    # With ?limit= and/or ?cursor= it returns one window plus an opaque cursor for the next.
+    # When the background sync is on, both are answered from the in-memory snapshot.
+    try:
+        query = parse_list_query(resource)
+        regions = requested_regions()
+        paged = 'limit' in request.args or 'cursor' in request.args
+        if wants_ndjson(request.args, request.accept_mimetypes):
+            if regions is not None or paged:
+                return jsonify({"error": "format=ndjson is not supported together with regions or paging."}), 400
+            if query is not None or uses_snapshot():
+                return ndjson_response(row_batches(resource_rows(resource, query)))
+            return ndjson_response(upstream_row_batches(resource))
+        if regions is not None:
+            if paged:
+                return jsonify({"error": "Paging is not supported together with regions."}), 400
+            return multi_region_response(resource, regions, query)
+
+        if not paged:
+            return versioned_json(data_version(resource, query), lambda: resource_rows(resource, query))
+
+        limit = parse_limit()
+        cursor = request.args.get('cursor')
+        if query is not None or uses_snapshot():
+            def build_window():
+                rows, next_cursor = offset_rows_window(resource_rows(resource, query), limit, cursor)
+                return {'items': rows, 'nextCursor': next_cursor, 'limit': limit}
+            return versioned_json(data_version(resource, query), build_window)
+
+        rows, next_cursor = fetch_rows_window(resource, limit, cursor)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except RateLimitExceeded as e:
+        return rate_limited_response(e)
+    return jsonify({'items': rows, 'nextCursor': next_cursor, 'limit': limit})
+
+# --- Inventory Sync ---
+# With INVENTORY_SYNC_INTERVAL set (seconds), a background thread keeps an indexed snapshot
+# of every resource type and the GET routes answer from it instead of calling AWS.
+# Left at 0, routes call AWS (through the cache) as before.
+RESOURCE_ID_KEYS = {
+    'Instances': 'InstanceId',
+    'AutoScalingGroups': 'AutoScalingGroupName',
+    'CapacityReservations': 'CapacityReservationId',
+    'DedicatedHosts': 'HostId',
+    'ElasticIPs': 'AllocationId',
+    'KeyPairs': 'KeyName',
+    'LoadBalancers': 'Arn',
+    'PlacementGroups': 'GroupName',
+    'SecurityGroups': 'GroupId',
+    'Snapshots': 'SnapshotId',
+    'Volumes': 'VolumeId',
+}
+
+def resource_id(resource, row):
+    if resource == 'LoadBalancers' and row['Arn'] == 'N/A':
+        return f"classic/{row['Name']}" # Classic ELBs have no ARN in the list output
+    if resource == 'ElasticIPs' and not row['AllocationId']:
+        return row['PublicIp'] # EC2-Classic addresses have no allocation id
+    return row[RESOURCE_ID_KEYS[resource]]
+
+inventory_sync = InventorySync(
+    {resource: partial(fetch_rows, resource, cached=False) for resource in RESOURCE_SOURCES},
+    resource_id,
+    index_of=build_resource_index,
+    interval=float(os.environ.get('INVENTORY_SYNC_INTERVAL', '0')),
+    max_workers=int(os.environ.get('INVENTORY_SYNC_WORKERS', '4')),
+)
+if inventory_sync.enabled:
+    stats_collector.add_source(lambda: inventory_sync_metrics(inventory_sync.status()))
+
+@app.before_request
+def start_inventory_sync():
+    # Started lazily so the debug reloader's parent process and pre-fork masters don't run it.
+    inventory_sync.start()
+
+def resources_changed(*resources):
+    # Called by write routes so neither the cache nor the snapshot keeps serving the old state.
+    inventory_cache.invalidate(*resources)
+    if inventory_sync.enabled:
+        inventory_sync.request_refresh(*resources)
+
+@app.route('/api/inventory/status', methods=['GET'])
+def inventory_status():
+    return jsonify(dict(inventory_sync.status(), eventSubscribers=change_feed.subscriber_count()))
+
+# --- Live Events ---
+# GET /api/events is a Server-Sent Events stream of created/updated/deleted events, computed
+# by diffing successive inventory snapshots. Every open browser shares the one sync loop, so
+# live pages add no AWS calls. Needs the background sync (INVENTORY_SYNC_INTERVAL > 0).
+EVENTS_HEARTBEAT_SECONDS = float(os.environ.get('EVENTS_HEARTBEAT_SECONDS', '15'))
+# While an instance is pending/stopping/shutting-down, Instances are re-synced this often
+# (seconds) instead of waiting for the next full sync, so transitions show up promptly.
+INSTANCE_TRANSITION_POLL = float(os.environ.get('INSTANCE_TRANSITION_POLL', '5'))
+TRANSITIONAL_STATES = {'pending', 'stopping', 'shutting-down'}
+
+change_feed = ChangeFeed(
+    history=int(os.environ.get('EVENTS_HISTORY', '1000')),
+    max_queue=int(os.environ.get('EVENTS_QUEUE_SIZE', '1000')),
+)
+inventory_sync.add_listener(change_feed.on_publish)
+
+transition_poll_scheduled = threading.Event()
+
+def fire_transition_poll():
+    transition_poll_scheduled.clear()
+    inventory_sync.request_refresh('Instances')
+
+def poll_instance_transitions(previous, snapshot):
+    instances = snapshot.resources.get('Instances', {})
+    if transition_poll_scheduled.is_set() or INSTANCE_TRANSITION_POLL <= 0:
+        return
+    if any(row['State'] in TRANSITIONAL_STATES for row in instances.values()):
+        transition_poll_scheduled.set()
+        timer = threading.Timer(INSTANCE_TRANSITION_POLL, fire_transition_poll)
+        timer.daemon = True
+        timer.start()
+
+inventory_sync.add_listener(poll_instance_transitions)
+
+def format_event(event):
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+@app.route('/api/events', methods=['GET'])
+def stream_events():
+    if not inventory_sync.enabled:
+        return jsonify({"error": "Live events need the background inventory sync (set INVENTORY_SYNC_INTERVAL)."}), 503
+    resources = {resource for resource in request.args.get('resources', '').split(',') if resource} or None
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({"error": "Invalid Last-Event-ID."}), 400
+    subscription = change_feed.subscribe(last_event_id)
+
+    def stream():
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                event = subscription.get(timeout=EVENTS_HEARTBEAT_SECONDS)
+                if event is None:
+                    yield ': keep-alive\n\n' # Also how a closed connection gets noticed
+                elif event is OVERFLOWED:
+                    return # Too far behind; the browser reconnects and replays from history
+                elif resources is None or event['resource'] in resources:
+                    yield format_event(event)
+        finally:
+            change_feed.unsubscribe(subscription)
+
+    return Response(stream(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+# --- EC2 Overview ---
+# The overview fans its describe calls out on a small pool, and a multi-region overview on a
+# pool sized for every region it runs at once, so regions don't queue each other's counters
+# behind the same workers. Every call gets its
+# own deadline, counted from when it starts running rather than when it was queued, so the
+# page costs roughly the slowest call instead of the sum of all of them, and a single slow
+# API only blanks its own card. A call still queued after OVERVIEW_QUEUE_TIMEOUT (its pool
+# held up by earlier calls that never returned) is reported as a timeout too.
+OVERVIEW_MAX_WORKERS = int(os.environ.get('OVERVIEW_MAX_WORKERS', '8'))
+OVERVIEW_CALL_TIMEOUT = float(os.environ.get('OVERVIEW_CALL_TIMEOUT', '5'))
+OVERVIEW_QUEUE_TIMEOUT = float(os.environ.get('OVERVIEW_QUEUE_TIMEOUT', '30'))
+overview_executor = ThreadPoolExecutor(max_workers=OVERVIEW_MAX_WORKERS, thread_name_prefix='ec2-overview')
+# At most REGION_MAX_WORKERS region overviews run at once, so this one pool gives each of
+# them as many workers as the single-region overview has.
+region_overview_executor = ThreadPoolExecutor(max_workers=REGION_MAX_WORKERS * OVERVIEW_MAX_WORKERS, thread_name_prefix='ec2-overview-region')
+
+def count_instances(region=None):
+    return sum(len(reservation['Instances']) for reservation in fetch_source_items('Instances', RESOURCE_SOURCES['Instances'][0], region=region))
+
+def count_load_balancers(region=None):
+    # Combined for Classic, Application and Network. Either API failing only drops its share.
+    lb_count = 0
+    elbv2_source, elb_source = RESOURCE_SOURCES['LoadBalancers']
+    try:
+        lb_count += len(fetch_source_items('LoadBalancers', elbv2_source, region=region))
+    except Exception as e:
+        print(f"Error describing ELBv2: {e}") # Log error, don't fail overview
+
+    try:
+        lb_count += len(fetch_source_items('LoadBalancers', elb_source, region=region))
+    except Exception as e:
+        print(f"Error describing Classic ELB: {e}") # Log error, don't fail overview
+    return lb_count
 
-        # Placement Groups
-        pg_response = ec2_client.describe_placement_groups()
-        counts['PlacementGroups'] = len(pg_response['PlacementGroups'])
+def count_items(resource):
+    return lambda region=None: sum(len(fetch_source_items(resource, source, region=region)) for source in RESOURCE_SOURCES[resource])
 
-        # Security Groups
-        sg_response = ec2_client.describe_security_groups()
-        counts['SecurityGroups'] = len(sg_response['SecurityGroups'])
+OVERVIEW_COUNTERS = {
+    'Instances': count_instances,
+    'AutoScalingGroups': count_items('AutoScalingGroups'),
+    'CapacityReservations': count_items('CapacityReservations'),
+    'DedicatedHosts': count_items('DedicatedHosts'),
+    'ElasticIPs': count_items('ElasticIPs'),
+    'KeyPairs': count_items('KeyPairs'),
+    'LoadBalancers': count_load_balancers,
+    'PlacementGroups': count_items('PlacementGroups'),
+    'SecurityGroups': count_items('SecurityGroups'),
+    'Snapshots': count_items('Snapshots'),
+    'Volumes': count_items('Volumes'),
+}
 
-        # Snapshots (owned by self)
-        snapshot_response = ec2_client.describe_snapshots(OwnerIds=['self'])
-        counts['Snapshots'] = len(snapshot_response['Snapshots'])
+def snapshot_overview():
+    snapshot = inventory_sync.snapshot()
+    counts = {name: snapshot.count(name) for name in OVERVIEW_COUNTERS}
+    status = {}
+    for name in OVERVIEW_COUNTERS:
+        stat = snapshot.sync_stats.get(name, {})
+        status[name] = {'status': 'error' if stat.get('error') else 'ok', 'elapsedMs': stat.get('durationMs'), 'syncedAt': stat.get('syncedAt')}
+        if stat.get('error'):
+            status[name]['error'] = stat['error']
+    counts['ResourceStatus'] = status
+    counts['InventoryVersion'] = snapshot.version
+    return counts
 
-        # Volumes
-        volume_response = ec2_client.describe_volumes()
-        counts['Volumes'] = len(volume_response['Volumes'])
+def overview_counts(region=None):
+    pool = overview_executor if region is None else region_overview_executor
+    futures = {name: submit_started(pool, partial(counter, region)) for name, counter in OVERVIEW_COUNTERS.items()}
+    queue_deadline = time.perf_counter() + OVERVIEW_QUEUE_TIMEOUT
 
+    counts = {}
+    status = {}
+    for name, (future, started) in futures.items():
+        try:
+            counts[name], elapsed_ms = started_result(future, started, queue_deadline, OVERVIEW_CALL_TIMEOUT)
+            status[name] = {'status': 'ok', 'elapsedMs': round(elapsed_ms, 1)}
+        except FuturesTimeoutError:
+            # The call keeps running on its worker, but the page no longer waits for it.
+            counts[name] = None
+            status[name] = {'status': 'timeout', 'elapsedMs': round(OVERVIEW_CALL_TIMEOUT * 1000, 1)}
+        except Exception as e:
+            print(f"Error counting {name} for overview: {e}")
+            counts[name] = None
+            status[name] = {'status': 'error', 'error': str(e)}
+    counts['ResourceStatus'] = status
+    return counts
+
+def multi_region_overview(regions):
+    # Top-level counts are totals over the regions that answered; each region's own counts
+    # and call statuses are under Regions.
+    results, region_status = fan_out_regions(regions, overview_counts)
+    totals = {}
+    for name in OVERVIEW_COUNTERS:
+        region_counts = [results[region][name] for region in regions if region in results and results[region][name] is not None]
+        totals[name] = sum(region_counts) if region_counts else None
+    for region, status in region_status.items():
+        if region in results:
+            status.update(results[region])
+    totals['Regions'] = region_status
+    return totals
+
+@app.route('/api/ec2-overview', methods=['GET'])
+def ec2_overview():
+    try:
+        started = time.perf_counter()
+        regions = requested_regions()
+        if regions is not None:
+            counts = multi_region_overview(regions)
+        elif inventory_sync.enabled:
+            return jsonify(snapshot_overview())
+        else:
+            counts = overview_counts()
+        counts['ElapsedMs'] = round((time.perf_counter() - started) * 1000, 1)
         return jsonify(counts)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -111,26 +1059,7 @@ def ec2_overview():
 @app.route('/api/ec2-instances', methods=['GET'])
 def list_ec2_instances():
     try:
-        response = ec2_client.describe_instances()
-        instances = []
-        for reservation in response['Reservations']:
-            for instance in reservation['Instances']:
-                instance_name = 'N/A'
-                for tag in instance.get('Tags', []):
-                    if tag['Key'] == 'Name':
-                        instance_name = tag['Value']
-                        break
-
-                instances.append({
-                    'Name': instance_name,
-                    'InstanceId': instance['InstanceId'],
-                    'State': instance['State']['Name'],
-                    'InstanceType': instance['InstanceType'],
-                    'PublicIpAddress': instance.get('PublicIpAddress', 'N/A'),
-                    'PrivateIpAddress': instance.get('PrivateIpAddress', 'N/A'),
-                    'LaunchTime': instance['LaunchTime'].isoformat() # Convert datetime object to ISO format string
-                })
-        return jsonify(instances)
+        return list_resource_response('Instances')
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -138,28 +1067,125 @@ def list_ec2_instances():
 def perform_instance_action(instance_id, action):
     try:
         if action == 'start':
-            ec2_client.start_instances(InstanceIds=[instance_id])
+            clients.get('ec2').start_instances(InstanceIds=[instance_id])
             message = f"Instance {instance_id} is starting."
         elif action == 'stop':
-            ec2_client.stop_instances(InstanceIds=[instance_id])
+            clients.get('ec2').stop_instances(InstanceIds=[instance_id])
             message = f"Instance {instance_id} is stopping."
         elif action == 'terminate':
-            ec2_client.terminate_instances(InstanceIds=[instance_id])
+            clients.get('ec2').terminate_instances(InstanceIds=[instance_id])
             message = f"Instance {instance_id} is terminating."
         else:
             return jsonify({"error": "Invalid action specified."}), 400
 
+        # Terminating also detaches volumes and releases EIP associations.
+        resources_changed('Instances', 'Volumes', 'ElasticIPs')
         return jsonify({"message": message})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# --- Bulk Instance Actions ---
+# POST {"instance_ids": [...], "action": "stop"} acts on a whole fleet in one request. IDs are
+# sent in chunks, the chunks run concurrently, throttled calls are retried with backoff, and
+# every instance gets its own outcome in the response.
+BULK_ACTIONS = {
+    'start': ('start_instances', 'StartingInstances'),
+    'stop': ('stop_instances', 'StoppingInstances'),
+    'terminate': ('terminate_instances', 'TerminatingInstances'),
+}
+BULK_ACTION_CHUNK_SIZE = int(os.environ.get('BULK_ACTION_CHUNK_SIZE', '100'))
+BULK_ACTION_MAX_WORKERS = int(os.environ.get('BULK_ACTION_MAX_WORKERS', '4'))
+BULK_ACTION_MAX_RETRIES = int(os.environ.get('BULK_ACTION_MAX_RETRIES', '5'))
+BULK_ACTION_MAX_INSTANCES = int(os.environ.get('BULK_ACTION_MAX_INSTANCES', '1000'))
+# Errors caused by individual IDs fail the whole call; the chunk is split to isolate them.
+PER_INSTANCE_ERROR_CODES = {
+    'InvalidInstanceID.NotFound', 'InvalidInstanceID.Malformed', 'IncorrectInstanceState',
+    'UnsupportedOperation', 'OperationNotPermitted',
+}
+bulk_action_executor = ThreadPoolExecutor(max_workers=BULK_ACTION_MAX_WORKERS, thread_name_prefix='bulk-action')
+# With client retries on (AWS_MAX_ATTEMPTS > 1), botocore has already backed off and retried a
+# throttled call before its ClientError gets here; retrying it again would multiply the attempts.
+RETRY_THROTTLED_CALLS = aws_client_config.retries.get('max_attempts', 1) <= 1
+
+def call_with_backoff(fn, **kwargs):
+    for attempt in range(BULK_ACTION_MAX_RETRIES + 1):
+        try:
+            return fn(**kwargs)
+        except ClientError as e:
+            throttled = e.response['Error']['Code'] in THROTTLING_ERROR_CODES
+            if not (throttled and RETRY_THROTTLED_CALLS) or attempt == BULK_ACTION_MAX_RETRIES:
+                raise
+            time.sleep(min(10.0, 0.2 * 2 ** attempt) * random.uniform(0.5, 1.0)) # Exponential backoff with jitter
+        except RateLimitExceeded as e:
+            # Shed locally before reaching AWS; a bulk job would rather wait its turn.
+            if attempt == BULK_ACTION_MAX_RETRIES:
+                raise
+            time.sleep(e.retry_after * random.uniform(1.0, 1.5))
+
+def run_instance_action_chunk(action, instance_ids):
+    operation, result_key = BULK_ACTIONS[action]
+    try:
+        response = call_with_backoff(getattr(clients.get('ec2'), operation), InstanceIds=instance_ids)
+    except ClientError as e:
+        code = e.response['Error']['Code']
+        if code in PER_INSTANCE_ERROR_CODES and len(instance_ids) > 1:
+            middle = len(instance_ids) // 2
+            return run_instance_action_chunk(action, instance_ids[:middle]) + run_instance_action_chunk(action, instance_ids[middle:])
+        return [{'InstanceId': instance_id, 'status': 'error', 'error': str(e)} for instance_id in instance_ids]
+    except Exception as e:
+        return [{'InstanceId': instance_id, 'status': 'error', 'error': str(e)} for instance_id in instance_ids]
+
+    changes = {change['InstanceId']: change for change in response.get(result_key, [])}
+    results = []
+    for instance_id in instance_ids:
+        change = changes.get(instance_id, {})
+        results.append({
+            'InstanceId': instance_id,
+            'status': 'ok',
+            'PreviousState': change.get('PreviousState', {}).get('Name'),
+            'CurrentState': change.get('CurrentState', {}).get('Name'),
+        })
+    return results
+
+@app.route('/api/ec2-instances/action', methods=['POST'])
+def perform_bulk_instance_action():
+    data = request.json or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object."}), 400
+    action = data.get('action')
+    instance_ids = data.get('instance_ids')
+
+    if action not in BULK_ACTIONS:
+        return jsonify({"error": "Invalid action specified."}), 400
+    if not isinstance(instance_ids, list) or not instance_ids:
+        return jsonify({"error": "instance_ids must be a non-empty list of instance IDs."}), 400
+    if not all(isinstance(instance_id, str) and instance_id for instance_id in instance_ids):
+        return jsonify({"error": "Every instance ID must be a non-empty string."}), 400
+    instance_ids = list(dict.fromkeys(instance_ids))
+    if len(instance_ids) > BULK_ACTION_MAX_INSTANCES:
+        return jsonify({"error": f"At most {BULK_ACTION_MAX_INSTANCES} instance IDs per request."}), 400
+
+    try:
+        chunks = [instance_ids[i:i + BULK_ACTION_CHUNK_SIZE] for i in range(0, len(instance_ids), BULK_ACTION_CHUNK_SIZE)]
+        futures = [bulk_action_executor.submit(run_instance_action_chunk, action, chunk) for chunk in chunks]
+        results = [result for future in futures for result in future.result()]
+        resources_changed('Instances', 'Volumes', 'ElasticIPs')
+
+        failed = sum(1 for result in results if result['status'] != 'ok')
+        return jsonify({
+            'action': action,
+            'results': results,
+            'succeeded': len(results) - failed,
+            'failed': failed,
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 # --- Key Pairs ---
 @app.route('/api/key-pairs', methods=['GET'])
 def list_key_pairs():
     try:
-        response = ec2_client.describe_key_pairs()
-        keys = [{'KeyName': kp['KeyName'], 'KeyFingerprint': kp.get('KeyFingerprint', 'N/A')} for kp in response['KeyPairs']]
-        return jsonify(keys)
+        return list_resource_response('KeyPairs')
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -169,7 +1195,8 @@ def create_key_pair():
     if not key_name:
         return jsonify({"error": "Key name is required."}), 400
     try:
-        response = ec2_client.create_key_pair(KeyName=key_name)
+        response = clients.get('ec2').create_key_pair(KeyName=key_name)
+        resources_changed('KeyPairs')
         return jsonify({"message": f"Key pair '{key_name}' created successfully."})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -177,7 +1204,8 @@ def create_key_pair():
 @app.route('/api/key-pair/<key_name>/delete', methods=['POST'])
 def delete_key_pair(key_name):
     try:
-        ec2_client.delete_key_pair(KeyName=key_name)
+        clients.get('ec2').delete_key_pair(KeyName=key_name)
+        resources_changed('KeyPairs')
         return jsonify({"message": f"Key pair '{key_name}' deleted successfully."})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -186,18 +1214,7 @@ def delete_key_pair(key_name):
 @app.route('/api/security-groups', methods=['GET'])
 def list_security_groups():
     try:
-        response = ec2_client.describe_security_groups()
-        sgs = []
-        for sg in response['SecurityGroups']:
-            sgs.append({
-                'GroupName': sg.get('GroupName'),
-                'GroupId': sg.get('GroupId'),
-                'Description': sg.get('Description'),
-                'VpcId': sg.get('VpcId'),
-                'IpPermissions': sg.get('IpPermissions', []),
-                'IpPermissionsEgress': sg.get('IpPermissionsEgress', []),
-            })
-        return jsonify(sgs)
+        return list_resource_response('SecurityGroups')
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -212,11 +1229,12 @@ def create_security_group():
         return jsonify({"error": "Group name and VPC ID are required."}), 400
 
     try:
-        response = ec2_client.create_security_group(
+        response = clients.get('ec2').create_security_group(
             GroupName=group_name,
             Description=description,
             VpcId=vpc_id
         )
+        resources_changed('SecurityGroups')
         return jsonify({"message": f"Security Group '{group_name}' created successfully with ID: {response['GroupId']}."})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -224,31 +1242,89 @@ def create_security_group():
 @app.route('/api/security-group/<group_id>/delete', methods=['POST'])
 def delete_security_group(group_id):
     try:
-        ec2_client.delete_security_group(GroupId=group_id)
+        clients.get('ec2').delete_security_group(GroupId=group_id)
+        resources_changed('SecurityGroups')
         return jsonify({"message": f"Security Group '{group_id}' deleted successfully."})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# --- Security Group Exposure ---
+# GET /api/security-groups/exposure?port=22&source=0.0.0.0/0 lists the rules that admit that
+# traffic, answered from a rule index (port interval tree, CIDR prefix tables) built once per
+# version of the security groups. Parameters:
+#   port=22 or port=8000-8100    rules whose port range overlaps it
+#   protocol=tcp|udp|icmp|<number>    rules for that protocol or for all protocols
+#   source=10.1.2.3, 10.0.0.0/8, sg-... or pl-...    rules whose source covers it
+#   match=overlaps    also rules whose CIDR merely overlaps the source
+#   direction=egress    outbound rules instead of inbound
+# ?regions= works as on the list routes.
+def parse_exposure_query(args):
+    query = {'direction': args.get('direction', 'ingress'), 'match': args.get('match', 'covers')}
+    if query['direction'] not in ('ingress', 'egress'):
+        raise ValueError("direction must be ingress or egress.")
+    if query['match'] not in ('covers', 'overlaps'):
+        raise ValueError("match must be covers or overlaps.")
+    if args.get('protocol'):
+        query['protocol'] = args['protocol']
+    if args.get('port'):
+        low, _, high = args['port'].partition('-')
+        try:
+            ports = (int(low), int(high or low))
+        except ValueError:
+            raise ValueError("port must be a number or a range like 8000-8100.")
+        if not 0 <= ports[0] <= ports[1] <= 65535:
+            raise ValueError("port must be within 0-65535.")
+        query['ports'] = ports
+    source = args.get('source')
+    if source:
+        if not source.startswith(('sg-', 'pl-')) and parse_cidr(source) is None:
+            raise ValueError("source must be an IP address, a CIDR block or a security group / prefix list id.")
+        query['source'] = source
+    if not any(key in query for key in ('protocol', 'ports', 'source')):
+        raise ValueError("Give at least one of port, protocol or source.")
+    return query
+
+def exposure_index(region=None):
+    # Cached next to the describe results it is built from (invalidated with them); with the
+    # sync on, keyed by the snapshot's security group version.
+    if uses_snapshot(region):
+        snapshot = inventory_sync.snapshot()
+        key = ('ExposureIndex', aws_region, snapshot.type_versions.get('SecurityGroups'))
+        load = lambda: ExposureIndex(snapshot.rows('SecurityGroups'))
+    else:
+        key = ('ExposureIndex', region or aws_region)
+        load = lambda: ExposureIndex(fetch_rows('SecurityGroups', region=region))
+    return inventory_cache.get_or_load(key, lambda: upstream_calls.do(key, load), CACHE_TTLS.get('SecurityGroups', 0), tags=('SecurityGroups',))
+
+@app.route('/api/security-groups/exposure', methods=['GET'])
+def security_group_exposure():
+    try:
+        started = time.perf_counter()
+        query = parse_exposure_query(request.args)
+        regions = requested_regions()
+        if regions is not None:
+            results, status = fan_out_regions(regions, lambda region: exposure_index(region).query(**query))
+            items = [dict(match, Region=region) for region in regions for match in results.get(region, [])]
+            payload = {'items': items, 'regions': status}
+        else:
+            index = exposure_index()
+            items = index.query(**query)
+            payload = {'items': items, 'rulesIndexed': index.rule_count}
+        payload['groupCount'] = len({item['GroupId'] for item in items})
+        payload['elapsedMs'] = round((time.perf_counter() - started) * 1000, 1)
+        return jsonify(payload)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except RateLimitExceeded as e:
+        return rate_limited_response(e)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 # --- Auto Scaling Groups ---
 @app.route('/api/auto-scaling-groups', methods=['GET'])
 def list_auto_scaling_groups():
     try:
-        response = autoscaling_client.describe_auto_scaling_groups()
-        asgs = []
-        for asg in response['AutoScalingGroups']:
-            asgs.append({
-                'AutoScalingGroupName': asg.get('AutoScalingGroupName'),
-                'MinSize': asg.get('MinSize'),
-                'MaxSize': asg.get('MaxSize'),
-                'DesiredCapacity': asg.get('DesiredCapacity'),
-                'LaunchConfigurationName': asg.get('LaunchConfigurationName', asg.get('LaunchTemplate', {}).get('LaunchTemplateName')),
-                'HealthCheckType': asg.get('HealthCheckType'),
-                'HealthCheckGracePeriod': asg.get('HealthCheckGracePeriod'),
-                'CreatedTime': asg.get('CreatedTime').isoformat() if asg.get('CreatedTime') else 'N/A',
-                'Status': asg.get('Status', 'N/A'),
-                'Instances': [{'InstanceId': inst.get('InstanceId'), 'LifecycleState': inst.get('LifecycleState')} for inst in asg.get('Instances', [])]
-            })
-        return jsonify(asgs)
+        return list_resource_response('AutoScalingGroups')
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -256,60 +1332,51 @@ def list_auto_scaling_groups():
 @app.route('/api/load-balancers', methods=['GET'])
 def list_load_balancers():
     try:
-        lbs = []
-        # Describe Application/Network Load Balancers (ELBv2)
-        elbv2_response = elbv2_client.describe_load_balancers()
-        for lb in elbv2_response['LoadBalancers']:
-            lbs.append({
-                'Name': lb.get('LoadBalancerName'),
-                'Type': lb.get('Type').capitalize(),
-                'DNSName': lb.get('DNSName'),
-                'State': lb.get('State', {}).get('Code'),
-                'VpcId': lb.get('VpcId'),
-                'CreatedTime': lb.get('CreatedTime').isoformat() if lb.get('CreatedTime') else 'N/A',
-                'Arn': lb.get('LoadBalancerArn')
-            })
-
-        # Describe Classic Load Balancers (ELB)
-        elb_response = elb_client.describe_load_balancers()
-        for lb in elb_response['LoadBalancerDescriptions']:
-            lbs.append({
-                'Name': lb.get('LoadBalancerName'),
-                'Type': 'Classic',
-                'DNSName': lb.get('DNSName'),
-                'State': 'N/A',
-                'VpcId': lb.get('VPCId'),
-                'CreatedTime': lb.get('CreatedTime').isoformat() if lb.get('CreatedTime') else 'N/A',
-                'Arn': 'N/A'
-            })
-
-        return jsonify(lbs)
+        return list_resource_response('LoadBalancers')
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# GET /api/load-balancers/details adds tags, target groups with per-target health (ELBv2) and
+# instance health (classic) to every load balancer, fetched in batches and concurrently on
+# a bounded pool (see lb_details.py) and cached like the list. ?regions= works as on the
+# list routes.
+LB_DETAIL_MAX_WORKERS = int(os.environ.get('LB_DETAIL_MAX_WORKERS', '8'))
+lb_detail_executor = ThreadPoolExecutor(max_workers=LB_DETAIL_MAX_WORKERS, thread_name_prefix='lb-details')
+
+def cached_load_balancer_details(region=None):
+    key = ('LoadBalancerDetails', region or aws_region)
+    load = lambda: load_balancer_details(
+        resource_rows('LoadBalancers', region=region),
+        clients.get('elbv2', region), clients.get('elb', region), lb_detail_executor,
+    )
+    return inventory_cache.get_or_load(key, lambda: upstream_calls.do(key, load), CACHE_TTLS.get('LoadBalancers', 0), tags=('LoadBalancers',))
+
+@app.route('/api/load-balancers/details', methods=['GET'])
+def load_balancer_details_route():
+    try:
+        started = time.perf_counter()
+        regions = requested_regions()
+        if regions is not None:
+            results, status = fan_out_regions(regions, cached_load_balancer_details)
+            items = [dict(row, Region=region) for region in regions for row in results.get(region, [])]
+            payload = {'items': items, 'regions': status}
+        else:
+            payload = {'items': cached_load_balancer_details()}
+        payload['elapsedMs'] = round((time.perf_counter() - started) * 1000, 1)
+        return jsonify(payload)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except RateLimitExceeded as e:
+        return rate_limited_response(e)
     except Exception as e:
+        print(f"Error describing load balancer details: {e}")
         return jsonify({"error": str(e)}), 500
 
 # --- Snapshots ---
 @app.route('/api/snapshots', methods=['GET'])
 def list_snapshots():
     try:
-        response = ec2_client.describe_snapshots(OwnerIds=['self'])
-        snapshots = []
-        for snapshot in response['Snapshots']:
-            snapshot_name = 'N/A'
-            for tag in snapshot.get('Tags', []):
-                if tag['Key'] == 'Name':
-                    snapshot_name = tag['Value']
-                    break
-
-            snapshots.append({
-                'SnapshotId': snapshot.get('SnapshotId'),
-                'VolumeId': snapshot.get('VolumeId'),
-                'State': snapshot.get('State'),
-                'StartTime': snapshot.get('StartTime').isoformat() if snapshot.get('StartTime') else 'N/A',
-                'VolumeSize': snapshot.get('VolumeSize'),
-                'Description': snapshot.get('Description'),
-                'Name': snapshot_name
-            })
-        return jsonify(snapshots)
+        return list_resource_response('Snapshots')
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -317,27 +1384,7 @@ def list_snapshots():
 @app.route('/api/volumes', methods=['GET'])
 def list_volumes():
     try:
-        response = ec2_client.describe_volumes()
-        volumes = []
-        for volume in response['Volumes']:
-            volume_name = 'N/A'
-            for tag in volume.get('Tags', []):
-                if tag['Key'] == 'Name':
-                    volume_name = tag['Value']
-                    break
-
-            volumes.append({
-                'VolumeId': volume.get('VolumeId'),
-                'Size': volume.get('Size'),
-                'AvailabilityZone': volume.get('AvailabilityZone'),
-                'State': volume.get('State'),
-                'VolumeType': volume.get('VolumeType'),
-                'CreateTime': volume.get('CreateTime').isoformat() if volume.get('CreateTime') else 'N/A',
-                'SnapshotId': volume.get('SnapshotId', 'N/A'),
-                'Name': volume_name,
-                'Attachments': [{'InstanceId': att.get('InstanceId'), 'Device': att.get('Device')} for att in volume.get('Attachments', [])]
-            })
-        return jsonify(volumes)
+        return list_resource_response('Volumes')
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -346,18 +1393,7 @@ def list_volumes():
 @app.route('/api/elastic-ips', methods=['GET'])
 def list_elastic_ips():
     try:
-        response = ec2_client.describe_addresses()
-        eips = []
-        for eip in response['Addresses']:
-            eips.append({
-                'PublicIp': eip.get('PublicIp'),
-                'AllocationId': eip.get('AllocationId'),
-                'AssociationId': eip.get('AssociationId', 'N/A'),
-                'InstanceId': eip.get('InstanceId', 'N/A'),
-                'PrivateIpAddress': eip.get('PrivateIpAddress', 'N/A'),
-                'Domain': eip.get('Domain'),
-            })
-        return jsonify(eips)
+        return list_resource_response('ElasticIPs')
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -366,21 +1402,7 @@ def list_elastic_ips():
 @app.route('/api/capacity-reservations', methods=['GET'])
 def list_capacity_reservations():
     try:
-        response = ec2_client.describe_capacity_reservations()
-        crs = []
-        for cr in response['CapacityReservations']:
-            crs.append({
-                'CapacityReservationId': cr.get('CapacityReservationId'),
-                'InstanceType': cr.get('InstanceType'),
-                'InstancePlatform': cr.get('InstancePlatform'),
-                'AvailabilityZone': cr.get('AvailabilityZone'),
-                'TotalInstanceCount': cr.get('TotalInstanceCount'),
-                'AvailableInstanceCount': cr.get('AvailableInstanceCount'),
-                'State': cr.get('State'),
-                'CreateDate': cr.get('CreateDate').isoformat() if cr.get('CreateDate') else 'N/A',
-                'EndDate': cr.get('EndDate').isoformat() if cr.get('EndDate') else 'N/A',
-            })
-        return jsonify(crs)
+        return list_resource_response('CapacityReservations')
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -388,18 +1410,7 @@ def list_capacity_reservations():
 @app.route('/api/dedicated-hosts', methods=['GET'])
 def list_dedicated_hosts():
     try:
-        response = ec2_client.describe_hosts()
-        hosts = []
-        for host in response['Hosts']:
-            hosts.append({
-                'HostId': host.get('HostId'),
-                'InstanceType': host.get('InstanceType'),
-                'AvailabilityZone': host.get('AvailabilityZone'),
-                'AllocationState': host.get('AllocationState'),
-                'AvailableCapacity': host.get('AvailableCapacity'),
-                'AllocationTime': host.get('AllocationTime').isoformat() if host.get('AllocationTime') else 'N/A',
-            })
-        return jsonify(hosts)
+        return list_resource_response('DedicatedHosts')
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -407,97 +1418,184 @@ def list_dedicated_hosts():
 @app.route('/api/placement-groups', methods=['GET'])
 def list_placement_groups():
     try:
-        response = ec2_client.describe_placement_groups()
-        p_groups = []
-        for pg in response['PlacementGroups']:
-            p_groups.append({
-                'GroupName': pg.get('GroupName'),
-                'GroupId': pg.get('GroupId'),
-                'Strategy': pg.get('Strategy'),
-                'State': pg.get('State'),
-                'InstanceCount': pg.get('InstanceCount'),
-            })
-        return jsonify(p_groups)
+        return list_resource_response('PlacementGroups')
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-# --- EC2 Free Tier Usage Monitoring ---
-@app.route('/api/ec2-free-tier-usage', methods=['GET'])
-def get_ec2_free_tier_usage():
+# --- Waste Report ---
+# Orphaned volumes, volumes of stopped instances, snapshots whose volume is gone and idle
+# Elastic IPs, found by hash-joining the five lists (see waste_report.py). The report is
+# memoized per version of its inputs like a list response. Its reads run on a pool of their
+# own, so a cold report never holds the workers the overview counters wait on.
+WASTE_RESOURCES = ['Instances', 'Volumes', 'Snapshots', 'ElasticIPs', 'AutoScalingGroups']
+JOIN_MAX_WORKERS = int(os.environ.get('JOIN_MAX_WORKERS', '5'))
+join_executor = ThreadPoolExecutor(max_workers=JOIN_MAX_WORKERS, thread_name_prefix='inventory-join')
+
+@app.route('/api/waste-report', methods=['GET'])
+def get_waste_report():
     try:
-        today = datetime.now()
-        start_date = today.replace(day=1).strftime('%Y-%m-%d')
-        end_date = today.strftime('%Y-%m-%d')
-
-        usage_types = [
-            "BoxUsage:t2.micro", "BoxUsage:t3.micro", "BoxUsage:t2.micro:windows",
-            "BoxUsage:t3.micro:windows", "BoxUsage:t2.micro:rhel", "BoxUsage:t3.micro:rhel",
-            "BoxUsage:t2.micro:sles", "BoxUsage:t3.micro:sles",
-        ]
-
-        response = ce_client.get_cost_and_usage(
-            TimePeriod={ 'Start': start_date, 'End': end_date },
-            Granularity='DAILY',
-            Metrics=['UsageQuantity'],
-            Filter={"Or": [{"Dimensions": {"Key": "USAGE_TYPE", "Values": usage_types}},
-                          {"Dimensions": {"Key": "INSTANCE_TYPE", "Values": ["t2.micro", "t3.micro"]}}]},
-            GroupBy=[{"Type": "DIMENSION", "Key": "USAGE_TYPE"}]
-        )
+        versions = tuple(data_version(resource) for resource in WASTE_RESOURCES)
+        version = None if None in versions else versions
 
-        daily_usage_data = {}
-        total_current_month_usage = 0.0
+        def build():
+            # The five reads run concurrently; cached or synced types return at once.
+            futures = [join_executor.submit(resource_rows, resource) for resource in WASTE_RESOURCES]
+            return waste_report(*(future.result() for future in futures))
+        return versioned_json(version, build)
+    except RateLimitExceeded as e:
+        return rate_limited_response(e)
+    except Exception as e:
+        print(f"Error building waste report: {e}")
+        return jsonify({"error": str(e)}), 500
 
-        for result_by_time in response['ResultsByTime']:
-            date = result_by_time['TimePeriod']['Start']
-            daily_total_hours = 0.0
-            for group in result_by_time['Groups']:
-                usage_quantity = float(group['Metrics']['UsageQuantity']['Amount'])
-                daily_total_hours += usage_quantity
-                total_current_month_usage += usage_quantity
-            daily_usage_data[date] = daily_total_hours
-
-        chart_labels = []
-        chart_data = []
-        current_day = today.replace(day=1)
-        while current_day <= today:
-            date_str = current_day.strftime('%Y-%m-%d')
-            chart_labels.append(current_day.strftime('%b %d'))
-            chart_data.append(daily_usage_data.get(date_str, 0.0))
-            current_day += timedelta(days=1)
-
-        free_tier_limit_hours = 750
+# --- Tag Search ---
+# GET /api/search?tag=Team:payments&tag=Env:prod finds instances, volumes, snapshots,
+# security groups and load balancers by tag from one inverted index (see tag_index.py).
+# Parameters:
+#   tag=Key:Value or Key=Value (repeatable; tag=Key matches any value)
+#   op=and (every tag, the default) or op=or (any of them)
+#   type=Instances,Volumes    only these resource types
+# ?regions= works as on the list routes. The index is cached like the rows it is built from
+# and rebuilt when any of them changes.
+TAG_SEARCH_RESOURCES = {
+    'Instances': 'Name',
+    'Volumes': 'Name',
+    'Snapshots': 'Name',
+    'SecurityGroups': 'GroupName',
+    'LoadBalancers': 'Name',
+}
 
-        return jsonify({
-            "labels": chart_labels,
-            "data": chart_data,
-            "totalCurrentMonthUsage": round(total_current_month_usage, 2),
-            "freeTierLimitHours": free_tier_limit_hours,
-            "remainingHours": round(free_tier_limit_hours - total_current_month_usage, 2)
-        })
+def cached_load_balancer_tags(region=None):
+    # The list rows carry no tags; they come from describe_tags, 20 load balancers per call.
+    key = ('LoadBalancerTags', region or aws_region)
+    load = lambda: load_balancer_tags(
+        resource_rows('LoadBalancers', region=region),
+        clients.get('elbv2', region), clients.get('elb', region), lb_detail_executor,
+    )
+    return inventory_cache.get_or_load(key, lambda: upstream_calls.do(key, load), CACHE_TTLS.get('LoadBalancers', 0), tags=('LoadBalancers',))
+
+def build_tag_index(region=None):
+    # On the join pool (see Waste Report), so a cold build never holds the overview's workers.
+    futures = {resource: join_executor.submit(resource_rows, resource, None, region) for resource in TAG_SEARCH_RESOURCES}
+    lb_tags = cached_load_balancer_tags(region)
+    documents = []
+    for resource, name_field in TAG_SEARCH_RESOURCES.items():
+        for row in futures[resource].result():
+            if resource == 'LoadBalancers':
+                tags = lb_tags.get(row['Name'] if row['Type'] == 'Classic' else row['Arn'], {})
+            else:
+                tags = row.get('Tags') or {}
+            if tags:
+                documents.append((resource, resource_id(resource, row), row.get(name_field), tags))
+    return TagIndex(documents)
+
+def tag_index(region=None):
+    if uses_snapshot(region):
+        # Load balancer tags aren't part of the snapshot, so they still age out on their TTL.
+        snapshot = inventory_sync.snapshot()
+        key = ('TagIndex', aws_region, tuple(snapshot.type_versions.get(resource) for resource in TAG_SEARCH_RESOURCES))
+        ttl = CACHE_TTLS.get('LoadBalancers', 0)
+    else:
+        key = ('TagIndex', region or aws_region)
+        ttl = min(CACHE_TTLS.get(resource, 0) for resource in TAG_SEARCH_RESOURCES)
+    return inventory_cache.get_or_load(key, lambda: upstream_calls.do(key, lambda: build_tag_index(region)), ttl, tags=tuple(TAG_SEARCH_RESOURCES))
+
+def parse_search_query(args):
+    tags = [parse_tag_filter(value) for value in args.getlist('tag') if value]
+    if not tags:
+        raise ValueError("Give at least one tag, e.g. tag=Team:payments.")
+    op = args.get('op', 'and').lower()
+    if op not in ('and', 'or'):
+        raise ValueError("op must be and or or.")
+    resources = None
+    if args.get('type'):
+        resources = [value.strip() for value in args['type'].split(',') if value.strip()]
+        unknown = [resource for resource in resources if resource not in TAG_SEARCH_RESOURCES]
+        if unknown:
+            raise ValueError(f"type must be among: {', '.join(TAG_SEARCH_RESOURCES)}.")
+    return {'tags': tags, 'match': 'all' if op == 'and' else 'any', 'resources': resources}
+
+@app.route('/api/search', methods=['GET'])
+def search_by_tag():
+    try:
+        started = time.perf_counter()
+        query = parse_search_query(request.args)
+        regions = requested_regions()
+        if regions is not None:
+            results, status = fan_out_regions(regions, lambda region: tag_index(region).search(**query))
+            items = [dict(item, Region=region) for region in regions for item in results.get(region, [])]
+            payload = {'items': items, 'regions': status}
+        else:
+            payload = {'items': tag_index().search(**query)}
+        counts = {}
+        for item in payload['items']:
+            counts[item['ResourceType']] = counts.get(item['ResourceType'], 0) + 1
+        payload['counts'] = counts
+        payload['elapsedMs'] = round((time.perf_counter() - started) * 1000, 1)
+        return jsonify(payload)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except RateLimitExceeded as e:
+        return rate_limited_response(e)
+    except Exception as e:
+        print(f"Error searching by tag: {e}")
+        return jsonify({"error": str(e)}), 500
+
+# --- Cost Explorer Result Store ---
+# Cost Explorer bills per request. Closed days and months are kept permanently in a local
+# SQLite file; only the open period is re-queried, once COST_OPEN_PERIOD_TTL has passed.
+# Long ranges are fetched as windows, COST_FETCH_CONCURRENCY at a time, following every page.
+cost_store = CostStore(
+    os.environ.get('COST_STORE_PATH', os.path.join(BASE_DIR, 'cost_explorer_cache.sqlite3')),
+    open_period_ttl=float(os.environ.get('COST_OPEN_PERIOD_TTL', '3600')),
+    max_concurrency=int(os.environ.get('COST_FETCH_CONCURRENCY', '4')),
+)
+stats_collector.add_cache('cost_explorer', cost_store.stats)
 
+# --- EC2 Free Tier Usage Monitoring ---
+# Month-to-date t2/t3.micro hours, their running total and a projection of month-end usage
+# and of the day the 750-hour limit is crossed (see free_tier.py).
+free_tier_tracker = FreeTierTracker(cost_store, burn_window_days=int(os.environ.get('FREE_TIER_BURN_WINDOW_DAYS', '7')))
+
+@app.route('/api/ec2-free-tier-usage', methods=['GET'])
+def get_ec2_free_tier_usage():
+    try:
+        return jsonify(free_tier_tracker.usage(clients.get('ce'), datetime.utcnow().date()))
     except Exception as e:
         print(f"Error fetching EC2 Free Tier usage: {e}")
         return jsonify({"error": str(e)}), 500
 
 # --- AWS Cost Explorer General Cost Data ---
+# The default range starts on the first of the month about six months back, so the
+# closed months in it keep the same cache key from one day to the next.
+def default_cost_start():
+    return (datetime.now() - timedelta(days=180)).replace(day=1).strftime('%Y-%m-%d')
+
+def cost_date_range(args):
+    # startDate and endDate (exclusive), YYYY-MM-DD; malformed or reversed ranges are a 400.
+    start_date = args.get('startDate') or default_cost_start()
+    end_date = args.get('endDate') or datetime.now().strftime('%Y-%m-%d')
+    for name, value in (('startDate', start_date), ('endDate', end_date)):
+        try:
+            valid = datetime.strptime(value, '%Y-%m-%d').strftime('%Y-%m-%d') == value
+        except ValueError:
+            valid = False
+        if not valid:
+            raise ValueError(f"{name} must be a date in YYYY-MM-DD form.")
+    if start_date >= end_date:
+        raise ValueError("startDate must be before endDate.")
+    return start_date, end_date
+
 @app.route('/api/aws-cost-explorer', methods=['GET'])
 def get_aws_cost_explorer_data():
     try:
-        end_date = datetime.now().strftime('%Y-%m-%d')
-        start_date = (datetime.now() - timedelta(days=180)).strftime('%Y-%m-%d')
-
-        if request.args:
-            params = request.args
-            if 'startDate' in params:
-                start_date = params['startDate']
-            if 'endDate' in params:
-                end_date = params['endDate']
-
-        response = ce_client.get_cost_and_usage(
-            TimePeriod={ 'Start': start_date, 'End': end_date },
-            Granularity='MONTHLY',
-            Metrics=['UnblendedCost'],
-            GroupBy=[{'Type': 'DIMENSION', 'Key': 'SERVICE'}]
+        start_date, end_date = cost_date_range(request.args)
+
+        response = cost_store.get_cost_and_usage(
+            clients.get('ce'), start_date, end_date,
+            granularity='MONTHLY',
+            metrics=['UnblendedCost'],
+            group_by=[{'Type': 'DIMENSION', 'Key': 'SERVICE'}]
         )
 
         results = []
@@ -516,10 +1614,111 @@ def get_aws_cost_explorer_data():
 
         return jsonify(results)
 
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         print(f"Error fetching AWS Cost Explorer data: {e}")
         return jsonify({"error": str(e)}), 500
 
+# --- Cost Explorer Pivots ---
+# The same per-service costs pivoted on the server into a services x periods matrix (see
+# cost_pivot.py), so the page receives what the chart draws rather than one row per service
+# and period. Parameters, on every route:
+#   startDate, endDate    as /api/aws-cost-explorer (default: the last 180 days)
+#   granularity=MONTHLY|DAILY
+#   top=N    keep the N most expensive services and fold the rest into "Other"
+# /rolling also takes window=N (periods, default 3).
+COST_GRANULARITIES = ('MONTHLY', 'DAILY')
+
+def positive_int_arg(args, name, default=None):
+    value = args.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a positive integer.")
+    if value < 1:
+        raise ValueError(f"{name} must be a positive integer.")
+    return value
+
+def cost_frame(args):
+    start_date, end_date = cost_date_range(args)
+    granularity = args.get('granularity', 'MONTHLY').upper()
+    if granularity not in COST_GRANULARITIES:
+        raise ValueError("granularity must be MONTHLY or DAILY.")
+    response = cost_store.get_cost_and_usage(
+        clients.get('ce'), start_date, end_date,
+        granularity=granularity,
+        metrics=['UnblendedCost'],
+        group_by=[{'Type': 'DIMENSION', 'Key': 'SERVICE'}]
+    )
+    return CostFrame.from_results(response['ResultsByTime'])
+
+def cost_pivot_response(view):
+    try:
+        frame = cost_frame(request.args)
+        return jsonify(view(frame, positive_int_arg(request.args, 'top')))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"Error pivoting AWS Cost Explorer data: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/aws-cost-explorer/matrix', methods=['GET'])
+def get_cost_matrix():
+    return cost_pivot_response(lambda frame, top: frame.top(top).matrix())
+
+@app.route('/api/aws-cost-explorer/top-services', methods=['GET'])
+def get_cost_top_services():
+    # Totals over the whole range; top defaults to 5 here.
+    return cost_pivot_response(lambda frame, top: frame.top_services(top or 5))
+
+@app.route('/api/aws-cost-explorer/deltas', methods=['GET'])
+def get_cost_deltas():
+    return cost_pivot_response(lambda frame, top: frame.top(top).deltas())
+
+@app.route('/api/aws-cost-explorer/rolling', methods=['GET'])
+def get_cost_rolling():
+    return cost_pivot_response(lambda frame, top: frame.top(top).rolling(positive_int_arg(request.args, 'window', 3)))
+
+# --- Startup ---
+# AWS_CLIENT_PREWARM=1 (or a comma-separated list of services) creates the clients, with their
+# service models, at the end of import. Under gunicorn --preload that happens once in the
+# master and the forked workers share the parsed models copy-on-write instead of each
+# parsing their own; gc.freeze() keeps the collector from touching (and so copying) those
+# pages. Nothing connects to AWS before a request does, so forking afterwards is safe.
+# GET /api/aws-clients/status and /metrics report the import and first-request times.
+DEFAULT_CLIENT_SERVICES = ['ec2', 'autoscaling', 'elbv2', 'elb', 'ce']
+CLIENT_PREWARM = os.environ.get('AWS_CLIENT_PREWARM', '').strip()
+if CLIENT_PREWARM:
+    clients.warm(DEFAULT_CLIENT_SERVICES if CLIENT_PREWARM.lower() in ('1', 'true', 'all') else [
+        service.strip() for service in CLIENT_PREWARM.split(',') if service.strip()
+    ])
+    gc.freeze()
+
+IMPORT_SECONDS = time.perf_counter() - IMPORT_STARTED
+first_request_seconds = None
+first_request_lock = threading.Lock()
+
+def mark_first_request():
+    # Called on every request (by the async server too); only the first one records. In a
+    # pre-forked worker the time includes what was spent in the master before the fork.
+    global first_request_seconds
+    if first_request_seconds is not None:
+        return
+    with first_request_lock:
+        if first_request_seconds is None:
+            first_request_seconds = time.perf_counter() - IMPORT_STARTED
+
+def startup_stats():
+    return {
+        'importSeconds': round(IMPORT_SECONDS, 3),
+        'importToFirstRequestSeconds': round(first_request_seconds, 3) if first_request_seconds is not None else None,
+        'prewarmed': bool(CLIENT_PREWARM),
+    }
+
+stats_collector.add_source(lambda: startup_metrics(startup_stats()))
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0')
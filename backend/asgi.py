@@ -0,0 +1,463 @@
+# backend/asgi.py
+# Async serving mode: `uvicorn asgi:app` (the Dockerfile runs it when SERVER_MODE=async).
+#
+# The inventory list routes, the overview and the event stream are served natively here.
+# Their AWS calls go through aiobotocore, so one worker keeps hundreds of dashboard requests
+# in flight while they wait on AWS instead of pinning a thread each. Every other route
+# (writes, Cost Explorer, the pages) is the Flask app itself behind a WSGI bridge. Both
+# halves share the cache, the inventory sync and the response memo, and the async routes
+# send the same JSON, byte for byte, as their Flask versions. The CPU-bound steps (shaping
+# rows, building and querying indexes, serializing, hashing and compressing) run on the thread
+# pool, so one cold request on a large account never stalls the loop's other connections,
+# event streams included.
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Mount, Route
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header, parse_etags
+
+from app import (
+    app as flask_app, aws_client_config, aws_region, change_feed, inventory_cache, inventory_sync,
+    rate_limiter, response_memo, upstream_calls, CACHE_TTLS, EVENTS_HEARTBEAT_SECONDS, MAX_UPSTREAM_PAGE_SIZE, NDJSON_MIMETYPE,
+    OVERVIEW_CALL_TIMEOUT, OVERVIEW_COUNTERS as SYNC_OVERVIEW_COUNTERS, REGION_CALL_TIMEOUT, RESOURCE_SOURCES,
+    build_resource_index, data_version, decode_cursor, describe_cache_key, encode_cursor, known_regions,
+    format_event, index_cache_key, mark_first_request, ndjson_chunk, offset_rows_window, parse_limit, parse_list_query,
+    resume_position, row_batches, snapshot_overview, take_rows, uses_snapshot, wants_ndjson,
+)
+from aws_clients import AsyncClientRegistry
+from change_feed import AsyncSubscription, OVERFLOWED
+from http_cache import MIN_COMPRESS_BYTES, compress_body, compute_etag, negotiate_encoding
+from metrics import JSON_SERIALIZE_LATENCY, instrument_client, observe_request
+from rate_limiter import RateLimitExceeded
+
+# Created at startup, on the server's event loop.
+clients = None
+
+# --- Responses ---
+# The C JSON encoder holds the GIL for a whole call, so even on a worker thread one dumps of a
+# 100k-row list would stall the event loop; long lists are encoded this many rows at a time.
+JSON_SLICE_ROWS = 2000
+
+def dump_json(payload):
+    # Serialized exactly as Flask's jsonify does, so both modes send identical bodies and ETags.
+    provider = flask_app.json
+    compact = provider.compact or (provider.compact is None and not flask_app.debug)
+    if compact and isinstance(payload, list) and len(payload) > JSON_SLICE_ROWS:
+        parts = [provider.dumps(payload[i:i + JSON_SLICE_ROWS], separators=(',', ':'))[1:-1] for i in range(0, len(payload), JSON_SLICE_ROWS)]
+        return f"[{','.join(parts)}]\n".encode()
+    return provider.response(payload).get_data()
+
+def serialized_json(payload):
+    with JSON_SERIALIZE_LATENCY.time():
+        return dump_json(payload)
+
+def error_response(message, status_code):
+    return Response(dump_json({"error": message}), status_code, media_type='application/json')
+
+async def json_body(payload, serialize=dump_json):
+    return await run_in_threadpool(serialize, payload)
+
+async def api_response(request, body, memo_entry=None):
+    # The async side of app.finalize_api_response: weak ETag, 304 and gzip/brotli.
+    etag = memo_entry.etag if memo_entry else await run_in_threadpool(compute_etag, body)
+    headers = {'ETag': f'W/"{etag}"', 'Vary': 'Accept-Encoding'}
+    if parse_etags(request.headers.get('if-none-match')).contains_weak(etag):
+        return Response(status_code=304, headers=headers)
+
+    encoding = negotiate_encoding(parse_accept_header(request.headers.get('accept-encoding')))
+    if encoding and len(body) >= MIN_COMPRESS_BYTES:
+        if memo_entry:
+            body = await run_in_threadpool(response_memo.encoded, memo_entry, encoding)
+        else:
+            body = await run_in_threadpool(compress_body, body, encoding)
+        headers['Content-Encoding'] = encoding
+    return Response(body, media_type='application/json', headers=headers)
+
+async def versioned_response(request, version, build):
+    # Same memo (and keys) as app.versioned_json; build is a coroutine function.
+    if version is None:
+        return await api_response(request, await json_body(await build(), serialized_json))
+    key = f"{request.url.path}?{request.url.query}"
+    entry = response_memo.get(key, version)
+    if entry is None:
+        entry = response_memo.put(key, version, await json_body(await build(), serialized_json))
+    return await api_response(request, entry.body, entry)
+
+# --- Async Inventory Reads ---
+def cached_describe(resource, source, loader, region=None, *window):
+    key = describe_cache_key(resource, source, region, *window)
+    return inventory_cache.get_or_load_async(key, lambda: upstream_calls.do_async(key, loader), CACHE_TTLS.get(resource, 0), tags=(resource,))
+
+async def fetch_source_items(resource, source, region=None):
+    async def load():
+        client = await clients.get(source.client, region)
+        if client.can_paginate(source.operation):
+            response = await client.get_paginator(source.operation).paginate(**source.params).build_full_result()
+        else:
+            response = await getattr(client, source.operation)(**source.params)
+        return response.get(source.result_key, [])
+    return await cached_describe(resource, source, load, region)
+
+async def fetch_rows(resource, region=None):
+    # A type's sources (elbv2 and classic ELB) are fetched concurrently.
+    sources = RESOURCE_SOURCES[resource]
+    results = await asyncio.gather(*(fetch_source_items(resource, source, region) for source in sources))
+    return await run_in_threadpool(shape_rows, sources, results)
+
+def shape_rows(sources, results):
+    rows = []
+    for source, items in zip(sources, results):
+        for item in items:
+            rows.extend(source.to_rows(item))
+    return rows
+
+async def fetch_source_window(resource, source, limit, position):
+    # See app.fetch_source_window; windows are cached under the same keys.
+    client = await clients.get(source.client)
+    if client.can_paginate(source.operation):
+        page_size = min(max(limit, 5), MAX_UPSTREAM_PAGE_SIZE.get(source.operation, 1000))
+        config = {'MaxItems': limit, 'PageSize': page_size}
+        if position and position.get('token'):
+            config['StartingToken'] = position['token']
+
+        async def load():
+            paginator = client.get_paginator(source.operation)
+            response = await paginator.paginate(**source.params, PaginationConfig=config).build_full_result()
+            return response.get(source.result_key, []), response.get('NextToken')
+        items, next_token = await cached_describe(resource, source, load, None, limit, config.get('StartingToken'))
+        return items, ({'token': next_token} if next_token else None)
+
+    offset = position.get('offset', 0) if position else 0
+    items = await fetch_source_items(resource, source)
+    window = items[offset:offset + limit]
+    next_offset = offset + len(window)
+    return window, ({'offset': next_offset} if next_offset < len(items) else None)
+
+async def fetch_rows_window(resource, limit, cursor=None):
+    sources = RESOURCE_SOURCES[resource]
+    state = decode_cursor(cursor) if cursor else {}
+    index = state.get('source', 0)
+    position = state.get('position')
+
+    rows = []
+    while index < len(sources) and len(rows) < limit:
+        source = sources[index]
+        skip = position.get('skip', 0) if position else 0
+        items, next_position = await fetch_source_window(resource, source, limit - len(rows), position)
+        taken, stop = take_rows(source, items, skip, limit - len(rows))
+        rows.extend(taken)
+        if stop is not None:
+            item_count, skip = stop
+            if item_count:
+                position = (await fetch_source_window(resource, source, item_count, position))[1]
+            position = resume_position(position, 0, skip, None)
+            break
+        position = next_position
+        if position is None:
+            index += 1
+
+    next_cursor = encode_cursor({'source': index, 'position': position}) if index < len(sources) else None
+    return rows, next_cursor
+
+async def resource_index(resource, region=None):
+    if uses_snapshot(region):
+        return inventory_sync.snapshot().index(resource)
+    region = region or aws_region
+
+    async def load():
+        return await run_in_threadpool(build_resource_index, resource, await fetch_rows(resource, region))
+    key = index_cache_key(resource, region)
+    return await inventory_cache.get_or_load_async(key, lambda: upstream_calls.do_async(key, load), CACHE_TTLS.get(resource, 0), tags=(resource,))
+
+async def resource_rows(resource, query=None, region=None):
+    if query is not None:
+        index = await resource_index(resource, region)
+        return await run_in_threadpool(lambda: index.query(**query))
+    if uses_snapshot(region):
+        return inventory_sync.snapshot().rows(resource)
+    return await fetch_rows(resource, region)
+
+# --- Streaming Export ---
+async def upstream_row_batches(resource):
+    # See app.upstream_row_batches.
+    for source in RESOURCE_SOURCES[resource]:
+        client = await clients.get(source.client)
+        if not client.can_paginate(source.operation):
+            yield [row for item in await fetch_source_items(resource, source) for row in source.to_rows(item)]
+            continue
+        config = {'PageSize': MAX_UPSTREAM_PAGE_SIZE.get(source.operation, 1000)}
+        async for page in client.get_paginator(source.operation).paginate(**source.params, PaginationConfig=config):
+            yield [row for item in page.get(source.result_key, []) for row in source.to_rows(item)]
+
+async def ndjson_response(batches):
+    # Mirrors app.ndjson_response; batches is an async iterator.
+    try:
+        first = await batches.__anext__()
+    except StopAsyncIteration:
+        first = []
+
+    async def generate():
+        yield ndjson_chunk(first)
+        try:
+            async for batch in batches:
+                yield ndjson_chunk(batch)
+        except Exception as e:
+            print(f"Error streaming export: {e}")
+            yield ndjson_chunk([{'error': str(e)}])
+    return StreamingResponse(generate(), media_type=NDJSON_MIMETYPE, headers={'X-Accel-Buffering': 'no'})
+
+async def in_memory_batches(rows):
+    for batch in row_batches(rows):
+        yield batch
+
+# --- Deadlines and Regions ---
+async def gather_with_deadline(calls, timeout, action):
+    # calls: {name: coroutine}. Returns ({name: result}, {name: status}) in the shape the Flask
+    # routes report; a call that fails or misses the deadline doesn't fail the others.
+    async def timed(coroutine):
+        started = time.perf_counter()
+        result = await asyncio.wait_for(coroutine, timeout)
+        return result, (time.perf_counter() - started) * 1000
+
+    names = list(calls)
+    outcomes = await asyncio.gather(*(timed(calls[name]) for name in names), return_exceptions=True)
+    results = {}
+    status = {}
+    for name, outcome in zip(names, outcomes):
+        if isinstance(outcome, asyncio.TimeoutError):
+            status[name] = {'status': 'timeout', 'elapsedMs': round(timeout * 1000, 1)}
+        elif isinstance(outcome, Exception):
+            print(f"Error {action} {name}: {outcome}")
+            status[name] = {'status': 'error', 'error': str(outcome)}
+        else:
+            results[name], elapsed_ms = outcome
+            status[name] = {'status': 'ok', 'elapsedMs': round(elapsed_ms, 1)}
+    return results, status
+
+async def enabled_regions():
+    async def load():
+        client = await clients.get('ec2')
+        return sorted(region['RegionName'] for region in (await client.describe_regions())['Regions'])
+    return await inventory_cache.get_or_load_async(('Regions',), lambda: upstream_calls.do_async(('Regions',), load), ttl=3600, tags=('Regions',))
+
+async def requested_regions(args):
+    value = args.get('regions', '').strip()
+    if not value:
+        return None
+    if value == 'all':
+        return await enabled_regions()
+    return known_regions(value.split(','), await enabled_regions())
+
+async def multi_region_response(request, resource, regions, query=None):
+    started = time.perf_counter()
+    calls = {region: resource_rows(resource, query, region) for region in regions}
+    results, status = await gather_with_deadline(calls, REGION_CALL_TIMEOUT, 'querying region')
+    rows = []
+    for region in regions:
+        if region in results:
+            status[region]['count'] = len(results[region])
+            rows.extend(dict(row, Region=region) for row in results[region])
+    payload = {'items': rows, 'regions': status, 'elapsedMs': round((time.perf_counter() - started) * 1000, 1)}
+    return await api_response(request, await json_body(payload))
+
+# --- Inventory Routes ---
+ROUTE_RESOURCES = {
+    '/api/ec2-instances': 'Instances',
+    '/api/key-pairs': 'KeyPairs',
+    '/api/security-groups': 'SecurityGroups',
+    '/api/auto-scaling-groups': 'AutoScalingGroups',
+    '/api/load-balancers': 'LoadBalancers',
+    '/api/snapshots': 'Snapshots',
+    '/api/volumes': 'Volumes',
+    '/api/elastic-ips': 'ElasticIPs',
+    '/api/capacity-reservations': 'CapacityReservations',
+    '/api/dedicated-hosts': 'DedicatedHosts',
+    '/api/placement-groups': 'PlacementGroups',
+}
+
+async def list_resource(request):
+    # Mirrors app.list_resource_response.
+    resource = ROUTE_RESOURCES[request.url.path]
+    args = request.query_params
+    try:
+        query = parse_list_query(resource, args)
+        regions = await requested_regions(args)
+        paged = 'limit' in args or 'cursor' in args
+        if wants_ndjson(args, parse_accept_header(request.headers.get('accept'), MIMEAccept)):
+            if regions is not None or paged:
+                return error_response("format=ndjson is not supported together with regions or paging.", 400)
+            if query is not None or uses_snapshot():
+                return await ndjson_response(in_memory_batches(await resource_rows(resource, query)))
+            return await ndjson_response(upstream_row_batches(resource))
+        if regions is not None:
+            if paged:
+                return error_response("Paging is not supported together with regions.", 400)
+            return await multi_region_response(request, resource, regions, query)
+
+        if not paged:
+            return await versioned_response(request, data_version(resource, query), lambda: resource_rows(resource, query))
+
+        limit = parse_limit(args)
+        cursor = args.get('cursor')
+        if query is not None or uses_snapshot():
+            async def build_window():
+                rows, next_cursor = offset_rows_window(await resource_rows(resource, query), limit, cursor)
+                return {'items': rows, 'nextCursor': next_cursor, 'limit': limit}
+            return await versioned_response(request, data_version(resource, query), build_window)
+
+        rows, next_cursor = await fetch_rows_window(resource, limit, cursor)
+        return await api_response(request, await json_body({'items': rows, 'nextCursor': next_cursor, 'limit': limit}))
+    except ValueError as e:
+        return error_response(str(e), 400)
+    except RateLimitExceeded as e:
+        response = error_response(str(e), 503)
+        response.headers['Retry-After'] = str(max(1, round(e.retry_after)))
+        return response
+    except Exception as e:
+        return error_response(str(e), 500)
+
+# --- EC2 Overview ---
+async def count_instances(region=None):
+    reservations = await fetch_source_items('Instances', RESOURCE_SOURCES['Instances'][0], region)
+    return sum(len(reservation['Instances']) for reservation in reservations)
+
+async def count_load_balancers(region=None):
+    # Either API failing only drops its share, as in the Flask version.
+    async def count(source, label):
+        try:
+            return len(await fetch_source_items('LoadBalancers', source, region))
+        except Exception as e:
+            print(f"Error describing {label}: {e}")
+            return 0
+    elbv2_source, elb_source = RESOURCE_SOURCES['LoadBalancers']
+    return sum(await asyncio.gather(count(elbv2_source, 'ELBv2'), count(elb_source, 'Classic ELB')))
+
+def count_items(resource):
+    async def count(region=None):
+        results = await asyncio.gather(*(fetch_source_items(resource, source, region) for source in RESOURCE_SOURCES[resource]))
+        return sum(len(items) for items in results)
+    return count
+
+OVERVIEW_COUNTERS = {name: count_items(name) for name in SYNC_OVERVIEW_COUNTERS}
+OVERVIEW_COUNTERS.update({'Instances': count_instances, 'LoadBalancers': count_load_balancers})
+
+async def overview_counts(region=None):
+    calls = {name: counter(region) for name, counter in OVERVIEW_COUNTERS.items()}
+    results, status = await gather_with_deadline(calls, OVERVIEW_CALL_TIMEOUT, 'counting')
+    counts = {name: results.get(name) for name in OVERVIEW_COUNTERS}
+    counts['ResourceStatus'] = status
+    return counts
+
+async def multi_region_overview(regions):
+    calls = {region: overview_counts(region) for region in regions}
+    results, region_status = await gather_with_deadline(calls, REGION_CALL_TIMEOUT, 'querying region')
+    totals = {}
+    for name in OVERVIEW_COUNTERS:
+        region_counts = [results[region][name] for region in regions if region in results and results[region][name] is not None]
+        totals[name] = sum(region_counts) if region_counts else None
+    for region, status in region_status.items():
+        if region in results:
+            status.update(results[region])
+    totals['Regions'] = region_status
+    return totals
+
+async def ec2_overview(request):
+    try:
+        started = time.perf_counter()
+        regions = await requested_regions(request.query_params)
+        if regions is not None:
+            counts = await multi_region_overview(regions)
+        elif inventory_sync.enabled:
+            return await api_response(request, await json_body(snapshot_overview()))
+        else:
+            counts = await overview_counts()
+        counts['ElapsedMs'] = round((time.perf_counter() - started) * 1000, 1)
+        return await api_response(request, await json_body(counts))
+    except ValueError as e:
+        return error_response(str(e), 400)
+    except Exception as e:
+        return error_response(str(e), 500)
+
+# --- Live Events ---
+async def stream_events(request):
+    # Mirrors app.stream_events, but an open stream costs a queue, not a thread.
+    if not inventory_sync.enabled:
+        return error_response("Live events need the background inventory sync (set INVENTORY_SYNC_INTERVAL).", 503)
+    resources = {resource for resource in request.query_params.get('resources', '').split(',') if resource} or None
+    last_event_id = request.headers.get('last-event-id') or request.query_params.get('lastEventId')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return error_response("Invalid Last-Event-ID.", 400)
+    subscription = change_feed.subscribe(last_event_id, AsyncSubscription)
+
+    async def stream():
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                event = await subscription.get(EVENTS_HEARTBEAT_SECONDS)
+                if event is None:
+                    yield ': keep-alive\n\n'
+                elif event is OVERFLOWED:
+                    return
+                elif resources is None or event['resource'] in resources:
+                    yield format_event(event)
+        finally:
+            change_feed.unsubscribe(subscription)
+
+    return StreamingResponse(stream(), media_type='text/event-stream', headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+# --- App ---
+@asynccontextmanager
+async def lifespan(app):
+    global clients
+    # Same pool, retry and rate-limit settings as the Flask side; the buckets are shared, so
+    # both halves together stay within one account quota.
+    clients = AsyncClientRegistry(aws_region, config=aws_client_config, rate_limiter=rate_limiter, instrument=instrument_client)
+    if inventory_sync.enabled:
+        # The first sync finishes before requests are accepted, so no handler ever blocks the
+        # event loop waiting for it.
+        inventory_sync.start()
+        await run_in_threadpool(inventory_sync.snapshot)
+    try:
+        yield
+    finally:
+        await clients.close()
+
+def timed(route, endpoint):
+    # Records the same per-route latency histogram as the Flask hooks; bridged routes are
+    # timed by Flask itself.
+    async def handler(request):
+        started = time.perf_counter()
+        mark_first_request()
+        response = await endpoint(request)
+        observe_request(request.method, route, response.status_code, time.perf_counter() - started)
+        return response
+    return handler
+
+routes = [Route(path, timed(path, list_resource), methods=['GET']) for path in ROUTE_RESOURCES]
+routes += [
+    Route('/api/ec2-overview', timed('/api/ec2-overview', ec2_overview), methods=['GET']),
+    Route('/api/events', timed('/api/events', stream_events), methods=['GET']),
+    # Everything else, unchanged, from the Flask app on a worker thread pool.
+    Mount('/', app=WSGIMiddleware(flask_app, workers=int(os.environ.get('ASGI_WSGI_WORKERS', '10')))),
+]
+
+app = Starlette(
+    routes=routes,
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+    lifespan=lifespan,
+)
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(app, host='0.0.0.0', port=5000)
@@ -0,0 +1,100 @@
+# backend/aws_clients.py
+# Region-aware registry of boto3 clients: one client per (service, region), created the
+# first time that pair is asked for and shared by every request handler afterwards. All of
+# them share one botocore Config (pool size, retry mode) and, optionally, one RateLimiter.
+#
+# Creating a client parses its service model, endpoint rules and paginators, which costs tens
+# of milliseconds and a few megabytes. Every client comes from one session, whose loader
+# keeps each parsed model, so a service is parsed once per process however many regions ask
+# for it, and nothing is parsed at all until a request needs it (or warm() is called).
+import asyncio
+import threading
+import time
+from contextlib import AsyncExitStack
+
+import boto3
+
+
+class ClientRegistry:
+    def __init__(self, default_region, config=None, rate_limiter=None, instrument=None, session=None):
+        # instrument: optional callable(client), run once on every new client
+        # session: the boto3 Session to create clients from; boto3's default one if omitted
+        self.default_region = default_region
+        self.config = config
+        self.rate_limiter = rate_limiter
+        self.instrument = instrument
+        if session is None:
+            if boto3.DEFAULT_SESSION is None:
+                boto3.setup_default_session()
+            session = boto3.DEFAULT_SESSION
+        self.session = session
+        self._clients = {}
+        # {(service, region): milliseconds spent creating the client}
+        self._created_ms = {}
+        # A boto3 session isn't safe for concurrent client creation.
+        self._lock = threading.Lock()
+
+    def get(self, service, region=None):
+        key = (service, region or self.default_region)
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    started = time.perf_counter()
+                    client = self.session.client(service, region_name=key[1], config=self.config)
+                    if self.rate_limiter is not None:
+                        self.rate_limiter.attach(client)
+                    if self.instrument is not None:
+                        self.instrument(client)
+                    self._created_ms[key] = (time.perf_counter() - started) * 1000
+                    self._clients[key] = client
+        return client
+
+    def warm(self, services, region=None):
+        # Creates the clients and loads their paginator models ahead of the first request.
+        # Makes no AWS calls (connections open on first use), so it is safe before a fork.
+        for service in services:
+            client = self.get(service, region)
+            client.can_paginate(next(iter(client.meta.method_to_api_mapping)))
+
+    def stats(self):
+        with self._lock:
+            created = sorted(self._created_ms.items())
+        return [{'service': service, 'region': region, 'createdMs': round(created_ms, 1)} for (service, region), created_ms in created]
+
+
+class AsyncClientRegistry:
+    # The async server's counterpart, backed by aiobotocore. Its clients are async context
+    # managers, so they stay open on an exit stack until close() at shutdown. Create it on
+    # the running event loop (at server startup); an asyncio lock is then all it needs.
+    def __init__(self, default_region, config=None, rate_limiter=None, instrument=None):
+        from aiobotocore.session import get_session # Only the async server needs aiobotocore
+
+        self.default_region = default_region
+        self.config = config
+        self.rate_limiter = rate_limiter
+        self.instrument = instrument
+        self._session = get_session()
+        self._clients = {}
+        self._stack = AsyncExitStack()
+        self._lock = asyncio.Lock()
+
+    async def get(self, service, region=None):
+        key = (service, region or self.default_region)
+        client = self._clients.get(key)
+        if client is None:
+            async with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = await self._stack.enter_async_context(self._session.create_client(service, region_name=key[1], config=self.config))
+                    if self.rate_limiter is not None:
+                        self.rate_limiter.attach_async(client)
+                    if self.instrument is not None:
+                        self.instrument(client)
+                    self._clients[key] = client
+        return client
+
+    async def close(self):
+        await self._stack.aclose()
+        self._clients.clear()
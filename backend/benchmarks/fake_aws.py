@@ -0,0 +1,443 @@
+# backend/benchmarks/fake_aws.py
+# An in-process stand-in for EC2, ELB, ELBv2, Auto Scaling and Cost Explorer.
+#
+# SyntheticAccount generates a deterministic account of a given size. FakeAWS answers the
+# describe, write and Cost Explorer calls the app makes from that account. It hooks
+# botocore's before-call event on the session, so the app's own clients, paginators, rate
+# limiter and metrics hooks run exactly as they do against AWS, and only the HTTP round trip
+# is replaced. Every call sleeps for the configured upstream latency. Every page is a fresh
+# deep copy, the way botocore parses a new response each time. Writes are acknowledged but
+# don't change the account, so repeated runs stay comparable.
+import copy
+import random
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from botocore.awsrequest import AWSResponse
+
+REGIONS = ['us-east-1', 'us-west-2', 'eu-west-1', 'ap-southeast-2']
+AVAILABILITY_ZONES = ['us-east-1a', 'us-east-1b', 'us-east-1c', 'us-east-1d']
+INSTANCE_TYPES = ['t3.micro', 't3.small', 't3.large', 'm5.large', 'm5.xlarge', 'c5.2xlarge', 'r5.large']
+INSTANCE_STATES = ['running'] * 6 + ['stopped'] * 3 + ['pending', 'stopping']
+VOLUME_TYPES = ['gp3', 'gp2', 'io2', 'st1']
+TEAMS = ['payments', 'search', 'checkout', 'platform', 'data', 'identity', 'ml', 'growth']
+ENVS = ['prod', 'staging', 'dev']
+SERVICES = [
+    'Amazon Elastic Compute Cloud - Compute', 'EC2 - Other', 'Amazon Simple Storage Service',
+    'Amazon Relational Database Service', 'Amazon CloudFront', 'AWS Lambda', 'Amazon DynamoDB',
+    'Amazon Elastic Load Balancing', 'Amazon Virtual Private Cloud', 'AmazonCloudWatch',
+    'Amazon Elastic Container Service', 'Amazon Elastic Kubernetes Service', 'AWS Key Management Service',
+    'Amazon Route 53', 'Amazon Simple Queue Service', 'Amazon Simple Notification Service',
+    'AWS Secrets Manager', 'Amazon ElastiCache', 'Amazon OpenSearch Service', 'AWS Glue',
+    'Amazon Athena', 'Amazon Kinesis', 'AWS Backup', 'AWS Config', 'AWS CloudTrail', 'Tax',
+]
+FREE_TIER_USAGE_TYPES = ['BoxUsage:t2.micro', 'BoxUsage:t3.micro', 'BoxUsage:t3.micro:windows']
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+# operation -> (result key, request token, response token, page size parameter, largest page).
+# Without a page size EC2 returns everything in one response; the rest use their default.
+PAGINATION = {
+    ('ec2', 'DescribeInstances'): ('Reservations', 'NextToken', 'NextToken', 'MaxResults', 1000),
+    ('ec2', 'DescribeVolumes'): ('Volumes', 'NextToken', 'NextToken', 'MaxResults', 500),
+    ('ec2', 'DescribeSnapshots'): ('Snapshots', 'NextToken', 'NextToken', 'MaxResults', 1000),
+    ('ec2', 'DescribeSecurityGroups'): ('SecurityGroups', 'NextToken', 'NextToken', 'MaxResults', 1000),
+    ('ec2', 'DescribeHosts'): ('Hosts', 'NextToken', 'NextToken', 'MaxResults', 500),
+    ('ec2', 'DescribeCapacityReservations'): ('CapacityReservations', 'NextToken', 'NextToken', 'MaxResults', 1000),
+    ('autoscaling', 'DescribeAutoScalingGroups'): ('AutoScalingGroups', 'NextToken', 'NextToken', 'MaxRecords', 100),
+    ('elbv2', 'DescribeLoadBalancers'): ('LoadBalancers', 'Marker', 'NextMarker', 'PageSize', 400),
+    ('elb', 'DescribeLoadBalancers'): ('LoadBalancerDescriptions', 'Marker', 'NextMarker', 'PageSize', 400),
+    ('elbv2', 'DescribeTargetGroups'): ('TargetGroups', 'Marker', 'NextMarker', 'PageSize', 400),
+}
+DEFAULT_PAGE_SIZES = {'MaxRecords': 50, 'PageSize': 400}
+UNPAGINATED = {
+    ('ec2', 'DescribeAddresses'): 'Addresses',
+    ('ec2', 'DescribeKeyPairs'): 'KeyPairs',
+    ('ec2', 'DescribePlacementGroups'): 'PlacementGroups',
+}
+# Cost Explorer returns at most this many groups per page and continues with NextPageToken.
+CE_PAGE_GROUPS = 500
+# Both ELB APIs reject describe_tags for more than this many load balancers.
+ELB_TAG_BATCH = 20
+TARGET_HEALTH = ['healthy'] * 8 + ['unhealthy', 'draining']
+
+
+def tags(rng, name, extra=0):
+    result = [
+        {'Key': 'Name', 'Value': name},
+        {'Key': 'Team', 'Value': rng.choice(TEAMS)},
+        {'Key': 'Env', 'Value': rng.choice(ENVS)},
+    ]
+    for i in range(extra):
+        result.append({'Key': f'cost-center-{i}', 'Value': str(rng.randrange(100, 999))})
+    return result
+
+
+def ip(rng, first):
+    return f"{first}.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}"
+
+
+def rule(rng):
+    protocol = rng.choice(['tcp', 'tcp', 'tcp', 'udp', 'icmp', '-1'])
+    if protocol == '-1':
+        ports = {}
+    elif protocol == 'icmp':
+        ports = {'FromPort': -1, 'ToPort': -1}
+    else:
+        start = rng.choice([22, 80, 443, 3306, 5432, 6379, 8080, 9200, rng.randrange(1024, 60000)])
+        ports = {'FromPort': start, 'ToPort': start + rng.choice([0, 0, 0, 10, 100, 1000])}
+    prefix = rng.choice([8, 16, 24, 32, 32])
+    cidrs = [{'CidrIp': f"{ip(rng, rng.choice([10, 172, 192, 52]))}/{prefix}"} for _ in range(rng.randrange(1, 4))]
+    if rng.random() < 0.05:
+        cidrs.append({'CidrIp': '0.0.0.0/0'})
+    return dict(ports, IpProtocol=protocol, IpRanges=cidrs, Ipv6Ranges=[], PrefixListIds=[], UserIdGroupPairs=[])
+
+
+class SyntheticAccount:
+    # About `size` resources in total: mostly instances, volumes and snapshots, as in a real
+    # account, plus security groups whose rule sets run from a handful to a few hundred rules.
+    def __init__(self, size, seed=1):
+        rng = random.Random(seed)
+        self.size = size
+        counts = {
+            'instances': 0.25, 'volumes': 0.30, 'snapshots': 0.30, 'security_groups': 0.03,
+            'addresses': 0.04, 'auto_scaling_groups': 0.02, 'key_pairs': 0.01, 'load_balancers': 0.01,
+            'classic_load_balancers': 0.005, 'capacity_reservations': 0.005, 'hosts': 0.005,
+            'placement_groups': 0.005,
+        }
+        counts = {name: max(1, int(size * share)) for name, share in counts.items()}
+        vpcs = [f"vpc-{i:08x}" for i in range(max(2, size // 5000))]
+
+        self.security_groups = []
+        for i in range(counts['security_groups']):
+            rule_count = rng.randrange(100, 300) if rng.random() < 0.1 else rng.randrange(3, 25)
+            self.security_groups.append({
+                'GroupId': f"sg-{i:017x}",
+                'GroupName': f"sg-{rng.choice(TEAMS)}-{i}",
+                'Description': 'Synthetic security group',
+                'VpcId': rng.choice(vpcs),
+                'OwnerId': '123456789012',
+                'IpPermissions': [rule(rng) for _ in range(rule_count)],
+                'IpPermissionsEgress': [{'IpProtocol': '-1', 'IpRanges': [{'CidrIp': '0.0.0.0/0'}], 'Ipv6Ranges': [], 'PrefixListIds': [], 'UserIdGroupPairs': []}],
+                'Tags': tags(rng, f"sg-{i}"),
+            })
+
+        instances = []
+        for i in range(counts['instances']):
+            az = rng.choice(AVAILABILITY_ZONES)
+            groups = rng.sample(self.security_groups, min(len(self.security_groups), rng.randrange(1, 4)))
+            instances.append({
+                'InstanceId': f"i-{i:017x}",
+                'InstanceType': rng.choice(INSTANCE_TYPES),
+                'State': {'Code': 16, 'Name': rng.choice(INSTANCE_STATES)},
+                'LaunchTime': EPOCH + timedelta(minutes=rng.randrange(1000000)),
+                'Placement': {'AvailabilityZone': az, 'Tenancy': 'default'},
+                'PrivateIpAddress': ip(rng, 10),
+                'PublicIpAddress': ip(rng, 54),
+                'VpcId': rng.choice(vpcs),
+                'SubnetId': f"subnet-{rng.randrange(1 << 32):08x}",
+                'ImageId': f"ami-{rng.randrange(1 << 32):08x}",
+                'SecurityGroups': [{'GroupId': g['GroupId'], 'GroupName': g['GroupName']} for g in groups],
+                'Tags': tags(rng, f"web-{i}", extra=rng.randrange(3)),
+            })
+        self.instances = instances
+        self.reservations = []
+        position = 0
+        while position < len(instances):
+            batch = rng.randrange(1, 5)
+            self.reservations.append({
+                'ReservationId': f"r-{len(self.reservations):017x}",
+                'OwnerId': '123456789012',
+                'Instances': instances[position:position + batch],
+            })
+            position += batch
+
+        self.volumes = []
+        for i in range(counts['volumes']):
+            attached = rng.random() < 0.8
+            instance = rng.choice(instances)
+            self.volumes.append({
+                'VolumeId': f"vol-{i:017x}",
+                'Size': rng.choice([8, 20, 50, 100, 500, 1000]),
+                'AvailabilityZone': instance['Placement']['AvailabilityZone'],
+                'State': 'in-use' if attached else 'available',
+                'VolumeType': rng.choice(VOLUME_TYPES),
+                'CreateTime': EPOCH + timedelta(minutes=rng.randrange(1000000)),
+                'SnapshotId': '',
+                'Encrypted': rng.random() < 0.7,
+                'Attachments': [{'InstanceId': instance['InstanceId'], 'Device': '/dev/xvda', 'State': 'attached'}] if attached else [],
+                'Tags': tags(rng, f"data-{i}"),
+            })
+
+        self.snapshots = []
+        for i in range(counts['snapshots']):
+            volume = rng.choice(self.volumes)
+            # Some snapshots outlive the volume they were taken from.
+            volume_id = volume['VolumeId'] if rng.random() < 0.85 else f"vol-{size + i:017x}"
+            self.snapshots.append({
+                'SnapshotId': f"snap-{i:017x}",
+                'VolumeId': volume_id,
+                'State': 'completed',
+                'StartTime': EPOCH + timedelta(minutes=rng.randrange(1000000)),
+                'VolumeSize': volume['Size'],
+                'Description': f"Backup of {volume_id}",
+                'OwnerId': '123456789012',
+                'Encrypted': volume['Encrypted'],
+                'Tags': tags(rng, f"backup-{i}"),
+            })
+
+        self.addresses = []
+        for i in range(counts['addresses']):
+            address = {'PublicIp': ip(rng, 3), 'AllocationId': f"eipalloc-{i:017x}", 'Domain': 'vpc', 'Tags': tags(rng, f"eip-{i}")}
+            if rng.random() < 0.75: # The rest are allocated but idle
+                instance = rng.choice(instances)
+                address.update(AssociationId=f"eipassoc-{i:017x}", InstanceId=instance['InstanceId'], PrivateIpAddress=instance['PrivateIpAddress'])
+            self.addresses.append(address)
+
+        self.auto_scaling_groups = []
+        for i in range(counts['auto_scaling_groups']):
+            members = rng.sample(instances, min(len(instances), rng.randrange(1, 10)))
+            self.auto_scaling_groups.append({
+                'AutoScalingGroupName': f"asg-{rng.choice(TEAMS)}-{i}",
+                'AutoScalingGroupARN': f"arn:aws:autoscaling:us-east-1:123456789012:autoScalingGroup:{i}",
+                'MinSize': 1, 'MaxSize': 10, 'DesiredCapacity': len(members),
+                'LaunchTemplate': {'LaunchTemplateName': f"lt-{i}", 'Version': '$Latest'},
+                'DefaultCooldown': 300,
+                'AvailabilityZones': AVAILABILITY_ZONES[:2],
+                'HealthCheckType': rng.choice(['EC2', 'ELB']),
+                'HealthCheckGracePeriod': 300,
+                'CreatedTime': EPOCH + timedelta(minutes=rng.randrange(1000000)),
+                'Instances': [{
+                    'InstanceId': m['InstanceId'], 'InstanceType': m['InstanceType'],
+                    'AvailabilityZone': m['Placement']['AvailabilityZone'], 'LifecycleState': 'InService',
+                    'HealthStatus': 'Healthy', 'ProtectedFromScaleIn': False,
+                } for m in members],
+                'Tags': [],
+            })
+
+        self.load_balancers = [{
+            'LoadBalancerArn': f"arn:aws:elasticloadbalancing:us-east-1:123456789012:loadbalancer/app/lb-{i}/{i:016x}",
+            'LoadBalancerName': f"lb-{i}",
+            'DNSName': f"lb-{i}.us-east-1.elb.amazonaws.com",
+            'Type': rng.choice(['application', 'network']),
+            'Scheme': 'internet-facing',
+            'State': {'Code': 'active'},
+            'VpcId': rng.choice(vpcs),
+            'CreatedTime': EPOCH + timedelta(minutes=rng.randrange(1000000)),
+        } for i in range(counts['load_balancers'])]
+        self.classic_load_balancers = [{
+            'LoadBalancerName': f"classic-{i}",
+            'DNSName': f"classic-{i}.us-east-1.elb.amazonaws.com",
+            'VPCId': rng.choice(vpcs),
+            'CreatedTime': EPOCH + timedelta(minutes=rng.randrange(1000000)),
+            'Instances': [{'InstanceId': m['InstanceId']} for m in rng.sample(instances, min(len(instances), 3))],
+        } for i in range(counts['classic_load_balancers'])]
+        # One to three target groups per ELBv2 load balancer, plus a few attached to none.
+        self.target_groups = []
+        self.targets = {}
+        for lb in self.load_balancers + [None] * max(1, len(self.load_balancers) // 10):
+            for _ in range(rng.randrange(1, 4) if lb else 1):
+                i = len(self.target_groups)
+                self.target_groups.append({
+                    'TargetGroupArn': f"arn:aws:elasticloadbalancing:us-east-1:123456789012:targetgroup/tg-{i}/{i:016x}",
+                    'TargetGroupName': f"tg-{i}",
+                    'Protocol': 'HTTP', 'Port': 80, 'VpcId': lb['VpcId'] if lb else rng.choice(vpcs),
+                    'TargetType': 'instance', 'HealthCheckPath': '/health',
+                    'LoadBalancerArns': [lb['LoadBalancerArn']] if lb else [],
+                })
+                self.targets[self.target_groups[-1]['TargetGroupArn']] = [m['InstanceId'] for m in rng.sample(instances, min(len(instances), rng.randrange(1, 6)))]
+        self.load_balancer_tags = {lb['LoadBalancerArn']: tags(rng, lb['LoadBalancerName']) for lb in self.load_balancers}
+        self.load_balancer_tags.update({lb['LoadBalancerName']: tags(rng, lb['LoadBalancerName']) for lb in self.classic_load_balancers})
+        self.classic_instances = {lb['LoadBalancerName']: lb['Instances'] for lb in self.classic_load_balancers}
+
+        self.key_pairs = [{'KeyName': f"key-{i}", 'KeyPairId': f"key-{i:017x}", 'KeyFingerprint': f"{i:040x}"} for i in range(counts['key_pairs'])]
+        self.capacity_reservations = [{
+            'CapacityReservationId': f"cr-{i:017x}", 'InstanceType': rng.choice(INSTANCE_TYPES), 'InstancePlatform': 'Linux/UNIX',
+            'AvailabilityZone': rng.choice(AVAILABILITY_ZONES), 'TotalInstanceCount': 4, 'AvailableInstanceCount': rng.randrange(5),
+            'State': 'active', 'CreateDate': EPOCH + timedelta(days=rng.randrange(500)),
+        } for i in range(counts['capacity_reservations'])]
+        self.hosts = [{
+            'HostId': f"h-{i:017x}", 'AvailabilityZone': rng.choice(AVAILABILITY_ZONES), 'State': 'available',
+            'HostProperties': {'InstanceType': rng.choice(INSTANCE_TYPES)},
+            'AvailableCapacity': {'AvailableInstanceCapacity': [{'AvailableCapacity': 2, 'InstanceType': 'm5.large', 'TotalCapacity': 4}]},
+            'AllocationTime': EPOCH + timedelta(days=rng.randrange(500)),
+        } for i in range(counts['hosts'])]
+        self.placement_groups = [{
+            'GroupName': f"pg-{i}", 'GroupId': f"pg-{i:017x}", 'Strategy': rng.choice(['cluster', 'spread', 'partition']), 'State': 'available',
+        } for i in range(counts['placement_groups'])]
+
+        self.items = {
+            ('ec2', 'DescribeInstances'): self.reservations,
+            ('ec2', 'DescribeVolumes'): self.volumes,
+            ('ec2', 'DescribeSnapshots'): self.snapshots,
+            ('ec2', 'DescribeSecurityGroups'): self.security_groups,
+            ('ec2', 'DescribeHosts'): self.hosts,
+            ('ec2', 'DescribeCapacityReservations'): self.capacity_reservations,
+            ('ec2', 'DescribeAddresses'): self.addresses,
+            ('ec2', 'DescribeKeyPairs'): self.key_pairs,
+            ('ec2', 'DescribePlacementGroups'): self.placement_groups,
+            ('autoscaling', 'DescribeAutoScalingGroups'): self.auto_scaling_groups,
+            ('elbv2', 'DescribeLoadBalancers'): self.load_balancers,
+            ('elb', 'DescribeLoadBalancers'): self.classic_load_balancers,
+            ('elbv2', 'DescribeTargetGroups'): self.target_groups,
+        }
+        self.daily_cost = {service: rng.uniform(0.5, 400.0) for service in SERVICES}
+
+    def counts(self):
+        counts = {'/'.join(key): len(items) for key, items in self.items.items()}
+        counts['ec2/DescribeInstances'] = len(self.instances)
+        counts['ec2/SecurityGroupRules'] = sum(len(sg['IpPermissions']) for sg in self.security_groups)
+        return counts
+
+    def cost_results(self, start, end, granularity, group_by):
+        # One ResultsByTime entry per period; grouped by service or by usage type.
+        dimension = group_by[0]['Key'] if group_by else None
+        keys = SERVICES if dimension == 'SERVICE' else FREE_TIER_USAGE_TYPES if dimension == 'USAGE_TYPE' else []
+        metric = 'UsageQuantity' if dimension == 'USAGE_TYPE' else 'UnblendedCost'
+        results = []
+        current = date.fromisoformat(start)
+        last = date.fromisoformat(end)
+        while current < last:
+            following = current + timedelta(days=1) if granularity == 'DAILY' else (current.replace(day=1) + timedelta(days=32)).replace(day=1)
+            following = min(following, last)
+            days = (following - current).days
+            groups = []
+            for key in keys:
+                daily = self.daily_cost[key] if metric == 'UnblendedCost' else 24.0 * (FREE_TIER_USAGE_TYPES.index(key) + 1) / 3
+                amount = daily * days * (1 + 0.1 * ((current.toordinal() + len(key)) % 7 - 3) / 3)
+                groups.append({'Keys': [key], 'Metrics': {metric: {'Amount': f"{amount:.10f}", 'Unit': 'USD' if metric == 'UnblendedCost' else 'Hrs'}}})
+            results.append({
+                'TimePeriod': {'Start': current.isoformat(), 'End': following.isoformat()},
+                'Total': {}, 'Groups': groups, 'Estimated': following >= date.today(),
+            })
+            current = following
+        return results
+
+
+class FakeAWS:
+    def __init__(self, account, latency=0.05):
+        self.account = account
+        self.latency = latency
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def install(self, session):
+        # session: the botocore session the app's clients are created from. Handlers
+        # registered on it are copied into every client created afterwards.
+        session.register('before-parameter-build.*.*', self._remember_params)
+        session.register('before-call.*.*', self._respond)
+
+    def _remember_params(self, params, context, **kwargs):
+        context['fake_aws_params'] = dict(params)
+
+    def _respond(self, model, context, **kwargs):
+        service = model.service_model.service_name
+        params = context.get('fake_aws_params', {})
+        with self._lock:
+            name = f"{service}:{model.name}"
+            self.calls[name] = self.calls.get(name, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+        handler = getattr(self, f"_{service}_{model.name}", None)
+        if handler is not None:
+            parsed = handler(params)
+            if isinstance(parsed, tuple):
+                return parsed # an error response
+        elif (service, model.name) in PAGINATION:
+            parsed = self._page((service, model.name), params)
+        elif (service, model.name) in UNPAGINATED:
+            parsed = {UNPAGINATED[(service, model.name)]: copy.deepcopy(self.account.items[(service, model.name)])}
+        else:
+            return self._error(model.name, 'UnsupportedOperation', f"{name} is not faked.")
+        parsed['ResponseMetadata'] = {'RequestId': 'fake', 'HTTPStatusCode': 200, 'HTTPHeaders': {}, 'RetryAttempts': 0}
+        return AWSResponse('https://fake.amazonaws.com', 200, {}, None), parsed
+
+    def _error(self, operation, code, message):
+        parsed = {'Error': {'Code': code, 'Message': message}, 'ResponseMetadata': {'HTTPStatusCode': 400, 'RetryAttempts': 0}}
+        return AWSResponse('https://fake.amazonaws.com', 400, {}, None), parsed
+
+    def _page(self, key, params):
+        result_key, token_in, token_out, size_param, largest = PAGINATION[key]
+        items = self.account.items[key]
+        start = int(params.get(token_in) or 0)
+        size = params.get(size_param) or DEFAULT_PAGE_SIZES.get(size_param) or len(items)
+        end = start + min(int(size), largest) if size_param in params or key[0] != 'ec2' else len(items)
+        parsed = {result_key: copy.deepcopy(items[start:end])}
+        if end < len(items):
+            parsed[token_out] = str(end)
+        return parsed
+
+    def _ec2_DescribeRegions(self, params):
+        return {'Regions': [{'RegionName': region, 'Endpoint': f"ec2.{region}.amazonaws.com"} for region in REGIONS]}
+
+    def _instance_changes(self, params, previous, current):
+        return [{'InstanceId': instance_id, 'PreviousState': {'Name': previous}, 'CurrentState': {'Name': current}} for instance_id in params['InstanceIds']]
+
+    def _ec2_StartInstances(self, params):
+        return {'StartingInstances': self._instance_changes(params, 'stopped', 'pending')}
+
+    def _ec2_StopInstances(self, params):
+        return {'StoppingInstances': self._instance_changes(params, 'running', 'stopping')}
+
+    def _ec2_TerminateInstances(self, params):
+        return {'TerminatingInstances': self._instance_changes(params, 'running', 'shutting-down')}
+
+    def _ec2_CreateKeyPair(self, params):
+        return {'KeyName': params['KeyName'], 'KeyFingerprint': '00' * 20, 'KeyMaterial': 'fake', 'KeyPairId': 'key-fake'}
+
+    def _ec2_DeleteKeyPair(self, params):
+        return {}
+
+    def _ec2_CreateSecurityGroup(self, params):
+        return {'GroupId': 'sg-fake'}
+
+    def _ec2_DeleteSecurityGroup(self, params):
+        return {}
+
+    def _elbv2_DescribeTags(self, params):
+        if len(params['ResourceArns']) > ELB_TAG_BATCH:
+            return self._error('DescribeTags', 'ValidationError', f"At most {ELB_TAG_BATCH} resource ARNs can be described at once.")
+        return {'TagDescriptions': [
+            {'ResourceArn': arn, 'Tags': copy.deepcopy(self.account.load_balancer_tags.get(arn, []))} for arn in params['ResourceArns']
+        ]}
+
+    def _elb_DescribeTags(self, params):
+        if len(params['LoadBalancerNames']) > ELB_TAG_BATCH:
+            return self._error('DescribeTags', 'ValidationError', f"At most {ELB_TAG_BATCH} load balancer names can be described at once.")
+        return {'TagDescriptions': [
+            {'LoadBalancerName': name, 'Tags': copy.deepcopy(self.account.load_balancer_tags.get(name, []))} for name in params['LoadBalancerNames']
+        ]}
+
+    def _elbv2_DescribeTargetHealth(self, params):
+        arn = params['TargetGroupArn']
+        if arn not in self.account.targets:
+            return self._error('DescribeTargetHealth', 'TargetGroupNotFound', f"{arn} not found.")
+        return {'TargetHealthDescriptions': [{
+            'Target': {'Id': instance_id, 'Port': 80},
+            'HealthCheckPort': '80',
+            # Stable per target so repeated runs see the same health.
+            'TargetHealth': {'State': TARGET_HEALTH[sum(map(ord, instance_id + arn)) % len(TARGET_HEALTH)]},
+        } for instance_id in self.account.targets[arn]]}
+
+    def _elb_DescribeInstanceHealth(self, params):
+        instances = self.account.classic_instances.get(params['LoadBalancerName'])
+        if instances is None:
+            return self._error('DescribeInstanceHealth', 'LoadBalancerNotFound', f"{params['LoadBalancerName']} not found.")
+        return {'InstanceStates': [
+            {'InstanceId': m['InstanceId'], 'State': 'InService', 'ReasonCode': 'N/A', 'Description': 'N/A'} for m in instances
+        ]}
+
+    def _ce_GetCostAndUsage(self, params):
+        period = params['TimePeriod']
+        results = self.account.cost_results(period['Start'], period['End'], params['Granularity'], params.get('GroupBy'))
+        # Pages hold whole periods, up to CE_PAGE_GROUPS groups (always at least one period).
+        start = int(params.get('NextPageToken') or 0)
+        end = start
+        groups = 0
+        while end < len(results) and (end == start or groups + len(results[end]['Groups']) <= CE_PAGE_GROUPS):
+            groups += len(results[end]['Groups'])
+            end += 1
+        parsed = {'ResultsByTime': results[start:end], 'GroupDefinitions': params.get('GroupBy', []), 'DimensionValueAttributes': []}
+        if end < len(results):
+            parsed['NextPageToken'] = str(end)
+        return parsed
@@ -0,0 +1,293 @@
+# backend/benchmarks/run.py
+# Load benchmark for every /api/* route, against a synthetic account instead of AWS.
+#
+#   python backend/benchmarks/run.py                     # 100, 10k and 100k resources
+#   python backend/benchmarks/run.py --sizes 10000 --concurrency 32 --duration 60
+#   python backend/benchmarks/run.py --set INVENTORY_SYNC_INTERVAL=30 --set AWS_RATE_LIMITS='*=1000/1000'
+#
+# Each account size runs in its own process, so peak RSS is per size: fake_aws.py installs
+# the fake backend, app.py is imported and served by a threaded WSGI server on a local port,
+# and worker threads send a weighted mix of requests over HTTP for --duration seconds. Every
+# route is first requested once on its own, which is the cold-cache cost. The report gives
+# p50/p99 per route, overall throughput and the process's peak RSS. That RSS includes the
+# load generator and the synthetic account, so compare runs with each other rather than with
+# production. --set passes environment variables to the app (cache TTLs, sync, rate limits).
+import argparse
+import http.client
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+
+# Long-lived streams have no latency to speak of; they're left out of the mix.
+EXCLUDED_ROUTES = {'/api/events'}
+
+
+def request_mix(account):
+    # rule -> [(weight, method, path, json body)]. Reads dominate, as on a real dashboard;
+    # the writes (which invalidate the cache) are kept rare. Every /api/* rule must appear.
+    instance = account.instances[len(account.instances) // 2]['InstanceId']
+    fleet = [i['InstanceId'] for i in account.instances[:250]]
+    vpc = account.security_groups[0]['VpcId']
+    volume = account.volumes[0]['VolumeId']
+    return {
+        '/api/aws-clients/status': [(1, 'GET', '/api/aws-clients/status', None)],
+        '/api/inventory/status': [(1, 'GET', '/api/inventory/status', None)],
+        '/api/ec2-overview': [
+            (10, 'GET', '/api/ec2-overview', None),
+            (1, 'GET', '/api/ec2-overview?regions=us-east-1,eu-west-1', None),
+        ],
+        '/api/ec2-instances': [
+            (10, 'GET', '/api/ec2-instances', None),
+            (5, 'GET', '/api/ec2-instances?limit=100', None),
+            (5, 'GET', '/api/ec2-instances?state=running&sort=-LaunchTime', None),
+            (3, 'GET', '/api/ec2-instances?tag=Team:payments&tag=Env:prod', None),
+            (1, 'GET', '/api/ec2-instances?regions=all', None),
+        ],
+        '/api/ec2-instance/<instance_id>/<action>': [(1, 'POST', f'/api/ec2-instance/{instance}/stop', None)],
+        '/api/ec2-instances/action': [(1, 'POST', '/api/ec2-instances/action', {'action': 'stop', 'instance_ids': fleet})],
+        '/api/key-pairs': [(3, 'GET', '/api/key-pairs', None)],
+        '/api/key-pair/create': [(1, 'POST', '/api/key-pair/create', {'key_name': 'bench-key'})],
+        '/api/key-pair/<key_name>/delete': [(1, 'POST', '/api/key-pair/bench-key/delete', None)],
+        '/api/security-groups': [
+            (5, 'GET', '/api/security-groups', None),
+            (3, 'GET', f'/api/security-groups?vpc={vpc}', None),
+        ],
+        '/api/security-groups/exposure': [
+            (2, 'GET', '/api/security-groups/exposure?port=22&source=0.0.0.0/0', None),
+            (1, 'GET', '/api/security-groups/exposure?port=5432&protocol=tcp&source=10.1.2.3', None),
+        ],
+        '/api/security-group/create': [(1, 'POST', '/api/security-group/create', {'group_name': 'bench-sg', 'vpc_id': vpc})],
+        '/api/security-group/<group_id>/delete': [(1, 'POST', '/api/security-group/sg-fake/delete', None)],
+        '/api/auto-scaling-groups': [(3, 'GET', '/api/auto-scaling-groups', None)],
+        '/api/load-balancers': [(3, 'GET', '/api/load-balancers', None)],
+        '/api/load-balancers/details': [(2, 'GET', '/api/load-balancers/details', None)],
+        '/api/snapshots': [
+            (5, 'GET', '/api/snapshots', None),
+            (3, 'GET', '/api/snapshots?limit=1000', None),
+            (2, 'GET', f'/api/snapshots?volume={volume}', None),
+            (2, 'GET', '/api/snapshots?format=ndjson', None),
+        ],
+        '/api/volumes': [
+            (5, 'GET', '/api/volumes', None),
+            (3, 'GET', '/api/volumes?state=available&sort=-Size', None),
+            (2, 'GET', '/api/volumes?format=ndjson', None),
+        ],
+        '/api/elastic-ips': [(3, 'GET', '/api/elastic-ips', None)],
+        '/api/capacity-reservations': [(2, 'GET', '/api/capacity-reservations', None)],
+        '/api/dedicated-hosts': [(2, 'GET', '/api/dedicated-hosts', None)],
+        '/api/placement-groups': [(2, 'GET', '/api/placement-groups', None)],
+        '/api/waste-report': [(2, 'GET', '/api/waste-report', None)],
+        '/api/search': [
+            (2, 'GET', '/api/search?tag=Team:payments&tag=Env:prod', None),
+            (1, 'GET', '/api/search?tag=Team:ml&tag=Team:data&op=or&type=Instances,Volumes', None),
+        ],
+        '/api/ec2-free-tier-usage': [(2, 'GET', '/api/ec2-free-tier-usage', None)],
+        '/api/aws-cost-explorer': [(2, 'GET', '/api/aws-cost-explorer', None)],
+        '/api/aws-cost-explorer/matrix': [(2, 'GET', '/api/aws-cost-explorer/matrix?top=8', None)],
+        '/api/aws-cost-explorer/top-services': [(1, 'GET', '/api/aws-cost-explorer/top-services', None)],
+        '/api/aws-cost-explorer/deltas': [(1, 'GET', '/api/aws-cost-explorer/deltas?top=8', None)],
+        '/api/aws-cost-explorer/rolling': [(1, 'GET', '/api/aws-cost-explorer/rolling?top=8', None)],
+    }
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))]
+
+
+def summarize(samples):
+    # samples: [(seconds, status)]
+    latencies = sorted(seconds for seconds, _ in samples)
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for _, status in samples if status >= 400),
+        'p50Ms': round(percentile(latencies, 0.50) * 1000, 2) if latencies else None,
+        'p99Ms': round(percentile(latencies, 0.99) * 1000, 2) if latencies else None,
+        'maxMs': round(latencies[-1] * 1000, 2) if latencies else None,
+    }
+
+
+def send(port, method, path, body):
+    # A browser-like request: a new connection, compressed responses accepted, body read.
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+    try:
+        payload = json.dumps(body) if body is not None else None
+        headers = {'Accept-Encoding': 'gzip, br'}
+        if payload is not None:
+            headers['Content-Type'] = 'application/json'
+        started = time.perf_counter()
+        conn.request(method, path, body=payload, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        return time.perf_counter() - started, response.status
+    except OSError:
+        return time.perf_counter() - started, 599
+    finally:
+        conn.close()
+
+
+def rss_kb():
+    # Current resident set size (Linux); peak comes from getrusage.
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError):
+        return None
+
+
+def run_worker(args):
+    # Runs one account size in this process and writes the results as JSON to args.output.
+    sys.path.insert(0, BACKEND_DIR)
+    sys.path.insert(0, BENCH_DIR)
+    import boto3
+    from fake_aws import FakeAWS, SyntheticAccount
+
+    started = time.perf_counter()
+    account = SyntheticAccount(args.worker, seed=args.seed)
+    generated_s = time.perf_counter() - started
+    fake = FakeAWS(account, latency=args.upstream_latency_ms / 1000)
+    boto3.setup_default_session()
+    fake.install(boto3.DEFAULT_SESSION._session)
+
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    import app as dashboard
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server('127.0.0.1', 0, dashboard.app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_port
+
+    mix = request_mix(account)
+    routes = sorted(rule.rule for rule in dashboard.app.url_map.iter_rules()
+                    if rule.rule.startswith('/api/') and rule.rule not in EXCLUDED_ROUTES)
+    missing = [route for route in routes if route not in mix]
+    if missing:
+        raise SystemExit(f"No benchmark requests defined for: {', '.join(missing)}")
+    rss_before_kb = rss_kb()
+
+    # Cold: each route once, in turn, with the describe cache emptied before each.
+    cold = {}
+    for route in routes:
+        _, method, path, body = mix[route][0]
+        dashboard.inventory_cache.invalidate(*dashboard.RESOURCE_SOURCES, 'Regions')
+        seconds, status = send(port, method, path, body)
+        cold[route] = {'ms': round(seconds * 1000, 2), 'status': status}
+
+    # Steady state: weighted random requests from --concurrency threads.
+    requests = [(route, method, path, body) for route in routes for weight, method, path, body in mix[route]
+                for _ in range(weight if not args.read_only or method == 'GET' else 0)]
+    samples = {}
+    samples_lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+
+    def load(worker_id):
+        rng = random.Random(args.seed * 1000 + worker_id)
+        local = []
+        while time.perf_counter() < deadline:
+            route, method, path, body = rng.choice(requests)
+            local.append((route,) + send(port, method, path, body))
+        with samples_lock:
+            for route, seconds, status in local:
+                samples.setdefault(route, []).append((seconds, status))
+
+    load_started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(load, range(args.concurrency)))
+    elapsed = time.perf_counter() - load_started
+    server.shutdown()
+
+    all_samples = [sample for route_samples in samples.values() for sample in route_samples]
+    results = {
+        'resources': args.worker,
+        'accountCounts': account.counts(),
+        'accountGenerationSeconds': round(generated_s, 2),
+        'concurrency': args.concurrency,
+        'durationSeconds': round(elapsed, 2),
+        'upstreamLatencyMs': args.upstream_latency_ms,
+        'env': dict(pair.split('=', 1) for pair in args.set),
+        'cold': cold,
+        'routes': {route: summarize(route_samples) for route, route_samples in sorted(samples.items())},
+        'overall': dict(summarize(all_samples), throughputRps=round(len(all_samples) / elapsed, 1)),
+        'rssBeforeLoadKb': rss_before_kb,
+        'rssAfterLoadKb': rss_kb(),
+        'peakRssKb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'upstreamCalls': dict(sorted(fake.calls.items())),
+    }
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+
+def print_report(results):
+    overall = results['overall']
+    print(f"\n=== {results['resources']:,} resources: {overall['throughputRps']} req/s, "
+          f"p50 {overall['p50Ms']} ms, p99 {overall['p99Ms']} ms, errors {overall['errors']}/{overall['requests']}, "
+          f"peak RSS {results['peakRssKb'] / 1024:.0f} MiB ===")
+    print(f"{'route':44} {'cold ms':>9} {'reqs':>6} {'errs':>5} {'p50 ms':>9} {'p99 ms':>9}")
+    for route, cold in results['cold'].items():
+        stats = results['routes'].get(route, {'requests': 0, 'errors': 0, 'p50Ms': None, 'p99Ms': None})
+        print(f"{route:44} {cold['ms']:>9} {stats['requests']:>6} {stats['errors']:>5} {str(stats['p50Ms']):>9} {str(stats['p99Ms']):>9}")
+    print(f"upstream calls: {sum(results['upstreamCalls'].values())}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='100,10000,100000', help='Comma-separated account sizes (resources).')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=30, help='Seconds of steady-state load per size.')
+    parser.add_argument('--upstream-latency-ms', type=float, default=50, help='Simulated latency of every AWS call.')
+    parser.add_argument('--read-only', action='store_true', help='Leave the write routes out of the steady-state mix.')
+    parser.add_argument('--set', action='append', default=[], metavar='NAME=VALUE', help='Environment variable for the app.')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help='Also write every size\'s results to this file.')
+    parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--output', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        run_worker(args)
+        return
+
+    all_results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in (int(value) for value in args.sizes.split(',')):
+            output = os.path.join(workdir, f'{size}.json')
+            env = dict(
+                os.environ,
+                AWS_ACCESS_KEY_ID='benchmark', AWS_SECRET_ACCESS_KEY='benchmark', AWS_REGION='us-east-1',
+                AWS_EC2_METADATA_DISABLED='true', COST_STORE_PATH=os.path.join(workdir, f'cost-{size}.sqlite3'),
+            )
+            env.update(pair.split('=', 1) for pair in args.set)
+            command = [sys.executable, os.path.abspath(__file__), '--worker', str(size), '--output', output,
+                       '--concurrency', str(args.concurrency), '--duration', str(args.duration),
+                       '--upstream-latency-ms', str(args.upstream_latency_ms), '--seed', str(args.seed)]
+            command += [option for pair in args.set for option in ('--set', pair)]
+            if args.read_only:
+                command.append('--read-only')
+            print(f"Running {size:,} resources...", file=sys.stderr)
+            subprocess.run(command, env=env, check=True, stdout=subprocess.DEVNULL)
+            with open(output) as f:
+                results = json.load(f)
+            print_report(results)
+            all_results.append(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(all_results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
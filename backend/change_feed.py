@@ -0,0 +1,151 @@
+# backend/change_feed.py
+# Resource change events for the live /api/events stream.
+#
+# The inventory sync is the only thing polling AWS. After each publish, the feed diffs the
+# previous snapshot against the new one and fans the resulting created/updated/deleted
+# events out to every connected browser, so N open pages cost one poll loop, not N.
+import asyncio
+import queue
+import threading
+import time
+from collections import deque
+
+# Put on a subscriber's queue when it fell too far behind; the stream then ends and the
+# browser reconnects with Last-Event-ID, replaying whatever history still covers.
+OVERFLOWED = object()
+
+
+def diff_rows(resource, old_rows, new_rows):
+    events = []
+    for resource_id, row in new_rows.items():
+        old = old_rows.get(resource_id)
+        if old is None:
+            events.append({'type': 'created', 'resource': resource, 'resourceId': resource_id, 'row': row})
+        elif old != row:
+            changes = {field: [old.get(field), row.get(field)] for field in set(old) | set(row) if old.get(field) != row.get(field)}
+            event = {'type': 'updated', 'resource': resource, 'resourceId': resource_id, 'row': row, 'changes': changes}
+            if 'State' in changes:
+                event['stateTransition'] = {'from': changes['State'][0], 'to': changes['State'][1]}
+            events.append(event)
+    for resource_id, row in old_rows.items():
+        if resource_id not in new_rows:
+            events.append({'type': 'deleted', 'resource': resource, 'resourceId': resource_id, 'row': row})
+    return events
+
+
+class Subscription:
+    def __init__(self, max_queue):
+        self.queue = queue.Queue(maxsize=max_queue)
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def notify(self):
+        # Called after every put; blocking get() needs no extra wake-up.
+        pass
+
+
+class AsyncSubscription(Subscription):
+    # For the async server. Events are still queued by the sync thread; the subscriber's
+    # event loop is woken thread-safely instead of a thread blocking on the queue. Create it
+    # on that event loop.
+    def __init__(self, max_queue):
+        super().__init__(max_queue)
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+
+    async def get(self, timeout):
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            pass
+        self._wake.clear()
+        try:
+            return self.queue.get_nowait() # Put between the first check and clear()
+        except queue.Empty:
+            pass
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def notify(self):
+        try:
+            self._loop.call_soon_threadsafe(self._wake.set)
+        except RuntimeError:
+            pass # Loop already closed; the subscriber is gone
+
+
+class ChangeFeed:
+    def __init__(self, history=1000, max_queue=1000):
+        self.max_queue = max_queue
+        self._history = deque(maxlen=history)
+        self._subscribers = set()
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def on_publish(self, previous, snapshot):
+        # InventorySync listener. Types whose rows didn't change keep the very same dict, so
+        # the identity check skips them without comparing anything.
+        events = []
+        for resource, new_rows in snapshot.resources.items():
+            old_rows = previous.resources.get(resource)
+            if old_rows is None or old_rows is new_rows:
+                continue # First sync of a type is a baseline, not a burst of creations
+            events.extend(diff_rows(resource, old_rows, new_rows))
+        if events:
+            self.publish(events, snapshot.version)
+
+    def publish(self, events, version=None):
+        with self._lock:
+            for event in events:
+                event['id'] = self._next_id
+                event['version'] = version
+                event['at'] = time.time()
+                self._next_id += 1
+                self._history.append(event)
+                for subscription in list(self._subscribers):
+                    try:
+                        subscription.queue.put_nowait(event)
+                    except queue.Full:
+                        self._subscribers.discard(subscription)
+                        self._force_put(subscription.queue, OVERFLOWED)
+                    subscription.notify()
+
+    def subscribe(self, last_event_id=None, subscription_class=Subscription):
+        subscription = subscription_class(self.max_queue)
+        with self._lock:
+            if last_event_id is not None:
+                for event in self._history:
+                    if event['id'] > last_event_id:
+                        self._force_put(subscription.queue, event)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    @staticmethod
+    def _force_put(target, item):
+        # Make room by dropping the oldest queued item; only used for replay and overflow.
+        while True:
+            try:
+                target.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    target.get_nowait()
+                except queue.Empty:
+                    pass
@@ -0,0 +1,120 @@
+# backend/cost_pivot.py
+# Server-side pivots over Cost Explorer results.
+#
+# CE's ResultsByTime (one group per service and period) is flattened into three columns
+# (period, service, amount) and pivoted into a services x periods matrix with np.add.at. Top-N
+# with an "Other" row, period-over-period deltas and rolling averages are then whole-matrix
+# operations, and a response carries just the matrix the chart draws instead of one row per
+# service and period.
+import numpy as np
+
+OTHER = 'Other'
+
+
+def nullable(values):
+    # NaN (no previous period, division by zero) becomes null in JSON.
+    return [[None if np.isnan(value) else round(float(value), 2) for value in row] for row in values]
+
+
+class CostFrame:
+    def __init__(self, periods, services, values, unit='USD'):
+        # periods: sorted period starts; services: row labels; values: services x periods
+        self.periods = list(periods)
+        self.services = list(services)
+        self.values = values
+        self.unit = unit
+
+    @classmethod
+    def from_results(cls, results_by_time, metric='UnblendedCost'):
+        period_column = []
+        service_column = []
+        amount_column = []
+        unit = 'USD'
+        for result in results_by_time:
+            for group in result['Groups']:
+                period_column.append(result['TimePeriod']['Start'])
+                service_column.append(group['Keys'][0] if group['Keys'] else 'No Service')
+                amount_column.append(group['Metrics'][metric]['Amount'])
+                unit = group['Metrics'][metric].get('Unit', unit)
+        # Periods without any groups still get a column.
+        periods = np.unique(np.array([result['TimePeriod']['Start'] for result in results_by_time], dtype=str))
+        services, service_index = np.unique(np.array(service_column, dtype=str), return_inverse=True)
+        values = np.zeros((len(services), len(periods)))
+        if amount_column:
+            period_index = np.searchsorted(periods, np.array(period_column, dtype=str))
+            np.add.at(values, (service_index, period_index), np.array(amount_column, dtype=float))
+        return cls(periods.tolist(), services.tolist(), values, unit)
+
+    def top(self, n):
+        # The n services with the highest total, largest first, plus one "Other" row for the rest.
+        totals = self.values.sum(axis=1)
+        order = np.argsort(-totals, kind='stable')
+        if n is None or len(order) <= n:
+            return CostFrame(self.periods, [self.services[i] for i in order], self.values[order], self.unit)
+        kept, rest = order[:n], order[n:]
+        values = np.vstack([self.values[kept], self.values[rest].sum(axis=0, keepdims=True)])
+        return CostFrame(self.periods, [self.services[i] for i in kept] + [OTHER], values, self.unit)
+
+    def matrix(self):
+        return {
+            'periods': self.periods,
+            'services': self.services,
+            'values': np.round(self.values, 2).tolist(),
+            'periodTotals': np.round(self.values.sum(axis=0), 2).tolist(),
+            'serviceTotals': np.round(self.values.sum(axis=1), 2).tolist(),
+            'total': round(float(self.values.sum()), 2),
+            'unit': self.unit,
+        }
+
+    def top_services(self, n):
+        frame = self.top(n)
+        totals = frame.values.sum(axis=1)
+        total = float(totals.sum())
+        shares = totals / total if total else np.zeros_like(totals)
+        return {
+            'services': [
+                {'Service': service, 'Amount': round(float(amount), 2), 'Share': round(float(share), 4)}
+                for service, amount, share in zip(frame.services, totals, shares)
+            ],
+            'total': round(total, 2),
+            'unit': self.unit,
+        }
+
+    def deltas(self):
+        # Change from each period to the next, per service and in total; percent is null
+        # where the previous period was zero.
+        def changes(values):
+            difference = np.diff(values, axis=-1)
+            previous = values[..., :-1]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                percent = np.where(previous != 0, difference / previous * 100, np.nan)
+            return difference, percent
+
+        difference, percent = changes(self.values)
+        total_difference, total_percent = changes(self.values.sum(axis=0, keepdims=True))
+        return {
+            'periods': self.periods[1:],
+            'services': self.services,
+            'delta': np.round(difference, 2).tolist(),
+            'percent': nullable(percent),
+            'totalDelta': np.round(total_difference[0], 2).tolist(),
+            'totalPercent': nullable(total_percent)[0],
+            'unit': self.unit,
+        }
+
+    def rolling(self, window):
+        # Trailing mean over `window` periods, from cumulative sums; null until a full window.
+        def trailing(values):
+            sums = np.cumsum(np.pad(values, [(0, 0)] * (values.ndim - 1) + [(1, 0)]), axis=-1)
+            means = np.full(values.shape, np.nan)
+            means[..., window - 1:] = (sums[..., window:] - sums[..., :-window]) / window
+            return means
+
+        return {
+            'periods': self.periods,
+            'services': self.services,
+            'window': window,
+            'values': nullable(trailing(self.values)),
+            'total': nullable(trailing(self.values.sum(axis=0, keepdims=True)))[0],
+            'unit': self.unit,
+        }
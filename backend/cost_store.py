@@ -0,0 +1,201 @@
+# backend/cost_store.py
+# Persistent store for Cost Explorer results.
+#
+# Cost Explorer bills per request, and most of what the dashboard asks for never changes:
+# once a day or month has closed (and AWS no longer marks it Estimated) its numbers are
+# final. Each ResultsByTime entry is stored in SQLite under the query it answers and its
+# period. Closed periods are reused forever; only the open period is re-fetched, after a
+# short TTL. A repeat page load therefore costs zero or one CE calls.
+#
+# Missing periods are fetched in windows of at most WINDOW_PERIODS periods, a few at a time,
+# so a multi-year DAILY range costs a handful of parallel round trips rather than a long
+# serial chain of pages. Every page of each window is followed (CE pages large group-bys).
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from single_flight import SingleFlight
+
+
+def parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def split_periods(start, end, granularity):
+    # The [start, end) periods CE reports for a range, as ISO date strings.
+    periods = []
+    current = parse_date(start)
+    last = parse_date(end)
+    while current < last:
+        if granularity == 'DAILY':
+            following = current + timedelta(days=1)
+        else:
+            following = (current.replace(day=1) + timedelta(days=32)).replace(day=1)
+        following = min(following, last)
+        periods.append((current.isoformat(), following.isoformat()))
+        current = following
+    return periods
+
+
+# Periods per CE request. Each request is billed ($0.01), so windows stay large: splitting
+# only pays off once a range is long enough to need several pages anyway.
+WINDOW_PERIODS = {'DAILY': 90, 'MONTHLY': 12}
+
+
+def missing_windows(periods, missing, window_periods):
+    # Contiguous runs of missing periods (cached periods in between are not re-fetched), cut
+    # into windows of at most window_periods periods, as [(start, end)] in order.
+    windows = []
+    run = []
+    for period in periods + [None]:
+        if period is not None and period in missing and len(run) < window_periods:
+            run.append(period)
+            continue
+        if run:
+            windows.append((run[0][0], run[-1][1]))
+        run = [period] if period is not None and period in missing else []
+    return windows
+
+
+class CostStore:
+    def __init__(self, path, open_period_ttl=3600, max_concurrency=4):
+        self.path = path
+        self.open_period_ttl = open_period_ttl
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+        # Windows in flight across all requests. The rate limiter paces the calls themselves;
+        # keeping this below CE's requests per second means they queue for well under its
+        # max_wait and are never shed.
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='cost-fetch')
+        # Periods answered from the store vs. periods that had to be fetched from CE.
+        self.hits = 0
+        self.misses = 0
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cost_results (
+                    query_key TEXT NOT NULL,
+                    period_start TEXT NOT NULL,
+                    period_end TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    closed INTEGER NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (query_key, period_start, period_end)
+                )
+            """)
+
+    @contextmanager
+    def _connection(self):
+        # A short-lived connection per operation keeps the store safe to share across threads.
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def query_key(granularity, metrics, group_by=None, filter=None):
+        return json.dumps({
+            'granularity': granularity,
+            'metrics': sorted(metrics),
+            'groupBy': group_by or [],
+            'filter': filter or {},
+        }, sort_keys=True)
+
+    def get_cost_and_usage(self, ce_client, start, end, granularity, metrics, group_by=None, filter=None):
+        # Same arguments and ResultsByTime shape as ce_client.get_cost_and_usage, but only the
+        # periods missing from the store (or open and past their TTL) are requested from CE.
+        key = self.query_key(granularity, metrics, group_by, filter)
+        periods = split_periods(start, end, granularity)
+        cached = self._load(key, periods)
+
+        missing = [period for period in periods if period not in cached]
+        with self._lock:
+            self.hits += len(periods) - len(missing)
+            self.misses += len(missing)
+        if missing:
+            windows = missing_windows(periods, set(missing), WINDOW_PERIODS.get(granularity, 1))
+
+            # Each window is saved as soon as it arrives. Concurrent requests missing the same
+            # window wait for that one fetch instead of paying for their own.
+            def fetch_window(window):
+                def fetch_and_save():
+                    fetched = self._fetch(ce_client, window[0], window[1], granularity, metrics, group_by, filter)
+                    self._save(key, fetched)
+                    return fetched
+                return self._flights.do((key,) + window, fetch_and_save)
+
+            if len(windows) == 1:
+                fetched_windows = [fetch_window(windows[0])]
+            else:
+                fetched_windows = self._executor.map(fetch_window, windows)
+            for fetched in fetched_windows:
+                for result in fetched:
+                    cached[(result['TimePeriod']['Start'], result['TimePeriod']['End'])] = result
+
+        return {'ResultsByTime': [cached[period] for period in periods if period in cached]}
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+    def _load(self, key, periods):
+        if not periods:
+            return {}
+        now = time.time()
+        with self._lock, self._connection() as conn:
+            rows = conn.execute(
+                "SELECT period_start, period_end, result, closed, fetched_at FROM cost_results "
+                "WHERE query_key = ? AND period_start >= ? AND period_end <= ?",
+                (key, periods[0][0], periods[-1][1]),
+            ).fetchall()
+        cached = {}
+        for period_start, period_end, result, closed, fetched_at in rows:
+            if closed or now - fetched_at < self.open_period_ttl:
+                cached[(period_start, period_end)] = json.loads(result)
+        return cached
+
+    def _fetch(self, ce_client, start, end, granularity, metrics, group_by, filter):
+        kwargs = {
+            'TimePeriod': {'Start': start, 'End': end},
+            'Granularity': granularity,
+            'Metrics': metrics,
+        }
+        if group_by:
+            kwargs['GroupBy'] = group_by
+        if filter:
+            kwargs['Filter'] = filter
+        # Pages may split one period's groups, so groups are merged per period.
+        results = {}
+        while True:
+            response = ce_client.get_cost_and_usage(**kwargs)
+            for result in response['ResultsByTime']:
+                period = (result['TimePeriod']['Start'], result['TimePeriod']['End'])
+                if period in results:
+                    results[period]['Groups'].extend(result.get('Groups', []))
+                    results[period]['Estimated'] = results[period].get('Estimated', False) or result.get('Estimated', False)
+                else:
+                    results[period] = result
+            if not response.get('NextPageToken'):
+                return list(results.values())
+            kwargs['NextPageToken'] = response['NextPageToken']
+
+    def _save(self, key, results):
+        today = datetime.utcnow().date().isoformat()
+        now = time.time()
+        rows = []
+        for result in results:
+            period = result['TimePeriod']
+            # CE keeps revising the last period for a few days after it ends; Estimated says so.
+            closed = period['End'] <= today and not result.get('Estimated', False)
+            rows.append((key, period['Start'], period['End'], json.dumps(result), int(closed), now))
+        with self._lock, self._connection() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO cost_results (query_key, period_start, period_end, result, closed, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
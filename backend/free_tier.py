@@ -0,0 +1,92 @@
+# backend/free_tier.py
+# Month-to-date EC2 free tier usage with a burn-rate projection.
+#
+# Daily usage comes through the CostStore. Finalized days are stored permanently and only
+# days Cost Explorer still marks as estimated (today, usually yesterday) are re-fetched,
+# at most once per COST_OPEN_PERIOD_TTL. A page load therefore costs one call covering a
+# day or two, or none. The month is then a NumPy array of daily hours: cumulative usage,
+# burn rate, the month-end projection and the day the limit is (or will be) crossed are
+# whole-array operations.
+from calendar import monthrange
+from datetime import timedelta
+
+import numpy as np
+
+FREE_TIER_LIMIT_HOURS = 750
+FREE_TIER_USAGE_TYPES = [
+    "BoxUsage:t2.micro", "BoxUsage:t3.micro", "BoxUsage:t2.micro:windows",
+    "BoxUsage:t3.micro:windows", "BoxUsage:t2.micro:rhel", "BoxUsage:t3.micro:rhel",
+    "BoxUsage:t2.micro:sles", "BoxUsage:t3.micro:sles",
+]
+FREE_TIER_FILTER = {"Or": [
+    {"Dimensions": {"Key": "USAGE_TYPE", "Values": FREE_TIER_USAGE_TYPES}},
+    {"Dimensions": {"Key": "INSTANCE_TYPE", "Values": ["t2.micro", "t3.micro"]}},
+]}
+
+
+class FreeTierTracker:
+    def __init__(self, cost_store, limit_hours=FREE_TIER_LIMIT_HOURS, burn_window_days=7):
+        self.cost_store = cost_store
+        self.limit_hours = limit_hours
+        # The burn rate is the mean over this many most recent complete days.
+        self.burn_window_days = burn_window_days
+
+    def daily_hours(self, ce_client, today):
+        # Hours for each day of the month up to and including today (today is partial).
+        first = today.replace(day=1)
+        response = self.cost_store.get_cost_and_usage(
+            ce_client, first.isoformat(), (today + timedelta(days=1)).isoformat(),
+            granularity='DAILY',
+            metrics=['UsageQuantity'],
+            filter=FREE_TIER_FILTER,
+            group_by=[{"Type": "DIMENSION", "Key": "USAGE_TYPE"}],
+        )
+        hours = np.zeros(today.day)
+        for result in response['ResultsByTime']:
+            day = int(result['TimePeriod']['Start'][8:10])
+            hours[day - 1] = sum(float(group['Metrics']['UsageQuantity']['Amount']) for group in result['Groups'])
+        return hours
+
+    def usage(self, ce_client, today):
+        # today: the current UTC date (Cost Explorer days are UTC).
+        days_in_month = monthrange(today.year, today.month)[1]
+        daily = self.daily_hours(ce_client, today)
+        cumulative = np.cumsum(daily)
+        used = float(cumulative[-1])
+
+        complete = daily[:-1][-self.burn_window_days:]
+        # On the 1st there is no complete day yet; today's partial hours are a lower bound.
+        burn_rate = float(complete.mean()) if complete.size else float(daily[-1])
+
+        # Projected cumulative hours at the end of each remaining day, today included. Today
+        # is projected from yesterday's total so the partial day doesn't drag it down.
+        before_today = float(cumulative[-2]) if today.day > 1 else 0.0
+        remaining_days = days_in_month - today.day + 1
+        projected = np.maximum(before_today + burn_rate * np.arange(1, remaining_days + 1), used)
+
+        limit_reached_on = projected_limit_date = None
+        crossed = int(np.searchsorted(cumulative, self.limit_hours))
+        if crossed < cumulative.size:
+            limit_reached_on = today.replace(day=crossed + 1).isoformat()
+        else:
+            crossing = int(np.searchsorted(projected, self.limit_hours))
+            if crossing < projected.size:
+                projected_limit_date = (today + timedelta(days=crossing)).isoformat()
+
+        month_days = [today.replace(day=day) for day in range(1, days_in_month + 1)]
+        return {
+            "labels": [day.strftime('%b %d') for day in month_days[:today.day]],
+            "data": np.round(daily, 2).tolist(),
+            "cumulative": np.round(cumulative, 2).tolist(),
+            "totalCurrentMonthUsage": round(used, 2),
+            "freeTierLimitHours": self.limit_hours,
+            "remainingHours": round(self.limit_hours - used, 2),
+            "dailyBurnRate": round(burn_rate, 2),
+            "projection": {
+                "labels": [day.strftime('%b %d') for day in month_days[today.day - 1:]],
+                "cumulative": np.round(projected, 2).tolist(),
+            },
+            "projectedMonthEndHours": round(float(projected[-1]), 2),
+            "limitReachedOn": limit_reached_on,
+            "projectedLimitDate": projected_limit_date,
+        }
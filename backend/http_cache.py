@@ -0,0 +1,84 @@
+# backend/http_cache.py
+# Conditional GET and compression helpers for the /api/* JSON responses.
+#
+# ResponseMemo keeps the serialized body, its ETag and any compressed variants for a URL
+# together with the data version they were built from. While the version is unchanged, a
+# request reuses them: no re-serialization, no re-hashing and no re-compression.
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError: # Optional: fall back to gzip only
+    brotli = None
+
+MIN_COMPRESS_BYTES = 1024
+
+
+def compute_etag(body):
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def negotiate_encoding(accept_encoding):
+    # accept_encoding is werkzeug's parsed Accept-Encoding header.
+    if brotli is not None and accept_encoding['br'] > 0:
+        return 'br'
+    if accept_encoding['gzip'] > 0:
+        return 'gzip'
+    return None
+
+
+def compress_body(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+class MemoEntry:
+    def __init__(self, version, body, etag):
+        self.version = version
+        self.body = body
+        self.etag = etag
+        self.encoded = {}
+
+
+class ResponseMemo:
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.version != version:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, version, body):
+        entry = MemoEntry(version, body, compute_etag(body))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+    def encoded(self, entry, encoding):
+        # Compressed once per entry and encoding; a race at worst compresses twice.
+        body = entry.encoded.get(encoding)
+        if body is None:
+            body = compress_body(entry.body, encoding)
+            entry.encoded[encoding] = body
+        return body
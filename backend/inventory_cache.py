@@ -0,0 +1,151 @@
+# backend/inventory_cache.py
+# A small in-process cache that sits in front of the boto3 describe calls.
+#
+# Entries are fresh for their TTL. After that they are served stale for a grace period while
+# one background refresh reloads them, so a busy dashboard never waits on AWS for data it
+# already has. Past the grace period a read reloads synchronously. The cache holds a bounded
+# number of entries and evicts the least recently used one first.
+import asyncio
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+CacheEntry = namedtuple('CacheEntry', ['value', 'loaded_at', 'ttl', 'tags', 'version'])
+
+
+class TTLCache:
+    def __init__(self, max_entries=512, stale_seconds=300, refresh_workers=4):
+        self.max_entries = max_entries
+        self.stale_seconds = stale_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        # Bumped by invalidate(), so a load that started before a write can't store its
+        # pre-write result afterwards.
+        self._generations = {}
+        # Every stored value gets a new version number, so callers can tell whether the data
+        # behind a derived result (a serialized response, say) has changed.
+        self._next_version = 0
+        self._tasks = set()
+        self._refresh_executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix='cache-refresh')
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def get_or_load(self, key, loader, ttl, tags=()):
+        if ttl <= 0:
+            return loader()
+        found, value, generation = self._lookup(key, ttl, tags, lambda: self._refresh_executor.submit(self._refresh, key, loader, ttl, tags))
+        if found:
+            return value
+        value = loader()
+        self._store(key, value, ttl, tags, generation)
+        return value
+
+    async def get_or_load_async(self, key, loader, ttl, tags=()):
+        # Same as get_or_load for the async server: loader is a coroutine function, and stale
+        # entries are refreshed by a task on the running event loop instead of a thread.
+        if ttl <= 0:
+            return await loader()
+        found, value, generation = self._lookup(key, ttl, tags, lambda: self._spawn(self._refresh_async(key, loader, ttl, tags)))
+        if found:
+            return value
+        value = await loader()
+        self._store(key, value, ttl, tags, generation)
+        return value
+
+    def _lookup(self, key, ttl, tags, schedule_refresh):
+        # Returns (found, value, generation); generation is what a miss must store under.
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                age = now - entry.loaded_at
+                if age < entry.ttl:
+                    self.hits += 1
+                    return True, entry.value, None
+                if age < entry.ttl + self.stale_seconds:
+                    self.stale_hits += 1
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        schedule_refresh()
+                    return True, entry.value, None
+            self.misses += 1
+            return False, None, self._generation(tags)
+
+    def version_of(self, key):
+        # Only fresh entries report a version. Once an entry goes stale, callers have to read
+        # it through get_or_load again, which is what triggers its refresh.
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry.loaded_at >= entry.ttl:
+                return None
+            return entry.version
+
+    def invalidate(self, *tags):
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+            stale_keys = [key for key, entry in self._entries.items() if set(entry.tags) & set(tags)]
+            for key in stale_keys:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'maxEntries': self.max_entries,
+                'hits': self.hits,
+                'staleHits': self.stale_hits,
+                'misses': self.misses,
+            }
+
+    def _generation(self, tags):
+        return tuple(self._generations.get(tag, 0) for tag in tags)
+
+    def _store(self, key, value, ttl, tags, generation):
+        with self._lock:
+            if self._generation(tags) != generation:
+                return
+            self._next_version += 1
+            self._entries[key] = CacheEntry(value, time.monotonic(), ttl, tuple(tags), self._next_version)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _refresh(self, key, loader, ttl, tags):
+        try:
+            with self._lock:
+                generation = self._generation(tags)
+            value = loader()
+            self._store(key, value, ttl, tags, generation)
+        except Exception as e:
+            # Keep serving the stale value; the next read past the grace period retries inline.
+            print(f"Error refreshing cache entry {key}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    async def _refresh_async(self, key, loader, ttl, tags):
+        try:
+            with self._lock:
+                generation = self._generation(tags)
+            value = await loader()
+            self._store(key, value, ttl, tags, generation)
+        except Exception as e:
+            print(f"Error refreshing cache entry {key}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _spawn(self, coroutine):
+        # The loop only keeps weak references to tasks, so hold on to them until they finish.
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
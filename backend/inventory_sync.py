@@ -0,0 +1,187 @@
+# backend/inventory_sync.py
+# Background inventory sync.
+#
+# A single thread periodically pulls every resource type and publishes an immutable,
+# versioned InventorySnapshot. Publishing is a single reference swap, so request handlers
+# either see the previous snapshot or the new one, never a half-built mix. Handlers read
+# the snapshot directly instead of calling AWS, which keeps request throughput independent
+# of the account's API rate limits.
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+UNCHANGED = object()
+
+
+class InventorySnapshot:
+    def __init__(self, version, resources, sync_stats, indexes=None, type_versions=None):
+        self.version = version
+        # {resource type: snapshot version in which that type's rows last changed}
+        self.type_versions = type_versions or {}
+        # {resource type: {resource id: row}}, in upstream order.
+        self.resources = resources
+        # {resource type: {'syncedAt', 'durationMs', 'count', 'error'}}
+        self.sync_stats = sync_stats
+        # {resource type: secondary index over that type's rows}, built during the sync.
+        self.indexes = indexes or {}
+
+    def _require(self, resource):
+        if resource not in self.resources:
+            error = self.sync_stats.get(resource, {}).get('error', 'not synced yet')
+            raise LookupError(f"{resource} inventory is unavailable: {error}")
+
+    def rows(self, resource):
+        self._require(resource)
+        return list(self.resources[resource].values())
+
+    def index(self, resource):
+        self._require(resource)
+        return self.indexes[resource]
+
+    def get(self, resource, resource_id):
+        return self.resources.get(resource, {}).get(resource_id)
+
+    def count(self, resource):
+        if resource not in self.resources:
+            return None
+        return len(self.resources[resource])
+
+
+class InventorySync:
+    def __init__(self, fetchers, id_of, index_of=None, interval=0, max_workers=4):
+        # fetchers: {resource type: callable returning that type's rows}
+        # id_of: callable(resource type, row) -> the row's id within its type
+        # index_of: optional callable(resource type, rows) -> secondary index, or None
+        self.fetchers = fetchers
+        self.id_of = id_of
+        self.index_of = index_of
+        self.interval = interval
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='inventory-sync')
+        self._snapshot = InventorySnapshot(0, {}, {})
+        self._publish_lock = threading.Lock()
+        self._first_sync_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._listeners = []
+
+    @property
+    def enabled(self):
+        return self.interval > 0
+
+    def start(self):
+        if not self.enabled:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='inventory-sync-loop', daemon=True)
+                self._thread.start()
+
+    def snapshot(self):
+        # Readers normally get the last published snapshot immediately. Only the very first
+        # read of a cold process waits, once, for an inline sync.
+        if self._snapshot.version == 0:
+            self._first_sync()
+        return self._snapshot
+
+    def add_listener(self, listener):
+        # listener(previous snapshot, new snapshot), called after every publish.
+        self._listeners.append(listener)
+
+    def request_refresh(self, *resources):
+        # Called after writes: the loop wakes up and re-syncs just these types.
+        with self._pending_lock:
+            self._pending.update(resources)
+        self._wake.set()
+
+    def sync(self, resources=None):
+        resources = list(resources or self.fetchers)
+        futures = {resource: self._executor.submit(self._fetch, resource) for resource in resources}
+        results = {resource: future.result() for resource, future in futures.items()}
+
+        with self._publish_lock:
+            previous = self._snapshot
+            version = previous.version + 1
+            merged = dict(previous.resources)
+            indexes = dict(previous.indexes)
+            type_versions = dict(previous.type_versions)
+            stats = dict(previous.sync_stats)
+            for resource, (indexed, index, stat) in results.items():
+                if indexed is not None and index is not UNCHANGED:
+                    merged[resource] = indexed
+                    indexes[resource] = index
+                    type_versions[resource] = version
+                elif indexed is None:
+                    # Keep serving the last good copy of a type whose sync failed.
+                    stat = dict(previous.sync_stats.get(resource, {}), error=stat['error'], durationMs=stat['durationMs'])
+                stats[resource] = stat
+            snapshot = InventorySnapshot(version, merged, stats, indexes, type_versions)
+            self._snapshot = snapshot
+            # Still under the publish lock, so listeners see publishes one at a time and in order.
+            for listener in self._listeners:
+                try:
+                    listener(previous, snapshot)
+                except Exception as e:
+                    print(f"Error in inventory sync listener: {e}")
+        return snapshot
+
+    def status(self):
+        snapshot = self._snapshot
+        return {
+            'enabled': self.enabled,
+            'intervalSeconds': self.interval,
+            'version': snapshot.version,
+            'resources': snapshot.sync_stats,
+        }
+
+    def _first_sync(self):
+        # Shared by the loop and cold readers so a fresh process syncs exactly once.
+        with self._first_sync_lock:
+            if self._snapshot.version == 0:
+                self.sync()
+
+    def _fetch(self, resource):
+        started = time.perf_counter()
+        try:
+            rows = self.fetchers[resource]()
+            indexed = {self.id_of(resource, row): row for row in rows}
+            if indexed == self._snapshot.resources.get(resource):
+                # Nothing changed: the published rows, index and type version stay as they are.
+                index = UNCHANGED
+            else:
+                # Built here, on the sync worker, so readers never pay for it.
+                index = self.index_of(resource, list(indexed.values())) if self.index_of else None
+            error = None
+        except Exception as e:
+            print(f"Error syncing {resource} inventory: {e}")
+            indexed = index = None
+            error = str(e)
+        stat = {
+            'syncedAt': time.time() if indexed is not None else None,
+            'durationMs': round((time.perf_counter() - started) * 1000, 1),
+            'count': len(indexed) if indexed is not None else None,
+            'error': error,
+        }
+        return indexed, index, stat
+
+    def _run(self):
+        next_full_sync = 0.0
+        while True:
+            self._wake.clear()
+            now = time.monotonic()
+            with self._pending_lock:
+                pending, self._pending = self._pending, set()
+            try:
+                if next_full_sync == 0.0:
+                    self._first_sync()
+                    next_full_sync = time.monotonic() + self.interval
+                elif now >= next_full_sync:
+                    self.sync()
+                    next_full_sync = time.monotonic() + self.interval
+                elif pending:
+                    self.sync(pending)
+            except Exception as e:
+                print(f"Error in inventory sync loop: {e}")
+            self._wake.wait(timeout=max(0.0, next_full_sync - time.monotonic()))
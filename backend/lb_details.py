@@ -0,0 +1,134 @@
+# backend/lb_details.py
+# Tags, target groups and target health for every load balancer in a region.
+#
+# Done naively that is a describe_tags, a describe_target_groups and a describe_target_health
+# per load balancer, one after another. Here tags go TAG_BATCH_SIZE ARNs (or classic names)
+# per call, the API maximum, and target groups come from one paginated listing of the region,
+# since each group names the load balancers it belongs to. Only health has no batch form:
+# one call per target group (per classic load balancer), run concurrently on a bounded pool.
+# A 500-LB account costs about 25 tag calls, a page or two of target groups and one health
+# call per group, with the pool's worth in flight at a time.
+from collections import Counter, defaultdict
+
+# describe_tags accepts at most 20 resource ARNs (elbv2) or load balancer names (classic).
+TAG_BATCH_SIZE = 20
+
+
+def batches(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def elbv2_tags(client, arns):
+    response = client.describe_tags(ResourceArns=arns)
+    return {d['ResourceArn']: {tag['Key']: tag['Value'] for tag in d.get('Tags', [])} for d in response['TagDescriptions']}
+
+
+def classic_tags(client, names):
+    response = client.describe_tags(LoadBalancerNames=names)
+    return {d['LoadBalancerName']: {tag['Key']: tag['Value'] for tag in d.get('Tags', [])} for d in response['TagDescriptions']}
+
+
+def submit_tag_lookups(elbv2_client, elb_client, arns, names, executor):
+    futures = [executor.submit(elbv2_tags, elbv2_client, batch) for batch in batches(arns, TAG_BATCH_SIZE)]
+    futures += [executor.submit(classic_tags, elb_client, batch) for batch in batches(names, TAG_BATCH_SIZE)]
+    return futures
+
+
+def collect_tags(futures):
+    tags = {}
+    for future in futures:
+        tags.update(future.result())
+    return tags
+
+
+def load_balancer_tags(rows, elbv2_client, elb_client, executor):
+    # {ARN (ELBv2) or name (classic): {key: value}} for the given load balancer rows.
+    arns = [row['Arn'] for row in rows if row['Type'] != 'Classic']
+    names = [row['Name'] for row in rows if row['Type'] == 'Classic']
+    return collect_tags(submit_tag_lookups(elbv2_client, elb_client, arns, names, executor))
+
+
+def target_health(client, target_group_arn):
+    response = client.describe_target_health(TargetGroupArn=target_group_arn)
+    return [{
+        'Id': d['Target']['Id'],
+        'Port': d['Target'].get('Port'),
+        'AvailabilityZone': d['Target'].get('AvailabilityZone'),
+        'State': d.get('TargetHealth', {}).get('State'),
+        'Reason': d.get('TargetHealth', {}).get('Reason'),
+    } for d in response['TargetHealthDescriptions']]
+
+
+def instance_health(client, name):
+    response = client.describe_instance_health(LoadBalancerName=name)
+    return [{
+        'Id': state['InstanceId'],
+        'State': state.get('State'),
+        'Reason': state.get('ReasonCode'),
+    } for state in response['InstanceStates']]
+
+
+def health_counts(targets):
+    return dict(Counter(target['State'] or 'unknown' for target in targets))
+
+
+def load_balancer_details(rows, elbv2_client, elb_client, executor):
+    # rows: load balancer rows as the list route returns them (Arn for ELBv2, Name for
+    # classic). Returns the same rows with Tags, TargetGroups (ELBv2) or Instances (classic)
+    # and a HealthCounts summary. A group or load balancer whose health call fails carries
+    # an Error instead of failing the whole response.
+    elbv2 = [row for row in rows if row['Type'] != 'Classic']
+    classic = [row for row in rows if row['Type'] == 'Classic']
+    arns = [row['Arn'] for row in elbv2]
+    names = [row['Name'] for row in classic]
+
+    tag_futures = submit_tag_lookups(elbv2_client, elb_client, arns, names, executor)
+    groups_by_lb = defaultdict(list)
+    if arns:
+        wanted = set(arns)
+        pages = elbv2_client.get_paginator('describe_target_groups').paginate()
+        for group in pages.build_full_result().get('TargetGroups', []):
+            for arn in group.get('LoadBalancerArns', []):
+                if arn in wanted:
+                    groups_by_lb[arn].append(group)
+
+    group_arns = {group['TargetGroupArn'] for groups in groups_by_lb.values() for group in groups}
+    health_futures = {arn: executor.submit(target_health, elbv2_client, arn) for arn in sorted(group_arns)}
+    health_futures.update({name: executor.submit(instance_health, elb_client, name) for name in names})
+
+    tags = collect_tags(tag_futures)
+
+    def health(key):
+        try:
+            return health_futures[key].result(), None
+        except Exception as e:
+            print(f"Error describing health for {key}: {e}")
+            return [], str(e)
+
+    details = []
+    for row in elbv2:
+        target_groups = []
+        for group in groups_by_lb.get(row['Arn'], []):
+            targets, error = health(group['TargetGroupArn'])
+            entry = {
+                'TargetGroupName': group.get('TargetGroupName'),
+                'TargetGroupArn': group['TargetGroupArn'],
+                'Protocol': group.get('Protocol'),
+                'Port': group.get('Port'),
+                'TargetType': group.get('TargetType'),
+                'HealthCheckPath': group.get('HealthCheckPath'),
+                'Targets': targets,
+                'HealthCounts': health_counts(targets),
+            }
+            if error:
+                entry['Error'] = error
+            target_groups.append(entry)
+        all_targets = [target for group in target_groups for target in group['Targets']]
+        details.append(dict(row, Tags=tags.get(row['Arn'], {}), TargetGroups=target_groups, HealthCounts=health_counts(all_targets)))
+    for row in classic:
+        instances, error = health(row['Name'])
+        entry = dict(row, Tags=tags.get(row['Name'], {}), Instances=instances, HealthCounts=health_counts(instances))
+        if error:
+            entry['Error'] = error
+        details.append(entry)
+    return details
@@ -0,0 +1,160 @@
+# backend/metrics.py
+# Prometheus instrumentation, served at /metrics.
+#
+# Request latency is recorded per route and AWS call latency per operation, from botocore's
+# own event hooks, so a slow page can be pinned on the app or on a specific describe call.
+# Everything else (cache hit ratios, coalescing, rate limiting, sync) is read from the
+# components' existing counters only when Prometheus scrapes, which keeps the request path
+# down to a couple of histogram observations.
+import time
+
+from botocore import xform_name
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from rate_limiter import THROTTLING_ERROR_CODES
+
+# Seconds; covers cached answers (sub-millisecond) through full-account describes.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time to produce a response, by route.',
+    ['method', 'route', 'status'], buckets=LATENCY_BUCKETS,
+)
+JSON_SERIALIZE_LATENCY = Histogram(
+    'json_serialize_duration_seconds', 'Time spent serializing resource list responses.',
+    buckets=LATENCY_BUCKETS,
+)
+AWS_CALL_LATENCY = Histogram(
+    'aws_api_call_duration_seconds', 'AWS API call latency, retries included.',
+    ['service', 'operation', 'region'], buckets=LATENCY_BUCKETS,
+)
+AWS_CALLS = Counter('aws_api_calls', 'AWS API calls by outcome.', ['service', 'operation', 'region', 'outcome'])
+AWS_RETRIES = Counter('aws_api_retries', 'Retry attempts made by botocore.', ['service', 'operation', 'region'])
+AWS_THROTTLES = Counter('aws_api_throttles', 'Attempts AWS answered with a throttling error.', ['service', 'operation', 'region'])
+
+
+def observe_request(method, route, status, seconds):
+    REQUEST_LATENCY.labels(method, route, str(status)).observe(seconds)
+
+
+def instrument_client(client):
+    # Works for boto3 and aiobotocore clients alike; all the handlers are synchronous.
+    service = client.meta.service_model.service_name
+    region = client.meta.region_name
+
+    def before_call(context, **kwargs):
+        context['metrics_started'] = time.perf_counter()
+
+    def after_call(http_response, parsed, model, context, **kwargs):
+        operation = xform_name(model.name)
+        started = context.get('metrics_started')
+        if started is not None:
+            AWS_CALL_LATENCY.labels(service, operation, region).observe(time.perf_counter() - started)
+        AWS_CALLS.labels(service, operation, region, 'ok' if http_response.status_code < 300 else 'error').inc()
+        retries = parsed.get('ResponseMetadata', {}).get('RetryAttempts')
+        if retries:
+            AWS_RETRIES.labels(service, operation, region).inc(retries)
+
+    def after_call_error(event_name, context, **kwargs):
+        # Connection failures and timeouts, after botocore gave up retrying.
+        AWS_CALLS.labels(service, xform_name(event_name.rsplit('.', 1)[-1]), region, 'exception').inc()
+
+    def needs_retry(response, operation, **kwargs):
+        # Emitted after every attempt, so throttles that a retry recovered from count too.
+        if response is not None and response[1].get('Error', {}).get('Code') in THROTTLING_ERROR_CODES:
+            AWS_THROTTLES.labels(service, xform_name(operation.name), region).inc()
+
+    # First on the Stubber's node, like the rate limiter, so stubbed calls are timed too.
+    client.meta.events.register_first('before-call.*.*', before_call)
+    client.meta.events.register('after-call', after_call)
+    client.meta.events.register('after-call-error', after_call_error)
+    client.meta.events.register('needs-retry', needs_retry)
+
+
+class StatsCollector:
+    # Turns the components' own stats() dicts into metric families at scrape time.
+    def __init__(self):
+        self._caches = {}
+        self._sources = []
+
+    def add_cache(self, name, stats):
+        # stats() -> {'hits', 'misses', optionally 'staleHits'}
+        self._caches[name] = stats
+
+    def add_source(self, collect):
+        # collect() -> iterable of metric families
+        self._sources.append(collect)
+
+    def collect(self):
+        hits = CounterMetricFamily('app_cache_hits', 'Cache hits (stale hits included).', labels=['cache'])
+        misses = CounterMetricFamily('app_cache_misses', 'Cache misses.', labels=['cache'])
+        ratio = GaugeMetricFamily('app_cache_hit_ratio', 'Hits / (hits + misses) since start.', labels=['cache'])
+        for name, stats in self._caches.items():
+            values = stats()
+            cache_hits = values.get('hits', 0) + values.get('staleHits', 0)
+            cache_misses = values.get('misses', 0)
+            hits.add_metric([name], cache_hits)
+            misses.add_metric([name], cache_misses)
+            ratio.add_metric([name], cache_hits / (cache_hits + cache_misses) if cache_hits + cache_misses else 0.0)
+        yield hits
+        yield misses
+        yield ratio
+        for collect in self._sources:
+            yield from collect()
+
+
+def single_flight_metrics(stats):
+    executed = CounterMetricFamily('aws_single_flight_executed', 'Upstream calls actually made.')
+    executed.add_metric([], stats['executed'])
+    coalesced = CounterMetricFamily('aws_single_flight_coalesced', 'Calls that joined an identical one in flight.')
+    coalesced.add_metric([], stats['coalesced'])
+    return [executed, coalesced]
+
+
+def rate_limit_metrics(stats):
+    # stats: {"service:operation": {'calls', 'queued', 'waitSeconds', 'shed'}}
+    families = {
+        'calls': CounterMetricFamily('aws_rate_limit_admitted', 'Calls admitted by the client-side rate limiter.', labels=['api']),
+        'queued': CounterMetricFamily('aws_rate_limit_queued', 'Admitted calls that had to wait for a token.', labels=['api']),
+        'waitSeconds': CounterMetricFamily('aws_rate_limit_wait_seconds', 'Total time spent waiting for tokens.', labels=['api']),
+        'shed': CounterMetricFamily('aws_rate_limit_shed', 'Calls rejected instead of queued.', labels=['api']),
+    }
+    for api, values in stats.items():
+        for key, family in families.items():
+            family.add_metric([api], values[key])
+    return list(families.values())
+
+
+def inventory_sync_metrics(status):
+    version = GaugeMetricFamily('inventory_sync_version', 'Version of the published inventory snapshot.')
+    version.add_metric([], status['version'])
+    duration = GaugeMetricFamily('inventory_sync_duration_seconds', 'Duration of the last sync, by resource type.', labels=['resource'])
+    count = GaugeMetricFamily('inventory_sync_resources', 'Resources in the snapshot, by type.', labels=['resource'])
+    failing = GaugeMetricFamily('inventory_sync_failing', '1 when the last sync of a type failed.', labels=['resource'])
+    for resource, stat in status['resources'].items():
+        if stat.get('durationMs') is not None:
+            duration.add_metric([resource], stat['durationMs'] / 1000)
+        if stat.get('count') is not None:
+            count.add_metric([resource], stat['count'])
+        failing.add_metric([resource], 1 if stat.get('error') else 0)
+    return [version, duration, count, failing]
+
+
+def startup_metrics(startup):
+    families = [GaugeMetricFamily('app_import_seconds', 'Time to import the app module, clients included when prewarmed.')]
+    families[0].add_metric([], startup['importSeconds'])
+    if startup['importToFirstRequestSeconds'] is not None:
+        first = GaugeMetricFamily('app_import_to_first_request_seconds', 'Time from the start of the import to the first request.')
+        first.add_metric([], startup['importToFirstRequestSeconds'])
+        families.append(first)
+    return families
+
+
+stats_collector = StatsCollector()
+REGISTRY.register(stats_collector)
+
+
+def metrics_response():
+    # (body, content type) for the /metrics route.
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
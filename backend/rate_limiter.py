@@ -0,0 +1,137 @@
+# backend/rate_limiter.py
+# Client-side token buckets that keep the app inside the account's AWS API rate limits.
+#
+# AWS throttles each API action with its own token bucket per account and region. Every
+# request handler shares one bucket per (service, region, operation) here, sized below the
+# AWS one, so concurrent requests queue briefly instead of drawing RequestLimitExceeded
+# errors. A call that would have to wait longer than max_wait is shed at once with
+# RateLimitExceeded rather than tying up a worker.
+import asyncio
+import threading
+import time
+from fnmatch import fnmatchcase
+
+from botocore import xform_name
+
+# (pattern, tokens per second, burst). The first matching "service:operation" pattern wins;
+# operations use boto3 method names. EC2's own buckets are 20/s (burst 100) for describes
+# and 5/s (burst 200) for mutating calls; Cost Explorer allows about 5 requests per second.
+DEFAULT_RATE_LIMITS = [
+    ('ec2:describe_*', 20, 100),
+    ('ec2:*', 5, 200),
+    ('ce:*', 5, 5),
+    ('*', 10, 40),
+]
+
+
+# Error codes AWS services use when they throttle a call. Everything that needs to tell a
+# throttle from a real failure (metrics, retries) uses this one set.
+THROTTLING_ERROR_CODES = {
+    'Throttling', 'ThrottlingException', 'ThrottledException', 'RequestThrottledException',
+    'TooManyRequestsException', 'RequestLimitExceeded', 'RequestThrottled', 'SlowDown',
+    'EC2ThrottledException', 'LimitExceededException', 'ProvisionedThroughputExceededException',
+}
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, operation, retry_after):
+        super().__init__(f"Rate limit for {operation} exceeded; retry in {retry_after:.1f}s.")
+        self.operation = operation
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait):
+        # Takes a token and returns how long the caller must wait before using it, or None
+        # (taking nothing) when that wait would exceed max_wait. Tokens may go negative: each
+        # queued caller owns a later slot, so waiters are served in arrival order.
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = max(0.0, (1 - self._tokens) / self.rate)
+            if wait > max_wait:
+                return None
+            self._tokens -= 1
+            return wait
+
+
+class RateLimiter:
+    def __init__(self, rules=None, max_wait=2.0):
+        self.rules = list(rules or DEFAULT_RATE_LIMITS)
+        self.max_wait = max_wait
+        self._buckets = {}
+        self._lock = threading.Lock()
+        # {"service:operation": {'calls', 'queued', 'waitSeconds', 'shed'}}
+        self._stats = {}
+
+    def bucket(self, service, region, operation):
+        key = (service, region, operation)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            name = f"{service}:{operation}"
+            rate, burst = next((rate, burst) for pattern, rate, burst in self.rules if fnmatchcase(name, pattern))
+            with self._lock:
+                bucket = self._buckets.setdefault(key, TokenBucket(rate, burst))
+        return bucket
+
+    def reserve(self, service, region, operation):
+        wait = self.bucket(service, region, operation).reserve(self.max_wait)
+        with self._lock:
+            stats = self._stats.setdefault(f"{service}:{operation}", {'calls': 0, 'queued': 0, 'waitSeconds': 0.0, 'shed': 0})
+            if wait is None:
+                stats['shed'] += 1
+            else:
+                stats['calls'] += 1
+                if wait > 0:
+                    stats['queued'] += 1
+                    stats['waitSeconds'] += wait
+        if wait is None:
+            raise RateLimitExceeded(operation, 1 / self.bucket(service, region, operation).rate)
+        return wait
+
+    def attach(self, client):
+        # Every API call (each page of a paginated one) takes a token from the client's own
+        # before-call event ("before-call.<service id>.<OperationName>"). Retries of a call are
+        # paced by botocore's adaptive retry mode instead. Registered first on the same node
+        # the botocore Stubber uses, so stubbed calls are limited too.
+        service = client.meta.service_model.service_name
+        region = client.meta.region_name
+
+        def before_call(event_name, **kwargs):
+            wait = self.reserve(service, region, xform_name(event_name.rsplit('.', 1)[-1]))
+            if wait:
+                time.sleep(wait)
+        client.meta.events.register_first('before-call.*.*', before_call)
+
+    def attach_async(self, client):
+        # aiobotocore awaits coroutine handlers, so waiting doesn't block the event loop.
+        service = client.meta.service_model.service_name
+        region = client.meta.region_name
+
+        async def before_call(event_name, **kwargs):
+            wait = self.reserve(service, region, xform_name(event_name.rsplit('.', 1)[-1]))
+            if wait:
+                await asyncio.sleep(wait)
+        client.meta.events.register_first('before-call.*.*', before_call)
+
+    def stats(self):
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+
+def parse_rate_limits(value):
+    # "ec2:describe_*=10/50,ce:*=2/2" (rate/burst) -> rules checked before the defaults.
+    rules = []
+    for pair in filter(None, (part.strip() for part in value.split(','))):
+        pattern, _, limit = pair.partition('=')
+        rate, _, burst = limit.partition('/')
+        rules.append((pattern.strip(), float(rate), float(burst or rate)))
+    return rules + DEFAULT_RATE_LIMITS
@@ -0,0 +1,93 @@
+# backend/resource_index.py
+# Secondary indexes over a list of resource rows, built once per data version.
+#
+# Equality filters and tags use hash postings, Name prefix search uses a sorted name list,
+# and every sortable field has a precomputed rank. A query starts from its most selective
+# condition and checks the rest by membership, so its cost follows the size of the result
+# rather than the size of the inventory.
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import chain
+
+EMPTY = frozenset()
+
+
+def sort_key(value):
+    # Missing values sort last; everything else compares as-is (ISO timestamps sort as text).
+    return (value is None or value == 'N/A', value if value is not None else '')
+
+
+class ResourceIndex:
+    def __init__(self, rows, filter_fields, name_field, sort_fields):
+        # filter_fields: {query parameter: row field}
+        self.rows = rows
+        self.filter_fields = filter_fields
+        self.sort_fields = sort_fields
+
+        self._postings = {}
+        for param, field in filter_fields.items():
+            postings = defaultdict(set)
+            for position, row in enumerate(rows):
+                postings[row.get(field)].add(position)
+            self._postings[param] = dict(postings)
+
+        tag_postings = defaultdict(set)
+        tag_key_postings = defaultdict(set)
+        for position, row in enumerate(rows):
+            for key, value in (row.get('Tags') or {}).items():
+                tag_postings[(key, value)].add(position)
+                tag_key_postings[key].add(position)
+        self._tag_postings = dict(tag_postings)
+        self._tag_key_postings = dict(tag_key_postings)
+
+        self._lower_names = [(row.get(name_field) or '').lower() for row in rows]
+        self._name_order = sorted(range(len(rows)), key=self._lower_names.__getitem__)
+        self._sorted_names = [self._lower_names[position] for position in self._name_order]
+
+        self._orders = {}
+        self._ranks = {}
+        for field in sort_fields:
+            order = sorted(range(len(rows)), key=lambda position: sort_key(rows[position].get(field)))
+            ranks = [0] * len(rows)
+            for rank, position in enumerate(order):
+                ranks[position] = rank
+            self._orders[field] = order
+            self._ranks[field] = ranks
+
+    def query(self, filters=None, tags=(), name_prefix=None, sort=None, descending=False):
+        # filters: {query parameter: [accepted values]}; tags: [(key, value or None)]
+        conditions = []
+        for param, values in (filters or {}).items():
+            # The posting sets are used as-is (never copied), so a broad condition costs
+            # nothing unless it is the one being iterated.
+            postings = [self._postings[param].get(value, EMPTY) for value in set(values)]
+            size = sum(len(posting) for posting in postings)
+            if len(postings) == 1:
+                conditions.append((size, postings[0], postings[0].__contains__))
+            else:
+                conditions.append((size, chain(*postings), lambda position, postings=postings: any(position in posting for posting in postings)))
+        for key, value in tags:
+            matches = self._tag_key_postings.get(key, EMPTY) if value is None else self._tag_postings.get((key, value), EMPTY)
+            conditions.append((len(matches), matches, matches.__contains__))
+        if name_prefix:
+            prefix = name_prefix.lower()
+            low = bisect_left(self._sorted_names, prefix)
+            high = bisect_left(self._sorted_names, prefix + '\uffff')
+            conditions.append((high - low, self._name_order[low:high], lambda position: self._lower_names[position].startswith(prefix)))
+
+        if not conditions:
+            positions = list(self._orders[sort]) if sort else list(range(len(self.rows)))
+            if sort and descending:
+                positions.reverse()
+            return [self.rows[position] for position in positions]
+
+        conditions.sort(key=lambda condition: condition[0])
+        _, smallest, _ = conditions[0]
+        checks = [contains for _, _, contains in conditions[1:]]
+        positions = [position for position in smallest if all(check(position) for check in checks)]
+
+        if sort:
+            positions.sort(key=self._ranks[sort].__getitem__, reverse=descending)
+        else:
+            positions.sort()
+        return [self.rows[position] for position in positions]
@@ -0,0 +1,225 @@
+# backend/sg_exposure.py
+# Rule-level index over security groups, for exposure questions such as "which groups open
+# port 22 to 0.0.0.0/0" or "what admits 10.1.2.3 on 5432".
+#
+# Every (permission, source) pair of every group becomes one entry, stored column-wise. Port
+# ranges go into a static interval tree, CIDR sources into per-prefix-length tables, and
+# group or prefix-list references into hash postings. A query starts from the most selective
+# structure it can use and checks its other conditions against the entry's columns, so it
+# costs the size of its answer plus a logarithmic walk instead of a scan over every rule.
+import socket
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+
+ALL_PORTS = (0, 65535)
+# IpProtocol may be a name or an IANA number; '-1' means every protocol (and every port).
+PROTOCOL_NAMES = {'6': 'tcp', '17': 'udp', '1': 'icmp', '58': 'icmpv6', 'all': '-1'}
+PORT_PROTOCOLS = {'tcp', 'udp', '-1'}
+ADDRESS_BITS = {4: 32, 6: 128}
+
+
+def normalize_protocol(protocol):
+    protocol = str(protocol).lower()
+    return PROTOCOL_NAMES.get(protocol, protocol)
+
+
+def parse_cidr(value):
+    # "10.0.0.0/8" or "2001:db8::/32" -> (version, prefix length, address as int), or None
+    # for anything else. Much cheaper than ipaddress.ip_network, which matters at 100k rules.
+    address, _, length = value.partition('/')
+    version = 6 if ':' in address else 4
+    try:
+        packed = socket.inet_pton(socket.AF_INET6 if version == 6 else socket.AF_INET, address)
+        length = int(length) if length else ADDRESS_BITS[version]
+    except (OSError, ValueError):
+        return None
+    if not 0 <= length <= ADDRESS_BITS[version]:
+        return None
+    return version, length, int.from_bytes(packed, 'big')
+
+
+class IntervalTree:
+    # Static centered interval tree over closed integer intervals. Each node keeps the
+    # intervals containing its center twice, sorted by start and by end, so an overlap query
+    # visits O(log n) nodes and reads only matching intervals from each.
+    def __init__(self, intervals):
+        # intervals: [(start, end, id)]
+        self._root = self._build(sorted(intervals, key=lambda interval: interval[0]))
+
+    def _build(self, intervals):
+        # intervals arrive sorted by start and the partitions keep that order. The middle
+        # interval's start is the center: that interval stays here and at most half of the
+        # rest go to either side, so the tree stays balanced.
+        if not intervals:
+            return None
+        center = intervals[len(intervals) // 2][0]
+        left, right, here = [], [], []
+        for interval in intervals:
+            if interval[1] < center:
+                left.append(interval)
+            elif interval[0] > center:
+                right.append(interval)
+            else:
+                here.append(interval)
+        by_end = sorted(here, key=lambda interval: -interval[1])
+        return (
+            center,
+            [start for start, _, _ in here], [id for _, _, id in here],
+            [-end for _, end, _ in by_end], [id for _, _, id in by_end],
+            self._build(left), self._build(right),
+        )
+
+    def overlapping(self, low, high):
+        # ids of the intervals that share at least one point with [low, high]
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            center, starts, start_ids, negative_ends, end_ids, left, right = node
+            if high < center:
+                # Every interval here ends at or after center, so only its start matters.
+                found.extend(start_ids[:bisect_right(starts, high)])
+                stack.append(left)
+            elif low > center:
+                found.extend(end_ids[:bisect_right(negative_ends, -low)])
+                stack.append(right)
+            else:
+                found.extend(start_ids)
+                stack.append(left)
+                stack.append(right)
+        return found
+
+
+class PrefixTable:
+    # CIDR blocks grouped by (IP version, prefix length), each group a dict from the block's
+    # prefix bits to entry ids plus the same keys sorted. Blocks containing a network are one
+    # dict lookup per length present; blocks inside it are one bisect per length.
+    def __init__(self, entries):
+        # entries: [((version, prefix length, address), id)]
+        tables = defaultdict(lambda: defaultdict(list))
+        for (version, length, address), id in entries:
+            tables[(version, length)][address >> (ADDRESS_BITS[version] - length)].append(id)
+        self._tables = {key: (dict(table), sorted(table)) for key, table in tables.items()}
+
+    def covering(self, network):
+        # ids of blocks that contain all of `network` (the block itself included)
+        version, prefix_length, address = network
+        found = []
+        for (table_version, length), (table, _) in self._tables.items():
+            if table_version == version and length <= prefix_length:
+                found.extend(table.get(address >> (ADDRESS_BITS[version] - length), ()))
+        return found
+
+    def within(self, network):
+        # ids of blocks that lie inside `network` (the block itself included)
+        version, prefix_length, address = network
+        first = address >> (ADDRESS_BITS[version] - prefix_length) << (ADDRESS_BITS[version] - prefix_length)
+        last = first | ((1 << (ADDRESS_BITS[version] - prefix_length)) - 1)
+        found = []
+        for (table_version, length), (table, keys) in self._tables.items():
+            if table_version == version and length >= prefix_length:
+                bits = ADDRESS_BITS[version] - length
+                for key in keys[bisect_left(keys, first >> bits):bisect_right(keys, last >> bits)]:
+                    found.extend(table[key])
+        return found
+
+
+class ExposureIndex:
+    def __init__(self, rows):
+        # rows: security group rows as the list route returns them
+        self.rows = rows
+        self._group = []
+        self._direction = []
+        self._protocol = []
+        self._ports = []
+        self._source = []
+        self._description = []
+        self._by_protocol = defaultdict(list)
+        self._by_reference = defaultdict(list)
+        intervals = []
+        cidrs = []
+
+        for position, row in enumerate(rows):
+            for direction, permissions in (('ingress', row.get('IpPermissions')), ('egress', row.get('IpPermissionsEgress'))):
+                for permission in permissions or []:
+                    protocol = normalize_protocol(permission.get('IpProtocol', '-1'))
+                    if protocol not in PORT_PROTOCOLS:
+                        ports = None # ICMP type/code and port-less protocols
+                    elif protocol == '-1' or 'FromPort' not in permission:
+                        ports = ALL_PORTS
+                    else:
+                        ports = (permission['FromPort'], permission['ToPort'])
+                    sources = [(r['CidrIp'], r.get('Description')) for r in permission.get('IpRanges', [])]
+                    sources += [(r['CidrIpv6'], r.get('Description')) for r in permission.get('Ipv6Ranges', [])]
+                    sources += [(r['PrefixListId'], r.get('Description')) for r in permission.get('PrefixListIds', [])]
+                    sources += [(r['GroupId'], r.get('Description')) for r in permission.get('UserIdGroupPairs', []) if r.get('GroupId')]
+                    for source, description in sources:
+                        id = len(self._source)
+                        self._group.append(position)
+                        self._direction.append(direction)
+                        self._protocol.append(protocol)
+                        self._ports.append(ports)
+                        self._source.append(source)
+                        self._description.append(description)
+                        self._by_protocol[protocol].append(id)
+                        if ports is not None:
+                            intervals.append((ports[0], ports[1], id))
+                        network = parse_cidr(source)
+                        if network is None:
+                            self._by_reference[source].append(id) # sg-... or pl-...
+                        else:
+                            cidrs.append((network, id))
+
+        self._ports_tree = IntervalTree(intervals)
+        self._prefixes = PrefixTable(cidrs)
+
+    @property
+    def rule_count(self):
+        return len(self._source)
+
+    def query(self, direction='ingress', protocol=None, ports=None, source=None, match='covers'):
+        # protocol: 'tcp', 'udp', 'icmp', a number or None for any. Rules for all protocols
+        #   ('-1') match every protocol.
+        # ports: (low, high) inclusive; rules whose port range overlaps it match.
+        # source: a CIDR block or address, or a security group / prefix list id. With
+        #   match='covers' a rule matches when its CIDR contains the whole source (it admits
+        #   that traffic); with match='overlaps' when the two share any address.
+        protocol = normalize_protocol(protocol) if protocol is not None else None
+        network = parse_cidr(source) if source is not None else None
+        if source is not None and network is None:
+            candidates = self._by_reference.get(source, [])
+        elif network is not None:
+            candidates = self._prefixes.covering(network)
+            if match == 'overlaps':
+                candidates = set(candidates).union(self._prefixes.within(network))
+        elif ports is not None:
+            candidates = self._ports_tree.overlapping(*ports)
+        elif protocol is not None:
+            candidates = self._by_protocol.get(protocol, []) + (self._by_protocol.get('-1', []) if protocol != '-1' else [])
+        else:
+            candidates = range(len(self._source))
+
+        matches = []
+        for id in sorted(candidates):
+            if self._direction[id] != direction:
+                continue
+            if protocol is not None and self._protocol[id] not in (protocol, '-1'):
+                continue
+            rule_ports = self._ports[id]
+            if ports is not None and (rule_ports is None or rule_ports[1] < ports[0] or rule_ports[0] > ports[1]):
+                continue
+            row = self.rows[self._group[id]]
+            matches.append({
+                'GroupId': row.get('GroupId'),
+                'GroupName': row.get('GroupName'),
+                'VpcId': row.get('VpcId'),
+                'Direction': direction,
+                'IpProtocol': self._protocol[id],
+                'FromPort': rule_ports[0] if rule_ports else None,
+                'ToPort': rule_ports[1] if rule_ports else None,
+                'Source': self._source[id],
+                'Description': self._description[id],
+            })
+        return matches
@@ -0,0 +1,72 @@
+# backend/single_flight.py
+# Coalesces identical concurrent upstream calls.
+#
+# While a call for a key is in flight, every other caller asking for the same key waits for
+# it and gets its result (or its exception) instead of issuing a duplicate request. Ten users
+# opening the dashboard together therefore cost one describe_instances, not ten. Nothing is
+# kept once the call finishes; caching is the TTLCache's job.
+import asyncio
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key, fn):
+        # fn is a coroutine function. It runs as its own task and every caller awaits it
+        # through a shield, so one caller timing out or disconnecting doesn't cancel the call
+        # for the others.
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._tasks.pop(key) if self._tasks.get(key) is done else None)
+            with self._lock:
+                self.executed += 1
+        else:
+            with self._lock:
+                self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def stats(self):
+        with self._lock:
+            return {'executed': self.executed, 'coalesced': self.coalesced, 'inFlight': len(self._calls) + len(self._tasks)}
@@ -0,0 +1,48 @@
+# backend/tag_index.py
+# One inverted index from tags to resources across every tagged resource type.
+#
+# Each resource becomes an entry; (key, value) pairs and bare keys map to the set of entries
+# carrying them. A search with several tags is a set intersection (all) or union (any) of
+# their postings, smallest first, so it costs about the size of the smallest posting rather
+# than a pass over the inventory, and callers receive only the matching resources.
+from collections import defaultdict
+
+EMPTY = frozenset()
+
+
+class TagIndex:
+    def __init__(self, documents):
+        # documents: [(resource type, resource id, name, {tag key: value})]
+        self.entries = []
+        self._postings = defaultdict(set)
+        self._key_postings = defaultdict(set)
+        self._by_type = defaultdict(set)
+        for resource, resource_id, name, tags in documents:
+            position = len(self.entries)
+            self.entries.append({'ResourceType': resource, 'Id': resource_id, 'Name': name, 'Tags': tags})
+            self._by_type[resource].add(position)
+            for key, value in tags.items():
+                self._postings[(key, value)].add(position)
+                self._key_postings[key].add(position)
+        self._postings = dict(self._postings)
+        self._key_postings = dict(self._key_postings)
+        self._by_type = dict(self._by_type)
+
+    def posting(self, key, value=None):
+        # value None matches the key with any value.
+        return self._key_postings.get(key, EMPTY) if value is None else self._postings.get((key, value), EMPTY)
+
+    def search(self, tags, match='all', resources=None):
+        # tags: [(key, value or None)]; match: 'all' (AND) or 'any' (OR); resources: optional
+        # resource types to restrict the result to. Entries come back in index order.
+        postings = sorted((self.posting(key, value) for key, value in tags), key=len)
+        if not postings:
+            return []
+        if match == 'all':
+            positions = postings[0].intersection(*postings[1:])
+        else:
+            positions = set().union(*postings)
+        if resources is not None:
+            allowed = set().union(*(self._by_type.get(resource, EMPTY) for resource in resources))
+            positions = positions & allowed
+        return [self.entries[position] for position in sorted(positions)]
@@ -0,0 +1,7 @@
+# backend/tests/conftest.py
+# The backend modules import each other by bare name (they run from backend/), so the tests
+# put that directory on the path the same way. Run with `python -m pytest backend/tests`.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,103 @@
+# backend/tests/test_cost_store.py
+# Period and window splitting in the Cost Explorer store, and what it asks CE for.
+import threading
+
+import pytest
+
+from cost_store import CostStore, missing_windows, split_periods
+
+
+def test_daily_periods_cross_month_and_year_ends():
+    assert split_periods('2023-12-30', '2024-01-02', 'DAILY') == [
+        ('2023-12-30', '2023-12-31'), ('2023-12-31', '2024-01-01'), ('2024-01-01', '2024-01-02'),
+    ]
+    assert split_periods('2024-02-28', '2024-03-01', 'DAILY') == [('2024-02-28', '2024-02-29'), ('2024-02-29', '2024-03-01')]
+
+
+def test_monthly_periods_cut_at_partial_months():
+    assert split_periods('2023-11-15', '2024-02-10', 'MONTHLY') == [
+        ('2023-11-15', '2023-12-01'), ('2023-12-01', '2024-01-01'),
+        ('2024-01-01', '2024-02-01'), ('2024-02-01', '2024-02-10'),
+    ]
+    assert split_periods('2024-01-31', '2024-03-01', 'MONTHLY') == [('2024-01-31', '2024-02-01'), ('2024-02-01', '2024-03-01')]
+
+
+def test_empty_and_reversed_ranges_have_no_periods():
+    assert split_periods('2024-01-01', '2024-01-01', 'DAILY') == []
+    assert split_periods('2024-02-01', '2024-01-01', 'MONTHLY') == []
+
+
+def test_windows_cover_runs_of_missing_periods():
+    periods = split_periods('2023-09-01', '2024-04-01', 'MONTHLY')
+    cached = {('2023-12-01', '2024-01-01')}
+    missing = {period for period in periods if period not in cached}
+    assert missing_windows(periods, missing, 12) == [('2023-09-01', '2023-12-01'), ('2024-01-01', '2024-04-01')]
+
+
+def test_windows_are_cut_at_the_window_size():
+    periods = split_periods('2023-12-25', '2024-01-05', 'DAILY')
+    assert missing_windows(periods, set(periods), 4) == [
+        ('2023-12-25', '2023-12-29'), ('2023-12-29', '2024-01-02'), ('2024-01-02', '2024-01-05'),
+    ]
+
+
+def test_windows_are_contiguous_and_cover_exactly_the_missing_periods():
+    periods = split_periods('2023-01-01', '2025-01-01', 'DAILY')
+    missing = {period for position, period in enumerate(periods) if position % 7 not in (3, 4)}
+    windows = missing_windows(periods, missing, 90)
+    covered = [period for start, end in windows for period in split_periods(start, end, 'DAILY')]
+    assert sorted(covered) == sorted(missing)
+    assert all(len(split_periods(start, end, 'DAILY')) <= 90 for start, end in windows)
+
+
+class FakeCostExplorer:
+    # Answers get_cost_and_usage with one group per period and records each request window;
+    # pages hold at most page_periods periods and continue with NextPageToken.
+    def __init__(self, page_periods=1000):
+        self.page_periods = page_periods
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def get_cost_and_usage(self, TimePeriod, Granularity, Metrics, GroupBy=None, NextPageToken=None):
+        with self._lock:
+            self.requests.append((TimePeriod['Start'], TimePeriod['End'], NextPageToken))
+        periods = split_periods(TimePeriod['Start'], TimePeriod['End'], Granularity)
+        first = int(NextPageToken or 0)
+        page = periods[first:first + self.page_periods]
+        response = {'ResultsByTime': [{
+            'TimePeriod': {'Start': start, 'End': end},
+            'Groups': [{'Keys': ['EC2'], 'Metrics': {'UnblendedCost': {'Amount': '1', 'Unit': 'USD'}}}],
+            'Estimated': False,
+        } for start, end in page]}
+        if first + self.page_periods < len(periods):
+            response['NextPageToken'] = str(first + self.page_periods)
+        return response
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CostStore(str(tmp_path / 'costs.sqlite3'))
+
+
+def test_long_daily_range_is_fetched_in_windows_across_the_year_end(store):
+    ce = FakeCostExplorer()
+    response = store.get_cost_and_usage(ce, '2023-10-01', '2024-03-01', 'DAILY', ['UnblendedCost'])
+    starts = [result['TimePeriod']['Start'] for result in response['ResultsByTime']]
+    assert starts == [start for start, _ in split_periods('2023-10-01', '2024-03-01', 'DAILY')]
+    assert sorted(ce.requests) == [('2023-10-01', '2023-12-30', None), ('2023-12-30', '2024-03-01', None)]
+
+
+def test_closed_periods_are_not_fetched_again(store):
+    ce = FakeCostExplorer()
+    store.get_cost_and_usage(ce, '2023-11-01', '2024-01-01', 'MONTHLY', ['UnblendedCost'])
+    ce.requests.clear()
+    response = store.get_cost_and_usage(ce, '2023-09-01', '2024-03-01', 'MONTHLY', ['UnblendedCost'])
+    assert len(response['ResultsByTime']) == 6
+    assert sorted(ce.requests) == [('2023-09-01', '2023-11-01', None), ('2024-01-01', '2024-03-01', None)]
+
+
+def test_every_page_of_a_window_is_followed(store):
+    ce = FakeCostExplorer(page_periods=10)
+    response = store.get_cost_and_usage(ce, '2023-12-01', '2024-01-15', 'DAILY', ['UnblendedCost'])
+    assert len(response['ResultsByTime']) == 45
+    assert [token for _, _, token in ce.requests] == [None, '10', '20', '30', '40']
@@ -0,0 +1,105 @@
+# backend/tests/test_cursor.py
+# Cursor encoding and the row-counted windows behind ?limit=&cursor= on the list routes.
+import base64
+import json
+import random
+from types import SimpleNamespace
+
+import pytest
+
+import app
+from app import decode_cursor, encode_cursor, resume_position, take_rows
+
+
+def raw_cursor(state):
+    return base64.urlsafe_b64encode(json.dumps(state).encode()).decode()
+
+
+@pytest.mark.parametrize('state', [
+    {'source': 0, 'position': None},
+    {'source': 1, 'position': {'token': 'eyJOZXh0VG9rZW4iOiAiNSJ9'}},
+    {'source': 0, 'position': {'offset': 40}},
+    {'source': 0, 'position': {'token': 'abc', 'skip': 3}},
+    {'source': 0, 'position': {'skip': 2}},
+    {'offset': 100},
+])
+def test_cursor_round_trip(state):
+    assert decode_cursor(encode_cursor(state)) == state
+
+
+@pytest.mark.parametrize('cursor', [
+    'not base64!',
+    raw_cursor([1, 2]),
+    raw_cursor('text'),
+    raw_cursor({'source': -1}),
+    raw_cursor({'source': '0'}),
+    raw_cursor({'source': True}),
+    raw_cursor({'source': 0, 'position': [1]}),
+    raw_cursor({'source': 0, 'position': {}}),
+    raw_cursor({'source': 0, 'position': {'offset': -3}}),
+    raw_cursor({'source': 0, 'position': {'offset': 1.5}}),
+    raw_cursor({'source': 0, 'position': {'token': 5}}),
+    raw_cursor({'source': 0, 'position': {'token': 'a', 'offset': 1}}),
+    raw_cursor({'source': 0, 'position': {'token': 'a', 'skip': -1}}),
+    raw_cursor({'source': 0, 'position': {'token': 'a', 'extra': 1}}),
+])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+# A reservation-like item shapes into one row per element of 'rows'.
+SOURCE = SimpleNamespace(to_rows=lambda item: item['rows'])
+
+
+def test_take_rows_stops_inside_an_item():
+    items = [{'rows': [1, 2]}, {'rows': [3, 4, 5]}, {'rows': [6]}]
+    assert take_rows(SOURCE, items, 0, 4) == ([1, 2, 3, 4], (1, 2))
+    assert take_rows(SOURCE, items, 1, 3) == ([2, 3, 4], (1, 2))
+
+
+def test_take_rows_stops_between_items():
+    items = [{'rows': [1, 2]}, {'rows': [3]}, {'rows': [4]}]
+    assert take_rows(SOURCE, items, 0, 3) == ([1, 2, 3], (2, 0))
+    assert take_rows(SOURCE, items, 0, 4) == ([1, 2, 3, 4], None)
+
+
+def test_resume_position_replaces_skip():
+    advance = lambda position, count: {'offset': (position or {}).get('offset', 0) + count}
+    assert resume_position({'offset': 4, 'skip': 1}, 0, 3, advance) == {'offset': 4, 'skip': 3}
+    assert resume_position({'offset': 4, 'skip': 1}, 2, 0, advance) == {'offset': 6}
+    assert resume_position(None, 0, 2, advance) == {'skip': 2}
+
+
+@pytest.fixture
+def reservations(monkeypatch):
+    # Two sources of reservations holding 1-6 instances each, paged by offset in memory.
+    rng = random.Random(7)
+    sources = []
+    for name in ('a', 'b'):
+        items = [{'rows': [f"{name}{i}-{j}" for j in range(rng.randrange(1, 7))]} for i in range(40)]
+        sources.append(SimpleNamespace(to_rows=lambda item: item['rows'], items=items))
+
+    def fetch_source_window(resource, source, limit, position):
+        offset = position.get('offset', 0) if position else 0
+        window = source.items[offset:offset + limit]
+        next_offset = offset + len(window)
+        return window, ({'offset': next_offset} if next_offset < len(source.items) else None)
+
+    monkeypatch.setitem(app.RESOURCE_SOURCES, 'Test', sources)
+    monkeypatch.setattr(app, 'fetch_source_window', fetch_source_window)
+    return [row for source in sources for item in source.items for row in item['rows']]
+
+
+@pytest.mark.parametrize('limit', [1, 2, 5, 7, 50, 1000])
+def test_windows_never_exceed_the_limit_and_cover_every_row(reservations, limit):
+    seen = []
+    cursor = None
+    while True:
+        rows, cursor = app.fetch_rows_window('Test', limit, cursor)
+        assert len(rows) <= limit
+        seen += rows
+        if cursor is None:
+            break
+        assert len(rows) == limit
+    assert seen == reservations
@@ -0,0 +1,167 @@
+# backend/tests/test_sg_exposure.py
+# The exposure index against a brute-force scan over randomly generated security groups.
+import ipaddress
+import random
+
+import pytest
+
+from sg_exposure import ExposureIndex, IntervalTree, PrefixTable, parse_cidr
+
+PROTOCOLS = ['tcp', 'udp', 'icmp', '-1', '6', '17']
+ALIASES = {'6': 'tcp', '17': 'udp'}
+REFERENCES = ['sg-0001', 'sg-0002', 'pl-0001']
+
+
+def random_cidr(rng):
+    # A small address space, so blocks nest and overlap often.
+    if rng.random() < 0.15:
+        return f"2001:db8:{rng.randrange(4):x}::/{rng.choice([32, 48, 64, 128])}"
+    address = f"10.{rng.randrange(4)}.{rng.randrange(4)}.{rng.randrange(8)}"
+    return f"{address}/{rng.choice([0, 8, 16, 24, 30, 32])}" if rng.random() < 0.9 else address
+
+
+def random_permission(rng):
+    protocol = rng.choice(PROTOCOLS)
+    permission = {'IpProtocol': protocol}
+    if protocol != '-1':
+        low = rng.randrange(0, 1000)
+        permission['FromPort'], permission['ToPort'] = low, low + rng.choice([0, 0, 5, 100])
+    permission['IpRanges'], permission['Ipv6Ranges'] = [], []
+    for _ in range(rng.randrange(1, 4)):
+        cidr = random_cidr(rng)
+        if ':' in cidr:
+            permission['Ipv6Ranges'].append({'CidrIpv6': cidr})
+        else:
+            permission['IpRanges'].append({'CidrIp': cidr, 'Description': 'range'})
+    if rng.random() < 0.3:
+        permission['UserIdGroupPairs'] = [{'GroupId': rng.choice(REFERENCES[:2])}]
+    if rng.random() < 0.1:
+        permission['PrefixListIds'] = [{'PrefixListId': REFERENCES[2]}]
+    return permission
+
+
+def random_groups(rng, count):
+    return [{
+        'GroupId': f"sg-{position:04x}",
+        'GroupName': f"group-{position}",
+        'VpcId': 'vpc-1',
+        'IpPermissions': [random_permission(rng) for _ in range(rng.randrange(0, 5))],
+        'IpPermissionsEgress': [random_permission(rng) for _ in range(rng.randrange(0, 2))],
+    } for position in range(count)]
+
+
+def brute_force(groups, direction='ingress', protocol=None, ports=None, source=None, match='covers'):
+    protocol = ALIASES.get(protocol, protocol)
+    query_network = None
+    if source is not None and source not in REFERENCES:
+        query_network = ipaddress.ip_network(source, strict=False)
+    found = []
+    for group in groups:
+        key = 'IpPermissions' if direction == 'ingress' else 'IpPermissionsEgress'
+        for permission in group[key]:
+            rule_protocol = ALIASES.get(permission['IpProtocol'], permission['IpProtocol'])
+            if protocol is not None and rule_protocol not in (protocol, '-1'):
+                continue
+            if rule_protocol == '-1':
+                rule_ports = (0, 65535)
+            elif rule_protocol in ('tcp', 'udp'):
+                rule_ports = (permission['FromPort'], permission['ToPort'])
+            else:
+                rule_ports = None
+            if ports is not None and (rule_ports is None or rule_ports[1] < ports[0] or rule_ports[0] > ports[1]):
+                continue
+            sources = [r['CidrIp'] for r in permission.get('IpRanges', [])]
+            sources += [r['CidrIpv6'] for r in permission.get('Ipv6Ranges', [])]
+            sources += [r['PrefixListId'] for r in permission.get('PrefixListIds', [])]
+            sources += [r['GroupId'] for r in permission.get('UserIdGroupPairs', [])]
+            for rule_source in sources:
+                if source is not None:
+                    if query_network is None or rule_source in REFERENCES:
+                        if rule_source != source:
+                            continue
+                    else:
+                        rule_network = ipaddress.ip_network(rule_source, strict=False)
+                        if rule_network.version != query_network.version:
+                            continue
+                        if match == 'covers' and not query_network.subnet_of(rule_network):
+                            continue
+                        if match == 'overlaps' and not rule_network.overlaps(query_network):
+                            continue
+                found.append((group['GroupId'], rule_protocol, rule_ports, rule_source))
+    return sorted(found)
+
+
+def index_answer(index, **query):
+    return sorted(
+        (match['GroupId'], match['IpProtocol'],
+         None if match['FromPort'] is None else (match['FromPort'], match['ToPort']), match['Source'])
+        for match in index.query(**query)
+    )
+
+
+def random_query(rng):
+    query = {'direction': rng.choice(['ingress', 'egress'])}
+    if rng.random() < 0.5:
+        query['protocol'] = rng.choice(PROTOCOLS)
+    if rng.random() < 0.5:
+        low = rng.randrange(0, 1100)
+        query['ports'] = (low, low + rng.choice([0, 10, 500]))
+    if rng.random() < 0.6:
+        query['source'] = rng.choice(REFERENCES) if rng.random() < 0.2 else random_cidr(rng)
+        query['match'] = rng.choice(['covers', 'overlaps'])
+    return query
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_queries_match_brute_force(seed):
+    rng = random.Random(seed)
+    groups = random_groups(rng, 60)
+    index = ExposureIndex(groups)
+    for _ in range(50):
+        query = random_query(rng)
+        assert index_answer(index, **query) == brute_force(groups, **query), query
+
+
+def test_open_ssh_to_the_world():
+    groups = [
+        {'GroupId': 'sg-open', 'IpPermissions': [{'IpProtocol': 'tcp', 'FromPort': 22, 'ToPort': 22, 'IpRanges': [{'CidrIp': '0.0.0.0/0'}]}]},
+        {'GroupId': 'sg-vpn', 'IpPermissions': [{'IpProtocol': 'tcp', 'FromPort': 22, 'ToPort': 22, 'IpRanges': [{'CidrIp': '10.0.0.0/8'}]}]},
+        {'GroupId': 'sg-web', 'IpPermissions': [{'IpProtocol': 'tcp', 'FromPort': 443, 'ToPort': 443, 'IpRanges': [{'CidrIp': '0.0.0.0/0'}]}]},
+    ]
+    index = ExposureIndex(groups)
+    assert [m['GroupId'] for m in index.query(ports=(22, 22), source='0.0.0.0/0')] == ['sg-open']
+    assert [m['GroupId'] for m in index.query(ports=(22, 22), source='10.1.2.3')] == ['sg-open', 'sg-vpn']
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_interval_tree_overlaps(seed):
+    rng = random.Random(seed)
+    intervals = []
+    for id in range(300):
+        start = rng.randrange(0, 2000)
+        intervals.append((start, start + rng.choice([0, 1, 10, 300]), id))
+    tree = IntervalTree(intervals)
+    for _ in range(100):
+        low = rng.randrange(0, 2400)
+        high = low + rng.choice([0, 5, 200])
+        expected = sorted(id for start, end, id in intervals if start <= high and end >= low)
+        assert sorted(tree.overlapping(low, high)) == expected
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_prefix_table_covering_and_within(seed):
+    rng = random.Random(seed)
+    cidrs = [random_cidr(rng) for _ in range(200)]
+    table = PrefixTable([(parse_cidr(cidr), id) for id, cidr in enumerate(cidrs)])
+    networks = [ipaddress.ip_network(cidr, strict=False) for cidr in cidrs]
+    for _ in range(100):
+        query = random_cidr(rng)
+        network = ipaddress.ip_network(query, strict=False)
+        same_version = [(id, block) for id, block in enumerate(networks) if block.version == network.version]
+        assert sorted(table.covering(parse_cidr(query))) == [id for id, block in same_version if network.subnet_of(block)]
+        assert sorted(table.within(parse_cidr(query))) == [id for id, block in same_version if block.subnet_of(network)]
+
+
+@pytest.mark.parametrize('value', ['sg-0123', 'pl-1', '10.0.0.0/33', '300.1.1.1', '10.0.0.0/x', ''])
+def test_parse_cidr_rejects_non_cidrs(value):
+    assert parse_cidr(value) is None
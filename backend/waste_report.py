@@ -0,0 +1,128 @@
+# backend/waste_report.py
+# Cross-references instances, volumes, snapshots, Elastic IPs and Auto Scaling membership to
+# find resources that cost money without doing anything.
+#
+# Each list is hashed once by id, and every relationship (volume -> instance, snapshot ->
+# volume, address -> instance, instance -> ASG) is a dictionary lookup, so the report is
+# linear in the size of the account. Inputs are the rows the list routes return.
+#
+# Costs are rough monthly estimates at us-east-1 list prices. A snapshot is priced at its
+# full volume size, which overstates incremental snapshots. Snapshots whose volume is gone
+# may still back an AMI, which this report can't see.
+from datetime import datetime, timezone
+
+# USD per GiB-month
+VOLUME_PRICES = {'gp3': 0.08, 'gp2': 0.10, 'io1': 0.125, 'io2': 0.125, 'st1': 0.045, 'sc1': 0.015, 'standard': 0.05}
+SNAPSHOT_PRICE = 0.05
+# USD per month for a public IPv4 address ($0.005/hour)
+ELASTIC_IP_PRICE = 3.6
+STOPPED_STATES = {'stopped', 'stopping'}
+GONE_STATES = {'terminated', 'shutting-down'}
+
+
+def age_days(timestamp, now):
+    try:
+        started = datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return None
+    if started.tzinfo is None:
+        started = started.replace(tzinfo=timezone.utc)
+    return (now - started).days
+
+
+def volume_cost(volume):
+    return (volume.get('Size') or 0) * VOLUME_PRICES.get(volume.get('VolumeType'), 0.10)
+
+
+def summarize(items, size_field=None):
+    return {
+        'count': len(items),
+        'sizeGiB': sum(item.get(size_field) or 0 for item in items) if size_field else None,
+        'estimatedMonthlyCost': round(sum(item['EstimatedMonthlyCost'] for item in items), 2),
+    }
+
+
+def waste_report(instances, volumes, snapshots, addresses, auto_scaling_groups, now=None):
+    now = now or datetime.now(timezone.utc)
+    instance_states = {instance['InstanceId']: instance['State'] for instance in instances}
+    volume_ids = {volume['VolumeId'] for volume in volumes}
+    group_of = {}
+    for group in auto_scaling_groups:
+        for member in group.get('Instances', []):
+            group_of[member['InstanceId']] = group['AutoScalingGroupName']
+
+    orphaned_volumes = []
+    stopped_instance_volumes = []
+    for volume in volumes:
+        attached = [attachment['InstanceId'] for attachment in volume.get('Attachments', []) if attachment.get('InstanceId')]
+        entry = {
+            'VolumeId': volume['VolumeId'],
+            'Name': volume.get('Name'),
+            'Size': volume.get('Size'),
+            'VolumeType': volume.get('VolumeType'),
+            'AvailabilityZone': volume.get('AvailabilityZone'),
+            'CreateTime': volume.get('CreateTime'),
+            'EstimatedMonthlyCost': round(volume_cost(volume), 2),
+        }
+        if not attached:
+            orphaned_volumes.append(dict(entry, Reason='unattached'))
+            continue
+        states = [instance_states.get(instance_id) for instance_id in attached]
+        if all(state is None or state in GONE_STATES for state in states):
+            orphaned_volumes.append(dict(entry, Reason='instance gone', InstanceId=attached[0]))
+        elif all(state in STOPPED_STATES for state in states):
+            # Still billed while the instance is stopped; ASG-managed ones may be a warm pool.
+            stopped_instance_volumes.append(dict(entry, InstanceId=attached[0], AutoScalingGroup=group_of.get(attached[0])))
+
+    stale_snapshots = []
+    for snapshot in snapshots:
+        if snapshot.get('VolumeId') in volume_ids:
+            continue
+        stale_snapshots.append({
+            'SnapshotId': snapshot['SnapshotId'],
+            'Name': snapshot.get('Name'),
+            'VolumeId': snapshot.get('VolumeId'),
+            'VolumeSize': snapshot.get('VolumeSize'),
+            'StartTime': snapshot.get('StartTime'),
+            'AgeDays': age_days(snapshot.get('StartTime'), now),
+            'EstimatedMonthlyCost': round((snapshot.get('VolumeSize') or 0) * SNAPSHOT_PRICE, 2),
+        })
+
+    idle_addresses = []
+    for address in addresses:
+        instance_id = address.get('InstanceId')
+        if address.get('AssociationId') in (None, 'N/A') and instance_id in (None, 'N/A'):
+            reason = 'unassociated'
+        elif instance_id not in (None, 'N/A') and instance_states.get(instance_id) in STOPPED_STATES:
+            reason = 'instance stopped'
+        elif instance_id not in (None, 'N/A') and instance_states.get(instance_id) in GONE_STATES | {None}:
+            reason = 'instance gone'
+        else:
+            continue # Associated with a running instance or a network interface
+        idle_addresses.append({
+            'PublicIp': address.get('PublicIp'),
+            'AllocationId': address.get('AllocationId'),
+            'InstanceId': instance_id,
+            'AutoScalingGroup': group_of.get(instance_id),
+            'Reason': reason,
+            'EstimatedMonthlyCost': ELASTIC_IP_PRICE,
+        })
+
+    orphaned_volumes.sort(key=lambda item: -item['EstimatedMonthlyCost'])
+    stopped_instance_volumes.sort(key=lambda item: -item['EstimatedMonthlyCost'])
+    stale_snapshots.sort(key=lambda item: -item['EstimatedMonthlyCost'])
+    summary = {
+        'orphanedVolumes': summarize(orphaned_volumes, 'Size'),
+        'stoppedInstanceVolumes': summarize(stopped_instance_volumes, 'Size'),
+        'staleSnapshots': summarize(stale_snapshots, 'VolumeSize'),
+        'idleElasticIPs': summarize(idle_addresses),
+    }
+    return {
+        'summary': summary,
+        'estimatedMonthlyCost': round(sum(part['estimatedMonthlyCost'] for part in summary.values()), 2),
+        'currency': 'USD',
+        'orphanedVolumes': orphaned_volumes,
+        'stoppedInstanceVolumes': stopped_instance_volumes,
+        'staleSnapshots': stale_snapshots,
+        'idleElasticIPs': idle_addresses,
+    }
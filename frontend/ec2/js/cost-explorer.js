@@ -12,6 +12,7 @@ document.addEventListener('DOMContentLoaded', () => {
     const totalCostDisplay = document.getElementById('totalCostDisplay');
 
     let costChartInstance; // Variable to hold the Chart.js instance
+    const CHART_TOP_SERVICES = 8; // Services drawn individually; the rest are stacked as "Other"
 
     // Set default dates (last 6 months)
     const today = new Date();
@@ -44,9 +45,15 @@ document.addEventListener('DOMContentLoaded', () => {
         }
 
         try {
-            const response = await callApi(`${API_BASE_URL}/aws-cost-explorer?startDate=${startDate}&endDate=${endDate}`);
-            displayCostData(response);
-            drawChart(response);
+            // Both come back already pivoted (services x months); the chart gets the top
+            // services plus "Other", the table every service.
+            const query = `startDate=${startDate}&endDate=${endDate}`;
+            const [tableMatrix, chartMatrix] = await Promise.all([
+                callApi(`${API_BASE_URL}/aws-cost-explorer/matrix?${query}`),
+                callApi(`${API_BASE_URL}/aws-cost-explorer/matrix?${query}&top=${CHART_TOP_SERVICES}`)
+            ]);
+            displayCostData(tableMatrix);
+            drawChart(chartMatrix);
         } catch (error) {
             console.error('Failed to fetch cost data:', error);
             errorElement.textContent = `Error loading data: ${error.message}. Please check console for details.`;
@@ -56,8 +63,8 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
-    function displayCostData(data) {
-        if (data.length === 0) {
+    function displayCostData(matrix) {
+        if (matrix.services.length === 0) {
             const row = costTableBody.insertRow();
             const cell = row.insertCell();
             cell.colSpan = 3;
@@ -67,32 +74,23 @@ document.addEventListener('DOMContentLoaded', () => {
             return;
         }
 
-        let overallTotalCost = 0;
+        // Services are rows, months are columns; list each month's services alphabetically.
+        const serviceOrder = matrix.services.map((service, index) => index)
+            .sort((a, b) => matrix.services[a].localeCompare(matrix.services[b]));
 
-        // Group data by month and service for the table
-        const groupedData = {}; // { 'YYYY-MM': { 'ServiceA': amount, 'ServiceB': amount } }
-        data.forEach(item => {
-            const month = item.TimePeriod.substring(0, 7); // YYYY-MM
-            if (!groupedData[month]) {
-                groupedData[month] = {};
-            }
-            groupedData[month][item.Service] = (groupedData[month][item.Service] || 0) + parseFloat(item.Amount);
-            overallTotalCost += parseFloat(item.Amount);
-        });
-
-        // Sort months for consistent table display
-        const sortedMonths = Object.keys(groupedData).sort();
-
-        sortedMonths.forEach(month => {
-            const servicesInMonth = Object.keys(groupedData[month]).sort();
-            servicesInMonth.forEach(service => {
+        matrix.periods.forEach((period, column) => {
+            const month = period.substring(0, 7); // YYYY-MM
+            serviceOrder.forEach(index => {
+                const amount = matrix.values[index][column];
+                if (amount === 0) {
+                    return;
+                }
                 const row = costTableBody.insertRow();
                 row.insertCell().textContent = month;
-                row.insertCell().textContent = service;
-                row.insertCell().textContent = `${groupedData[month][service].toFixed(2)} USD`;
+                row.insertCell().textContent = matrix.services[index];
+                row.insertCell().textContent = `${amount.toFixed(2)} USD`;
             });
             // Add a total row for each month for clarity
-            const monthlyTotal = Object.values(groupedData[month]).reduce((sum, current) => sum + current, 0);
             const totalRow = costTableBody.insertRow();
             totalRow.classList.add('monthly-total-row'); // Add a class for styling
             const monthCell = totalRow.insertCell();
@@ -100,15 +98,15 @@ document.addEventListener('DOMContentLoaded', () => {
             monthCell.textContent = `Total for ${month}:`;
             monthCell.style.fontWeight = 'bold';
             const totalAmountCell = totalRow.insertCell();
-            totalAmountCell.textContent = `${monthlyTotal.toFixed(2)} USD`;
+            totalAmountCell.textContent = `${matrix.periodTotals[column].toFixed(2)} USD`;
             totalAmountCell.style.fontWeight = 'bold';
         });
 
-        totalCostDisplay.textContent = `${overallTotalCost.toFixed(2)} USD`;
+        totalCostDisplay.textContent = `${matrix.total.toFixed(2)} USD`;
     }
 
-    function drawChart(data) {
-        if (data.length === 0) {
+    function drawChart(matrix) {
+        if (matrix.services.length === 0) {
             if (costChartInstance) {
                 costChartInstance.destroy();
             }
@@ -117,39 +115,15 @@ document.addEventListener('DOMContentLoaded', () => {
         }
         costChartCanvas.style.display = 'block'; // Show canvas if data is available
 
-        const monthlyTotals = {};
-        const serviceMonthlyCosts = {}; // {service: {month: cost}}
-
-        data.forEach(item => {
-            const month = item.TimePeriod.substring(0, 7); // YYYY-MM (e.g., "2023-10")
-            const service = item.Service;
-            const amount = parseFloat(item.Amount);
-
-            // Aggregate total monthly cost
-            if (!monthlyTotals[month]) {
-                monthlyTotals[month] = 0;
-            }
-            monthlyTotals[month] += amount;
-
-            // Aggregate service-specific monthly cost
-            if (!serviceMonthlyCosts[service]) {
-                serviceMonthlyCosts[service] = {};
-            }
-            if (!serviceMonthlyCosts[service][month]) {
-                serviceMonthlyCosts[service][month] = 0;
-            }
-            serviceMonthlyCosts[service][month] += amount;
-        });
-
-        // Get sorted list of months for x-axis labels
-        const sortedMonths = Object.keys(monthlyTotals).sort();
+        // x-axis labels: YYYY-MM (e.g., "2023-10")
+        const sortedMonths = matrix.periods.map(period => period.substring(0, 7));
 
         const datasets = [];
 
         // Add a line dataset for Overall Total Monthly Cost
         datasets.push({
             label: 'Total Monthly Cost (USD)',
-            data: sortedMonths.map(month => monthlyTotals[month].toFixed(2)),
+            data: matrix.periodTotals,
             borderColor: 'rgb(75, 192, 192)',
             tension: 0.2, // Smooth line
             fill: false,
@@ -172,10 +146,10 @@ document.addEventListener('DOMContentLoaded', () => {
         ];
         let colorIndex = 0;
 
-        for (const service in serviceMonthlyCosts) {
+        matrix.services.forEach((service, index) => {
             datasets.push({
                 label: service,
-                data: sortedMonths.map(month => (serviceMonthlyCosts[service][month] || 0).toFixed(2)),
+                data: matrix.values[index],
                 backgroundColor: backgroundColors[colorIndex % backgroundColors.length],
                 borderColor: backgroundColors[colorIndex % backgroundColors.length],
                 borderWidth: 1,
@@ -185,7 +159,7 @@ document.addEventListener('DOMContentLoaded', () => {
                 yAxisID: 'y'
             });
             colorIndex++;
-        }
+        });
 
         // Destroy previous chart instance if it exists to avoid conflicts
         if (costChartInstance) {
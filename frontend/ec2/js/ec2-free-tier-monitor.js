@@ -7,6 +7,8 @@ document.addEventListener('DOMContentLoaded', () => {
     const currentUsageSpan = document.getElementById('currentUsage');
     const freeTierLimitSpan = document.getElementById('freeTierLimit');
     const remainingHoursSpan = document.getElementById('remainingHours');
+    const projectedUsageSpan = document.getElementById('projectedUsage');
+    const projectedLimitSpan = document.getElementById('projectedLimit');
     const ctx = document.getElementById('freeTierChart').getContext('2d');
 
     let freeTierChart; // Declare chart variable globally
@@ -41,6 +43,19 @@ document.addEventListener('DOMContentLoaded', () => {
             remainingHoursSpan.style.color = 'green';
         }
 
+        projectedUsageSpan.textContent = data.projectedMonthEndHours;
+        if (data.limitReachedOn) {
+            projectedLimitSpan.textContent = `(limit reached on ${data.limitReachedOn})`;
+        } else if (data.projectedLimitDate) {
+            projectedLimitSpan.textContent = `(limit projected to be reached on ${data.projectedLimitDate})`;
+        } else {
+            projectedLimitSpan.textContent = '';
+        }
+
+        // Month-to-date labels followed by the rest of the month; the projection starts today.
+        const labels = data.labels.concat(data.projection.labels.slice(1));
+        const projected = Array(data.labels.length - 1).fill(null).concat(data.projection.cumulative);
+
         if (freeTierChart) {
             freeTierChart.destroy(); // Destroy existing chart before creating a new one
         }
@@ -48,16 +63,29 @@ document.addEventListener('DOMContentLoaded', () => {
         freeTierChart = new Chart(ctx, {
             type: 'line',
             data: {
-                labels: data.labels,
+                labels: labels,
                 datasets: [{
                     label: 'Daily Usage (Hours)',
                     data: data.data,
                     borderColor: 'rgb(75, 192, 192)',
                     tension: 0.1,
                     fill: false
+                }, {
+                    label: 'Cumulative Usage (Hours)',
+                    data: data.cumulative,
+                    borderColor: 'rgb(54, 162, 235)',
+                    tension: 0.1,
+                    fill: false
+                }, {
+                    label: 'Projected (Hours)',
+                    data: projected,
+                    borderColor: 'rgb(54, 162, 235)',
+                    borderDash: [2, 4],
+                    fill: false,
+                    pointRadius: 0
                 }, {
                     label: 'Free Tier Limit (750h)',
-                    data: Array(data.labels.length).fill(data.freeTierLimitHours), // Constant line for limit
+                    data: Array(labels.length).fill(data.freeTierLimitHours), // Constant line for limit
                     borderColor: 'rgb(255, 99, 132)',
                     borderDash: [5, 5],
                     fill: false,
@@ -46,7 +46,7 @@ document.addEventListener('DOMContentLoaded', () => {
             const card = document.createElement('div');
             card.className = 'resource-card';
             // For the Free Tier Monitor card, we'll just show 'View' instead of a count
-            const countOrView = resource.name === 'Free Tier Monitor' ? '<div class="count-text">View</div>' : `<div class="count">${resource.count}</div>`;
+            const countOrView = resource.name === 'Free Tier Monitor' ? '<div class="count-text">View</div>' : `<div class="count">${resource.count ?? 'N/A'}</div>`; // null when that describe call timed out or failed
 
             card.innerHTML = `
                 <h3>${resource.name}</h3>
@@ -102,5 +102,18 @@ document.addEventListener('DOMContentLoaded', () => {
 
     // Add event listener for the refresh button
     refreshButton.addEventListener('click', fetchEc2Instances);
+
+    // Live updates: the backend pushes instance changes over Server-Sent Events (only when its
+    // background inventory sync is on; otherwise the stream is refused and the page stays manual).
+    if (window.EventSource) {
+        const events = new EventSource(`${API_BASE_URL}/events?resources=Instances`);
+        let refreshTimer = null;
+        const scheduleRefresh = () => {
+            // One refetch per burst of events (a sync can report many instances at once)
+            clearTimeout(refreshTimer);
+            refreshTimer = setTimeout(fetchEc2Instances, 500);
+        };
+        ['created', 'updated', 'deleted'].forEach(type => events.addEventListener(type, scheduleRefresh));
+    }
 });
 
@@ -2,6 +2,7 @@
 import json
 import os
 import boto3
+from boto3.dynamodb.conditions import Key
 from datetime import datetime, timedelta
 
 dynamodb = boto3.resource('dynamodb')
@@ -18,6 +19,10 @@ rds_client = boto3.client('rds')
 
 SHUTDOWN_START_HOUR_UTC = int(os.environ.get('SHUTDOWN_START_HOUR_UTC', '12'))
 SHUTDOWN_END_HOUR_UTC = int(os.environ.get('SHUTDOWN_END_HOUR_UTC', '16'))
+# GSI on ConfirmationStatus (hash) and ConfirmationTokenExpires (range). main.tf sets this from
+# local.status_expiry_index_name, the name the table's index is created with; there is no
+# fallback, so a missing name fails at cold start instead of querying an index that isn't there.
+STATUS_EXPIRY_INDEX_NAME = os.environ['STATUS_EXPIRY_INDEX_NAME']
 
 
 def send_notification(service_item, subject, message):
@@ -110,6 +115,22 @@ Your AWS Automation Team
 """
     send_notification(service_item, subject, full_message)
 
+def query_pending(expiry_condition):
+    # Pending services whose expiry matches the condition, in expiry order, across every page.
+    # Reads only the matching index entries, so a run costs the number of pending services
+    # rather than the size of the table.
+    query_args = {
+        'IndexName': STATUS_EXPIRY_INDEX_NAME,
+        'KeyConditionExpression': Key('ConfirmationStatus').eq('Pending') & expiry_condition,
+    }
+    while True:
+        response = table.query(**query_args)
+        for item in response.get('Items', []):
+            yield item
+        if 'LastEvaluatedKey' not in response:
+            return
+        query_args['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
 def lambda_handler(event, context):
     print(f"Received scheduled event: {json.dumps(event)}")
     current_utc_time = datetime.utcnow()
@@ -126,40 +147,34 @@ def lambda_handler(event, context):
         }
 
     try:
-        # Scan for pending services that have passed their confirmation expiry
-        # A more efficient way would be to use a GSI with status and expiration time if high volume
-        response = table.scan(
-            FilterExpression=f"ConfirmationStatus = :pending_status",
-            ExpressionAttributeValues={
-                ':pending_status': 'Pending'
-            }
-        )
-        pending_services = response.get('Items', [])
+        # Expiry times are stored as ISO strings, which compare in time order.
+        now_iso = current_utc_time.isoformat()
 
-        for service_item in pending_services:
+        # Pending services whose confirmation has expired
+        for service_item in query_pending(Key('ConfirmationTokenExpires').lte(now_iso)):
             service_id = service_item['ServiceId']
             resource_type = service_item['ResourceType']
-            creation_timestamp_str = service_item['CreationTimestamp']
-            confirmation_expires_str = service_item['ConfirmationTokenExpires']
-
-            creation_time = datetime.fromisoformat(creation_timestamp_str)
-            confirmation_expiration_time = datetime.fromisoformat(confirmation_expires_str)
+            creation_time = datetime.fromisoformat(service_item['CreationTimestamp'])
+            confirmation_expiration_time = datetime.fromisoformat(service_item['ConfirmationTokenExpires'])
 
             print(f"Processing service: {service_id} (Type: {resource_type}, Created: {creation_time}, Expires: {confirmation_expiration_time})")
+            print(f"Confirmation for {service_id} expired at {confirmation_expiration_time.isoformat()} UTC. Triggering stop.")
+            stop_aws_service(service_item) # Call the function to stop the service
+
+        # Send reminders for the ones not expired yet, unless it's the final shutdown hour (10 PM IST)
+        if current_hour_utc >= SHUTDOWN_END_HOUR_UTC:
+            print("Final shutdown hour; no reminders are sent.")
+        else:
+            for service_item in query_pending(Key('ConfirmationTokenExpires').gt(now_iso)):
+                service_id = service_item['ServiceId']
+                resource_type = service_item['ResourceType']
+                confirmation_expiration_time = datetime.fromisoformat(service_item['ConfirmationTokenExpires'])
 
-            # Check if confirmation expired
-            if current_utc_time > confirmation_expiration_time:
-                print(f"Confirmation for {service_id} expired at {confirmation_expiration_time.isoformat()} UTC. Triggering stop.")
-                stop_aws_service(service_item) # Call the function to stop the service
-            else:
-                # Send reminder if it's within the window but not expired yet, and a reminder hasn't been sent recently
-                # Or if it's the last check before 10 PM IST (e.g., 9:30 PM IST check)
                 last_notification_sent_str = service_item.get('LastNotificationSent')
                 last_notification_sent = datetime.fromisoformat(last_notification_sent_str) if last_notification_sent_str else datetime.min
 
                 # Send reminder if not confirmed and last reminder was more than e.g., 30 mins ago
-                # And if it's not yet the final shutdown hour (10 PM IST)
-                if current_utc_time - last_notification_sent > timedelta(minutes=30) and current_hour_utc < SHUTDOWN_END_HOUR_UTC:
+                if current_utc_time - last_notification_sent > timedelta(minutes=30):
                     print(f"Sending reminder for {service_id}.")
                     confirmation_link = f"{api_gateway_url_prefix}/confirm?serviceId={service_id}&confirmationToken={service_item['ConfirmationToken']}"
                     subject = f"REMINDER: Confirm Your AWS {resource_type} - {service_id}"
@@ -73,6 +73,12 @@ variable "shutdown_end_hour_utc" {
   default     = 2 # Example: 10 PM ET (on day 1) is 02:00 UTC (on day 2). Adjust as per your desired local time.
 }
 
+# --- Locals ---
+locals {
+  # The table's status/expiry index, which the shutdown scheduler queries by name.
+  status_expiry_index_name = "ConfirmationStatusExpiresIndex"
+}
+
 # --- Data Sources ---
 data "archive_file" "service_creation_notifier_zip" {
   type        = "zip"
@@ -165,7 +171,10 @@ resource "aws_iam_role_policy" "lambda_dynamodb_access_policy" {
           "dynamodb:Scan",
           "dynamodb:Query",
         ]
-        Resource = aws_dynamodb_table.service_status_table.arn
+        Resource = [
+          aws_dynamodb_table.service_status_table.arn,
+          "${aws_dynamodb_table.service_status_table.arn}/index/*",
+        ]
       },
       {
         Effect = "Allow"
@@ -447,6 +456,25 @@ resource "aws_dynamodb_table" "service_status_table" {
     type = "S"
   }
 
+  attribute {
+    name = "ConfirmationStatus"
+    type = "S"
+  }
+
+  attribute {
+    name = "ConfirmationTokenExpires"
+    type = "S"
+  }
+
+  # Lets the shutdown scheduler query pending services by expiry instead of scanning the
+  # table. Items without an expiry are left out of the index.
+  global_secondary_index {
+    name            = local.status_expiry_index_name
+    hash_key        = "ConfirmationStatus"
+    range_key       = "ConfirmationTokenExpires"
+    projection_type = "ALL"
+  }
+
   tags = {
     Environment = var.environment_tag
     Project     = var.project_tag
@@ -513,11 +541,12 @@ resource "aws_lambda_function" "shutdown_scheduler" {
 
   environment {
     variables = {
-      DYNAMODB_TABLE_NAME    = aws_dynamodb_table.service_status_table.name
-      SNS_TOPIC_ARN          = aws_sns_topic.service_creation_alerts.arn
-      API_GATEWAY_URL_PREFIX = aws_api_gateway_stage.confirmation_api_stage.invoke_url
-      SHUTDOWN_START_HOUR_UTC = var.shutdown_start_hour_utc
-      SHUTDOWN_END_HOUR_UTC   = var.shutdown_end_hour_utc
+      DYNAMODB_TABLE_NAME      = aws_dynamodb_table.service_status_table.name
+      SNS_TOPIC_ARN            = aws_sns_topic.service_creation_alerts.arn
+      API_GATEWAY_URL_PREFIX   = aws_api_gateway_stage.confirmation_api_stage.invoke_url
+      SHUTDOWN_START_HOUR_UTC  = var.shutdown_start_hour_utc
+      SHUTDOWN_END_HOUR_UTC    = var.shutdown_end_hour_utc
+      STATUS_EXPIRY_INDEX_NAME = local.status_expiry_index_name
     }
   }
 